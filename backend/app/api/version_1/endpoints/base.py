@@ -1,10 +1,11 @@
 from typing import Type, Generic, TypeVar
 
 from pydantic import BaseModel
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
+from app.schema.page import PageSchema
 from app.service.base import BaseService
 
 
@@ -28,6 +29,9 @@ class BaseEndpoint[Service, InputSchema, OutputSchema]:
     def _register_routes(self) -> None:
 
         self.router.get("/", response_model=list[self.output_schema])(self._get_all)
+        self.router.get("/pagina", response_model=PageSchema[self.output_schema])(
+            self._get_page
+        )
         self.router.get("/{id}", response_model=self.output_schema)(self._get_by_id)
         self.router.post("/", response_model=self.output_schema, status_code=201)(
             self._create
@@ -52,11 +56,26 @@ class BaseEndpoint[Service, InputSchema, OutputSchema]:
             )
 
     async def _get_all(
-        self, limit: int = 15, offset: int = 0, db: AsyncSession = Depends(get_db)
+        self,
+        limit: int = Query(15, gt=0, le=1000),
+        offset: int = Query(0, ge=0),
+        db: AsyncSession = Depends(get_db),
     ) -> list[OutputSchema]:
         service = self.service(db)
         return await service.get_all(limit, offset)
 
+    async def _get_page(
+        self,
+        cursor: str = None,
+        limit: int = Query(15, gt=0, le=1000),
+        db: AsyncSession = Depends(get_db),
+    ) -> PageSchema[OutputSchema]:
+        service = self.service(db)
+        try:
+            return await service.get_page(cursor, limit)
+        except ValueError as error:
+            raise HTTPException(status_code=400, detail=str(error))
+
     async def _create(
         self, schema: InputSchema, db: AsyncSession = Depends(get_db)
     ) -> OutputSchema:
@@ -1,9 +1,46 @@
-from fastapi import Depends, HTTPException, APIRouter
+from datetime import date
+from typing import Literal
+
+from fastapi import Body, Depends, HTTPException, APIRouter, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.conditional import etag_headers, etag_matches, make_etag, not_modified
+from app.core.database import get_db, get_read_db, get_session_factory
+from app.repository.base import CHUNK_SIZE
 from app.service.despesa import DespesaService
-from app.schema.despesa import DespesaSchema, DespesaOutputSchema
+from app.schema.bulk import BulkResultSchema
+from app.schema.page import PageSchema
+from app.schema.despesa import (
+    DespesaBalanceSchema,
+    DespesaSchema,
+    DespesaOutputSchema,
+    DespesaBulkUpdateSchema,
+    DespesaFilterSchema,
+    DespesaPatchSchema,
+    DespesaSummarySchema,
+)
+
+
+ORDER = Literal["vencimento", "-vencimento", "valor", "-valor"]
+
+
+def despesa_filters(
+    inicio: date = Query(None, alias="from", description="Vencimento a partir de"),
+    fim: date = Query(None, alias="to", description="Vencimento até"),
+    status: Literal["P", "Q"] = Query(None, description="P - Pendente, Q - Quitada"),
+    tipo: str = Query(None, description="Tipo da despesa"),
+    valor_min: float = Query(None, ge=0, description="Valor mínimo"),
+    valor_max: float = Query(None, ge=0, description="Valor máximo"),
+) -> DespesaFilterSchema:
+    return DespesaFilterSchema(
+        inicio=inicio,
+        fim=fim,
+        status=status,
+        tipo=tipo,
+        valor_min=valor_min,
+        valor_max=valor_max,
+    )
 
 
 class DespesaEndpoint:
@@ -14,22 +51,54 @@ class DespesaEndpoint:
         self.register_routes()
 
     def register_routes(self):
+        self.router.post(
+            "/bulk", response_model=BulkResultSchema[DespesaOutputSchema]
+        )(self._create_many)
+        self.router.put(
+            "/bulk", response_model=BulkResultSchema[DespesaOutputSchema]
+        )(self._update_many)
+        self.router.delete("/bulk", response_model=BulkResultSchema[int])(
+            self._delete_many
+        )
+        self.router.patch("/bulk/quitar", response_model=BulkResultSchema[int])(
+            self._mark_as_paid
+        )
+
         self.router.post("/", response_model=DespesaOutputSchema, status_code=201)(
             self._create
         )
         self.router.put("/{id}", response_model=DespesaOutputSchema, status_code=200)(
             self._update
         )
+        self.router.patch("/{id}", response_model=DespesaOutputSchema)(self._patch)
         self.router.delete("/{id}", response_model=None, status_code=204)(self._delete)
 
         self.router.get("/", response_model=list[DespesaOutputSchema])(self._get_all)
+        self.router.get("/pagina", response_model=PageSchema[DespesaOutputSchema])(
+            self._get_page
+        )
         self.router.get("/{id}", response_model=DespesaOutputSchema)(self._get_by_id)
         self.router.get("/user/{user_id}", response_model=list[DespesaOutputSchema])(
             self.get_by_user_id
         )
+        self.router.get(
+            "/user/{user_id}/pagina", response_model=PageSchema[DespesaOutputSchema]
+        )(self.get_page_by_user_id)
+        self.router.get("/user/{user_id}/export", response_class=StreamingResponse)(
+            self.export_by_user_id
+        )
+        self.router.get(
+            "/user/{user_id}/summary", response_model=list[DespesaSummarySchema]
+        )(self.summary)
+        self.router.get(
+            "/user/{user_id}/balance", response_model=DespesaBalanceSchema
+        )(self.balance)
+        self.router.get(
+            "/user/{user_id}/search", response_model=PageSchema[DespesaOutputSchema]
+        )(self.search)
 
     async def _get_by_id(
-        self, id: int, db: AsyncSession = Depends(get_db)
+        self, id: int, db: AsyncSession = Depends(get_read_db)
     ) -> DespesaOutputSchema:
         service = self.service(db)
         try:
@@ -43,10 +112,28 @@ class DespesaEndpoint:
             )
 
     async def _get_all(
-        self, limit: int = 15, offset: int = 0, db: AsyncSession = Depends(get_db)
+        self,
+        limit: int = Query(15, gt=0, le=1000),
+        offset: int = Query(0, ge=0),
+        db: AsyncSession = Depends(get_read_db),
     ) -> list[DespesaOutputSchema]:
         service = self.service(db)
-        return await service.get_all(limit, offset)
+        return Response(
+            content=await service.get_all_json(limit, offset),
+            media_type="application/json",
+        )
+
+    async def _get_page(
+        self,
+        cursor: str = None,
+        limit: int = Query(15, gt=0, le=1000),
+        db: AsyncSession = Depends(get_db),
+    ) -> PageSchema[DespesaOutputSchema]:
+        service = self.service(db)
+        try:
+            return await service.get_page(cursor, limit)
+        except ValueError as error:
+            raise HTTPException(status_code=400, detail=str(error))
 
     async def _create(
         self, schema: DespesaSchema, db: AsyncSession = Depends(get_db)
@@ -69,6 +156,20 @@ class DespesaEndpoint:
                 ),
             )
 
+    async def _patch(
+        self, id: int, schema: DespesaPatchSchema, db: AsyncSession = Depends(get_db)
+    ) -> DespesaOutputSchema:
+        service = self.service(db)
+        try:
+            return await service.patch(id, schema)
+        except ValueError as error:
+            raise HTTPException(
+                status_code=404,
+                detail=str(error).format(
+                    id=id, objeto="Despesa"
+                ),
+            )
+
     async def _delete(self, id: int, db: AsyncSession = Depends(get_db)) -> None:
         service = self.service(db)
         try:
@@ -81,11 +182,177 @@ class DespesaEndpoint:
                 ),
             )
 
+    async def _create_many(
+        self,
+        schemas: list[DespesaSchema],
+        chunk_size: int = Query(CHUNK_SIZE, gt=0, le=5000),
+        db: AsyncSession = Depends(get_db),
+    ) -> BulkResultSchema[DespesaOutputSchema]:
+        service = self.service(db)
+
+        return await service.create_many(schemas, chunk_size)
+
+    async def _update_many(
+        self,
+        schemas: list[DespesaBulkUpdateSchema],
+        chunk_size: int = Query(CHUNK_SIZE, gt=0, le=5000),
+        db: AsyncSession = Depends(get_db),
+    ) -> BulkResultSchema[DespesaOutputSchema]:
+        service = self.service(db)
+
+        return await service.update_many(schemas, chunk_size)
+
+    async def _delete_many(
+        self,
+        ids: list[int] = Body(..., description="IDs das despesas a remover"),
+        chunk_size: int = Query(CHUNK_SIZE, gt=0, le=5000),
+        db: AsyncSession = Depends(get_db),
+    ) -> BulkResultSchema[int]:
+        service = self.service(db)
+
+        return await service.delete_many(ids, chunk_size)
+
+    async def _mark_as_paid(
+        self,
+        ids: list[int] = Body(..., description="IDs das despesas a quitar"),
+        chunk_size: int = Query(CHUNK_SIZE, gt=0, le=5000),
+        db: AsyncSession = Depends(get_db),
+    ) -> BulkResultSchema[int]:
+        service = self.service(db)
+
+        return await service.mark_as_paid(ids, chunk_size)
+
     async def get_by_user_id(
-        self, user_id: int, db: AsyncSession = Depends(get_db)
+        self,
+        user_id: int,
+        request: Request,
+        filtros: DespesaFilterSchema = Depends(despesa_filters),
+        order: ORDER = "vencimento",
+        limit: int = Query(15, gt=0, le=1000),
+        db: AsyncSession = Depends(get_read_db),
     ) -> list[DespesaOutputSchema]:
         service = self.service(db)
+
+        def gerar_etag(versao: int) -> str:
+            return make_etag(
+                "despesas",
+                user_id,
+                versao,
+                order,
+                limit,
+                filtros.model_dump_json(),
+                *DespesaOutputSchema.model_fields,
+            )
+
+        # Requisição condicional: a versão da coleção, lida pela chave primária,
+        # decide o 304 antes de a listagem ser carregada
+        if request.headers.get("if-none-match"):
+            versao = await service.get_collection_version(user_id)
+            if versao is not None and etag_matches(request, gerar_etag(versao)):
+                return not_modified(gerar_etag(versao))
+
+        try:
+            versao, busca = await service.get_versioned_rows_by_user_id(
+                user_id, filtros, order, limit
+            )
+        except ValueError as error:
+            raise HTTPException(status_code=400, detail=str(error))
+
+        # Sem versão (usuário inexistente) a resposta vai sem ETag
+        etag = None
+        if versao is not None:
+            etag = gerar_etag(versao)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+
+        return Response(
+            content=service.rows_to_json(busca),
+            media_type="application/json",
+            headers=etag_headers(etag),
+        )
+
+    async def get_page_by_user_id(
+        self,
+        user_id: int,
+        filtros: DespesaFilterSchema = Depends(despesa_filters),
+        order: ORDER = "vencimento",
+        cursor: str = None,
+        limit: int = Query(15, gt=0, le=1000),
+        db: AsyncSession = Depends(get_db),
+    ) -> PageSchema[DespesaOutputSchema]:
+        service = self.service(db)
+        try:
+            return await service.get_page_by_user_id(
+                user_id, filtros, order, cursor, limit
+            )
+        except ValueError as error:
+            raise HTTPException(status_code=400, detail=str(error))
+
+    async def summary(
+        self,
+        user_id: int,
+        inicio: date = Query(None, alias="from"),
+        fim: date = Query(None, alias="to"),
+        group_by: str = "month,tipo,status",
+        db: AsyncSession = Depends(get_db),
+    ) -> list[DespesaSummarySchema]:
+        service = self.service(db)
+        try:
+            return await service.summary(
+                user_id,
+                [grupo.strip() for grupo in group_by.split(",") if grupo.strip()],
+                inicio,
+                fim,
+            )
+        except ValueError as error:
+            raise HTTPException(status_code=400, detail=str(error))
+
+    async def search(
+        self,
+        user_id: int,
+        q: str = Query(..., min_length=2, max_length=100, description="Termo buscado"),
+        cursor: str = None,
+        limit: int = Query(15, gt=0, le=100),
+        db: AsyncSession = Depends(get_db),
+    ) -> PageSchema[DespesaOutputSchema]:
+        service = self.service(db)
         try:
-            return await service.get_by_user_id(user_id)
+            return await service.search(user_id, q, cursor, limit)
         except ValueError as error:
             raise HTTPException(status_code=400, detail=str(error))
+
+    async def balance(
+        self,
+        user_id: int,
+        mes: str = Query(None, description="Mês no formato AAAA-MM (padrão: atual)"),
+        db: AsyncSession = Depends(get_db),
+    ) -> DespesaBalanceSchema:
+        service = self.service(db)
+        try:
+            return await service.balance(user_id, mes)
+        except ValueError as error:
+            raise HTTPException(status_code=400, detail=str(error))
+
+    async def export_by_user_id(
+        self,
+        user_id: int,
+        format: Literal["csv", "ndjson"] = "csv",
+        session_factory=Depends(get_session_factory),
+    ) -> StreamingResponse:
+        # A sessão é aberta dentro do gerador, pois as dependências com yield
+        # são encerradas antes do corpo da resposta ser enviado
+        async def conteudo():
+            async with session_factory() as db:
+                service = self.service(db)
+                async for parte in service.export_by_user_id(user_id, format):
+                    yield parte
+
+        return StreamingResponse(
+            conteudo(),
+            media_type="text/csv" if format == "csv" else "application/x-ndjson",
+            headers={
+                "Content-Disposition": (
+                    f'attachment; filename="despesas_{user_id}.{format}"'
+                )
+            },
+        )
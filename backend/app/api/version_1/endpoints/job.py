@@ -0,0 +1,37 @@
+from fastapi import HTTPException, APIRouter
+
+from app.service.job import JobService
+from app.schema.job import JobOutputSchema, JobSchema
+
+
+class JobEndpoint:
+    def __init__(self):
+        self.service = JobService
+        self.router = APIRouter(prefix="/jobs", tags=["Job"])
+
+        self.register_routes()
+
+    def register_routes(self):
+        self.router.post("/", response_model=JobOutputSchema, status_code=202)(
+            self._create
+        )
+        self.router.get("/{id}", response_model=JobOutputSchema)(self._get_by_id)
+
+    async def _create(self, schema: JobSchema) -> JobOutputSchema:
+        service = self.service()
+        try:
+            return await service.enqueue(schema)
+        except ValueError as error:
+            raise HTTPException(status_code=400, detail=str(error))
+
+    async def _get_by_id(self, id: int) -> JobOutputSchema:
+        service = self.service()
+        try:
+            return await service.get_by_id(id)
+        except ValueError as error:
+            raise HTTPException(
+                status_code=404,
+                detail=str(error).format(
+                    id=id, objeto="Tarefa"
+                ),
+            )
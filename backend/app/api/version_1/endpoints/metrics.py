@@ -0,0 +1,37 @@
+from typing import Any
+
+from fastapi import APIRouter
+
+from app.core.admission import admission_stats
+from app.core.cache import get_cache
+from app.core.database import get_pool_stats
+from app.core.instrumentation import registry
+
+
+class MetricsEndpoint:
+    def __init__(self):
+        self.router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+        self.register_routes()
+
+    def register_routes(self):
+        self.router.get("/")(self.routes)
+        self.router.delete("/", status_code=204)(self.reset)
+        self.router.get("/pool")(self.pool)
+        self.router.get("/cache")(self.cache)
+        self.router.get("/admission")(self.admission)
+
+    async def routes(self) -> dict[str, Any]:
+        return registry.snapshot()
+
+    async def reset(self) -> None:
+        registry.clear()
+
+    async def pool(self) -> dict[str, Any]:
+        return get_pool_stats()
+
+    async def cache(self) -> dict[str, Any]:
+        return get_cache().stats()
+
+    async def admission(self) -> dict[str, Any] | None:
+        return admission_stats()
@@ -0,0 +1,86 @@
+from datetime import date
+
+from fastapi import Depends, HTTPException, APIRouter, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db, get_read_db
+from app.service.recorrencia import RecorrenciaService
+from app.schema.recorrencia import (
+    RecorrenciaMaterializeSchema,
+    RecorrenciaOutputSchema,
+    RecorrenciaSchema,
+)
+
+
+class RecorrenciaEndpoint:
+    def __init__(self):
+        self.service = RecorrenciaService
+        self.router = APIRouter(prefix="/recorrencias", tags=["Recorrencia"])
+
+        self.register_routes()
+
+    def register_routes(self):
+        self.router.post(
+            "/gerar", response_model=RecorrenciaMaterializeSchema
+        )(self._materialize)
+        self.router.post("/", response_model=RecorrenciaOutputSchema, status_code=201)(
+            self._create
+        )
+        self.router.delete("/{id}", response_model=None, status_code=204)(self._delete)
+
+        self.router.get("/{id}", response_model=RecorrenciaOutputSchema)(
+            self._get_by_id
+        )
+        self.router.get(
+            "/user/{user_id}", response_model=list[RecorrenciaOutputSchema]
+        )(self.get_by_user_id)
+
+    async def _get_by_id(
+        self, id: int, db: AsyncSession = Depends(get_read_db)
+    ) -> RecorrenciaOutputSchema:
+        service = self.service(db)
+        try:
+            return await service.get_by_id(id)
+        except ValueError as error:
+            raise HTTPException(
+                status_code=404,
+                detail=str(error).format(
+                    id=id, objeto="Recorrência"
+                ),
+            )
+
+    async def _create(
+        self, schema: RecorrenciaSchema, db: AsyncSession = Depends(get_db)
+    ) -> RecorrenciaOutputSchema:
+        service = self.service(db)
+
+        return await service.create(schema)
+
+    async def _delete(self, id: int, db: AsyncSession = Depends(get_db)) -> None:
+        service = self.service(db)
+        try:
+            return await service.delete(id)
+        except ValueError as error:
+            raise HTTPException(
+                status_code=404,
+                detail=str(error).format(
+                    id=id, objeto="Recorrência"
+                ),
+            )
+
+    async def _materialize(
+        self,
+        horizonte: date = Query(None, description="Gera as despesas até esta data"),
+        batch_size: int = Query(None, gt=0, le=10_000),
+        db: AsyncSession = Depends(get_db),
+    ) -> RecorrenciaMaterializeSchema:
+        service = self.service(db)
+
+        return await service.materialize(horizonte, batch_size)
+
+    async def get_by_user_id(
+        self, user_id: int, db: AsyncSession = Depends(get_read_db)
+    ) -> list[RecorrenciaOutputSchema]:
+        service = self.service(db)
+
+        return await service.get_by_user_id(user_id)
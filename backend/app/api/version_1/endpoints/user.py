@@ -1,9 +1,16 @@
-from fastapi import Depends, HTTPException, APIRouter
+from fastapi import Depends, HTTPException, APIRouter, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.conditional import etag_headers, etag_matches, make_etag, not_modified
+from app.core.database import get_db, get_read_db
 from app.service.user import UserService
-from app.schema.user import UserSchema, UserOutputSchema
+from app.schema.page import PageSchema
+from app.schema.user import (
+    UserLoginSchema,
+    UserOutputSchema,
+    UserPatchSchema,
+    UserSchema,
+)
 
 
 class UserEndpoint:
@@ -17,12 +24,17 @@ class UserEndpoint:
         self.router.post("/", response_model=UserOutputSchema, status_code=201)(
             self._create
         )
+        self.router.post("/login", response_model=UserOutputSchema)(self._login)
         self.router.put("/{id}", response_model=UserOutputSchema, status_code=200)(
             self._update
         )
+        self.router.patch("/{id}", response_model=UserOutputSchema)(self._patch)
         self.router.delete("/{id}", response_model=None, status_code=204)(self._delete)
 
         self.router.get("/", response_model=list[UserOutputSchema])(self._get_all)
+        self.router.get("/pagina", response_model=PageSchema[UserOutputSchema])(
+            self._get_page
+        )
         self.router.get("/{id}", response_model=UserOutputSchema)(self._get_by_id)
         self.router.get("/email/{email}", response_model=UserOutputSchema)(
             self.get_by_email
@@ -32,11 +44,15 @@ class UserEndpoint:
         )
 
     async def _get_by_id(
-        self, id: int, db: AsyncSession = Depends(get_db)
+        self,
+        id: int,
+        request: Request,
+        response: Response,
+        db: AsyncSession = Depends(get_read_db),
     ) -> UserOutputSchema:
         service = self.service(db)
         try:
-            return await service.get_by_id(id)
+            versao, busca = await service.get_versioned_by_id(id)
         except ValueError as error:
             raise HTTPException(
                 status_code=404,
@@ -45,11 +61,36 @@ class UserEndpoint:
                 ),
             )
 
+        etag = make_etag("users", id, versao, *UserOutputSchema.model_fields)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        response.headers.update(etag_headers(etag))
+        return busca
+
     async def _get_all(
-        self, limit: int = 15, offset: int = 0, db: AsyncSession = Depends(get_db)
+        self,
+        limit: int = Query(15, gt=0, le=1000),
+        offset: int = Query(0, ge=0),
+        db: AsyncSession = Depends(get_read_db),
     ) -> list[UserOutputSchema]:
         service = self.service(db)
-        return await service.get_all(limit, offset)
+        return Response(
+            content=await service.get_all_json(limit, offset),
+            media_type="application/json",
+        )
+
+    async def _get_page(
+        self,
+        cursor: str = None,
+        limit: int = Query(15, gt=0, le=1000),
+        db: AsyncSession = Depends(get_db),
+    ) -> PageSchema[UserOutputSchema]:
+        service = self.service(db)
+        try:
+            return await service.get_page(cursor, limit)
+        except ValueError as error:
+            raise HTTPException(status_code=400, detail=str(error))
 
     async def _create(
         self, schema: UserSchema, db: AsyncSession = Depends(get_db)
@@ -58,6 +99,15 @@ class UserEndpoint:
 
         return await service.create(schema)
 
+    async def _login(
+        self, schema: UserLoginSchema, db: AsyncSession = Depends(get_db)
+    ) -> UserOutputSchema:
+        service = self.service(db)
+        try:
+            return await service.authenticate(schema.email, schema.senha)
+        except ValueError as error:
+            raise HTTPException(status_code=401, detail=str(error))
+
     async def _update(
         self, id: int, schema: UserSchema, db: AsyncSession = Depends(get_db)
     ) -> UserOutputSchema:
@@ -72,6 +122,20 @@ class UserEndpoint:
                 ),
             )
 
+    async def _patch(
+        self, id: int, schema: UserPatchSchema, db: AsyncSession = Depends(get_db)
+    ) -> UserOutputSchema:
+        service = self.service(db)
+        try:
+            return await service.patch(id, schema)
+        except ValueError as error:
+            raise HTTPException(
+                status_code=404,
+                detail=str(error).format(
+                    id=id, objeto="User"
+                ),
+            )
+
     async def _delete(self, id: int, db: AsyncSession = Depends(get_db)) -> None:
         service = self.service(db)
         try:
@@ -85,7 +149,7 @@ class UserEndpoint:
             )
 
     async def get_by_email(
-        self, email: str, db: AsyncSession = Depends(get_db)
+        self, email: str, db: AsyncSession = Depends(get_read_db)
     ) -> UserOutputSchema:
         service = self.service(db)
         try:
@@ -94,7 +158,7 @@ class UserEndpoint:
             raise HTTPException(status_code=404, detail=str(error))
 
     async def get_by_username(
-        self, username: str, db: AsyncSession = Depends(get_db)
+        self, username: str, db: AsyncSession = Depends(get_read_db)
     ) -> UserOutputSchema:
         service = self.service(db)
         try:
@@ -0,0 +1,115 @@
+"""Comandos de manutenção executados fora da API.
+
+    python -m app.cli migrate
+    python -m app.cli gerar-recorrencias --horizonte 2025-12-31
+    python -m app.cli rebuild-resumo --check
+    python -m app.cli worker --concurrency 4
+"""
+
+import argparse
+import asyncio
+import signal
+from datetime import date
+
+
+async def migrate(args) -> None:
+    from app.core.database import create_schema, dispose_engines
+
+    await create_schema()
+    await dispose_engines()
+    print("Schema atualizado")
+
+
+async def gerar_recorrencias(args) -> None:
+    from app.core.database import dispose_engines, get_database
+    from app.service.recorrencia import RecorrenciaService
+
+    async with get_database().session() as db:
+        resultado = await RecorrenciaService(db).materialize(
+            args.horizonte, args.batch_size
+        )
+    await dispose_engines()
+    print(f"{resultado.rules} regras processadas, {resultado.created} despesas criadas")
+
+
+async def rebuild_resumo(args) -> None:
+    from app.core.database import dispose_engines, get_database
+    from app.repository.resumo import ResumoRepository
+
+    async with get_database().session() as db:
+        repository = ResumoRepository(db)
+        if args.check:
+            divergencias = await repository.check(args.user_id)
+            for item in divergencias:
+                print(
+                    f"user {item['user_id']} {item['mes']:%Y-%m} {item['tipo']}: "
+                    f"gravado {item['gravado']}, esperado {item['esperado']}"
+                )
+            print(f"{len(divergencias)} divergências")
+        else:
+            linhas = await repository.rebuild(args.user_id)
+            print(f"{linhas} linhas recalculadas")
+    await dispose_engines()
+
+
+async def worker(args) -> None:
+    from app.core.database import dispose_engines
+    from app.core.jobs import create_job_worker
+    from app.core.settings import get_settings
+    import app.service.job  # noqa: F401  (registra as tarefas)
+
+    trabalhador = create_job_worker(args.concurrency)
+    trabalhador.start()
+    print(f"Worker {trabalhador.name} com {trabalhador.concurrency} tarefas simultâneas")
+
+    parar = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sinal in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sinal, parar.set)
+    await parar.wait()
+
+    await trabalhador.stop(get_settings().GRACEFUL_SHUTDOWN_TIMEOUT)
+    await dispose_engines()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    migracao = comandos.add_parser(
+        "migrate", help="Cria as tabelas e índices que ainda não existem"
+    )
+    migracao.set_defaults(executar=migrate)
+
+    gerar = comandos.add_parser(
+        "gerar-recorrencias", help="Gera as despesas das regras de recorrência"
+    )
+    gerar.add_argument(
+        "--horizonte", type=date.fromisoformat, help="Data limite (padrão: hoje + 90 dias)"
+    )
+    gerar.add_argument("--batch-size", type=int, help="Regras por lote")
+    gerar.set_defaults(executar=gerar_recorrencias)
+
+    resumo = comandos.add_parser(
+        "rebuild-resumo", help="Recalcula o resumo mensal a partir das despesas"
+    )
+    resumo.add_argument("--user-id", type=int, help="Apenas um usuário")
+    resumo.add_argument(
+        "--check", action="store_true", help="Só lista as divergências, sem gravar"
+    )
+    resumo.set_defaults(executar=rebuild_resumo)
+
+    tarefas = comandos.add_parser(
+        "worker", help="Executa a fila de tarefas (tb_jobs) fora da API"
+    )
+    tarefas.add_argument(
+        "--concurrency", type=int, help="Tarefas simultâneas (padrão: JOB_CONCURRENCY)"
+    )
+    tarefas.set_defaults(executar=worker)
+
+    args = parser.parse_args()
+    asyncio.run(args.executar(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+import asyncio
+import json
+import math
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from time import monotonic
+from typing import Callable
+from urllib.parse import parse_qs
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+# Rotas que não passam pelo controle de admissão
+EXEMPT_PATHS = ("/documentation", "/recaudacao", "/api/openapi.json", "/metrics")
+# Cada LIMIT_COST_UNIT linhas pedidas em `limit` custam uma ficha a mais
+LIMIT_COST_UNIT = 100
+
+_atual: "AdmissionMiddleware | None" = None
+
+
+class RateLimitBackend(ABC):
+    # Interface para o estado do limitador; um backend compartilhado entre
+    # processos (ex.: Redis) deve implementar o mesmo método
+
+    def __init__(self):
+        self.allowed = 0
+        self.rejected = 0
+
+    @abstractmethod
+    async def hit(
+        self, key: str, rate: float, burst: int, cost: float = 1
+    ) -> tuple[bool, float, float]:
+        # Devolve (permitido, fichas restantes, segundos até haver fichas)
+        ...
+
+    def stats(self) -> dict[str, int]:
+        return {"allowed": self.allowed, "rejected": self.rejected}
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    # Token bucket por chave, mantido no próprio processo; as chaves menos
+    # usadas são descartadas acima de max_keys (o balde volta cheio)
+
+    def __init__(self, max_keys: int = 100_000):
+        super().__init__()
+        self.max_keys = max_keys
+        self.__baldes: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def hit(
+        self, key: str, rate: float, burst: int, cost: float = 1
+    ) -> tuple[bool, float, float]:
+        agora = monotonic()
+        fichas, ultimo = self.__baldes.pop(key, (burst, agora))
+        fichas = min(burst, fichas + (agora - ultimo) * rate)
+
+        permitido = fichas >= cost
+        espera = 0.0
+        if permitido:
+            fichas -= cost
+            self.allowed += 1
+        else:
+            espera = (cost - fichas) / rate
+            self.rejected += 1
+
+        self.__baldes[key] = (fichas, agora)
+        while len(self.__baldes) > self.max_keys:
+            self.__baldes.popitem(last=False)
+        return permitido, fichas, espera
+
+    def stats(self) -> dict[str, int]:
+        return {**super().stats(), "keys": len(self.__baldes)}
+
+
+class ConcurrencyLimit:
+    # Vagas para requisições simultâneas; quem não consegue vaga dentro de
+    # `timeout` é recusado em vez de esperar por uma conexão do pool
+
+    def __init__(self, limite: int):
+        self.limite = limite
+        self.in_flight = 0
+        self.rejected = 0
+        self.__vagas = asyncio.Semaphore(limite)
+
+    async def acquire(self, timeout: float) -> bool:
+        if not self.__vagas.locked():
+            # Há vaga: o acquire não chega a esperar
+            await self.__vagas.acquire()
+        elif timeout <= 0:
+            self.rejected += 1
+            return False
+        else:
+            try:
+                await asyncio.wait_for(self.__vagas.acquire(), timeout)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                return False
+        self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self.__vagas.release()
+
+    def stats(self) -> dict[str, int]:
+        return {"limit": self.limite, "in_flight": self.in_flight, "rejected": self.rejected}
+
+
+def client_key(scope: Scope) -> str:
+    # A API não tem autenticação, então o cliente é identificado pelo IP
+    # (já resolvido pelo uvicorn a partir do X-Forwarded-For, apenas quando
+    # a conexão vem de FORWARDED_ALLOW_IPS). Com usuários autenticados,
+    # troque por key_func
+    cliente = scope.get("client")
+    return f"ip:{cliente[0] if cliente else 'desconhecido'}"
+
+
+def request_cost(scope: Scope) -> float:
+    # Listagens grandes consomem mais do balde que as consultas pequenas
+    parametros = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    try:
+        limite = int(parametros.get("limit", ["0"])[0])
+    except ValueError:
+        limite = 0
+    return 1 + max(0, limite) / LIMIT_COST_UNIT
+
+
+class AdmissionMiddleware:
+    # Recusa requisições antes do roteamento, ou seja, antes de abrir uma
+    # sessão ou pegar uma conexão do pool: 429 quando o cliente estoura o
+    # token bucket e 503 quando o processo (ou a rota) já está no limite de
+    # requisições simultâneas
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: RateLimitBackend = None,
+        rate: float = 20.0,
+        burst: int = 40,
+        max_in_flight: int = None,
+        route_limits: dict[str, int] = None,
+        queue_timeout: float = 0.1,
+        key_func: Callable[[Scope], str] = client_key,
+        cost_func: Callable[[Scope], float] = request_cost,
+        exempt: tuple[str, ...] = EXEMPT_PATHS,
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.rate = rate
+        self.burst = burst
+        self.queue_timeout = queue_timeout
+        self.key_func = key_func
+        self.cost_func = cost_func
+        self.exempt = exempt
+        self.global_limit = ConcurrencyLimit(max_in_flight) if max_in_flight else None
+        # Padrões no estilo glob, comparados com o caminho (ex.: /despesas/user/*/export)
+        self.route_limits = {
+            padrao: ConcurrencyLimit(limite)
+            for padrao, limite in (route_limits or {}).items()
+        }
+        global _atual
+        _atual = self
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        caminho = scope.get("path", "")
+        if scope["type"] != "http" or caminho.startswith(self.exempt):
+            await self.app(scope, receive, send)
+            return
+
+        if self.limiter is not None:
+            permitido, _, espera = await self.limiter.hit(
+                self.key_func(scope),
+                self.rate,
+                self.burst,
+                # Acima do burst a requisição nunca passaria
+                min(self.cost_func(scope), self.burst),
+            )
+            if not permitido:
+                await self._recusar(
+                    send,
+                    429,
+                    "Muitas requisições. Tente novamente em instantes.",
+                    espera,
+                    {"X-RateLimit-Limit": str(self.burst), "X-RateLimit-Remaining": "0"},
+                )
+                return
+
+        limites = [
+            limite
+            for padrao, limite in self.route_limits.items()
+            if fnmatchcase(caminho, padrao)
+        ]
+        if self.global_limit is not None:
+            limites.append(self.global_limit)
+
+        adquiridos = []
+        for limite in limites:
+            if not await limite.acquire(self.queue_timeout):
+                for vaga in adquiridos:
+                    vaga.release()
+                await self._recusar(
+                    send, 503, "Servidor sobrecarregado. Tente novamente em instantes.", 1
+                )
+                return
+            adquiridos.append(limite)
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            for vaga in adquiridos:
+                vaga.release()
+
+    def stats(self) -> dict:
+        return {
+            "rate_limit": self.limiter.stats() if self.limiter is not None else None,
+            "in_flight": self.global_limit.stats() if self.global_limit else None,
+            "routes": {
+                padrao: limite.stats() for padrao, limite in self.route_limits.items()
+            },
+        }
+
+    async def _recusar(
+        self, send: Send, status: int, detalhe: str, espera: float, headers: dict = None
+    ) -> None:
+        corpo = json.dumps({"detail": detalhe}).encode()
+        cabecalhos = {
+            "content-type": "application/json",
+            "content-length": str(len(corpo)),
+            "retry-after": str(max(1, math.ceil(espera))),
+            **{chave.lower(): valor for chave, valor in (headers or {}).items()},
+        }
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (chave.encode(), valor.encode()) for chave, valor in cabecalhos.items()
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": corpo})
+
+
+def admission_stats() -> dict | None:
+    return _atual.stats() if _atual is not None else None
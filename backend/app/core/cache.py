@@ -0,0 +1,165 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Iterable
+
+from app.core.settings import get_settings
+
+
+class CacheBackend(ABC):
+    # Interface para backends de cache; um backend compartilhado (ex.: Redis)
+    # deve implementar os mesmos métodos, serializando os valores como preferir
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # Incrementado a cada invalidação; evita gravar leituras que
+        # começaram antes de uma escrita concorrente
+        self.version = 0
+
+    @abstractmethod
+    async def get(self, key: str) -> Any | None: ...
+
+    @abstractmethod
+    async def set(
+        self, key: str, value: Any, tags: Iterable[str] = (), since: int = None
+    ) -> None: ...
+
+    @abstractmethod
+    async def invalidate(self, *tags: str) -> None: ...
+
+    @abstractmethod
+    async def clear(self) -> None: ...
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+class NullCache(CacheBackend):
+
+    async def get(self, key: str) -> Any | None:
+        self.misses += 1
+        return None
+
+    async def set(
+        self, key: str, value: Any, tags: Iterable[str] = (), since: int = None
+    ) -> None:
+        pass
+
+    async def invalidate(self, *tags: str) -> None:
+        self.invalidations += 1
+        self.version += 1
+
+    async def clear(self) -> None:
+        pass
+
+
+class MemoryCache(CacheBackend):
+    # LRU com expiração por TTL, mantido no próprio processo
+
+    def __init__(self, max_items: int = 10_000, ttl: float = 30.0):
+        super().__init__()
+        self.max_items = max_items
+        self.ttl = ttl
+        self.evictions = 0
+        self.__itens: OrderedDict[str, tuple[float, Any, tuple[str, ...]]] = (
+            OrderedDict()
+        )
+        self.__tags: dict[str, set[str]] = {}
+
+    async def get(self, key: str) -> Any | None:
+        item = self.__itens.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+
+        expira, valor, _ = item
+        if expira < monotonic():
+            self.__remover(key)
+            self.misses += 1
+            return None
+
+        self.__itens.move_to_end(key)
+        self.hits += 1
+        return valor
+
+    async def set(
+        self, key: str, value: Any, tags: Iterable[str] = (), since: int = None
+    ) -> None:
+        if since is not None and since != self.version:
+            return
+
+        if key in self.__itens:
+            self.__remover(key)
+
+        tags = tuple(tags)
+        self.__itens[key] = (monotonic() + self.ttl, value, tags)
+        for tag in tags:
+            self.__tags.setdefault(tag, set()).add(key)
+
+        while len(self.__itens) > self.max_items:
+            self.__remover(next(iter(self.__itens)))
+            self.evictions += 1
+
+    async def invalidate(self, *tags: str) -> None:
+        self.invalidations += 1
+        self.version += 1
+        for tag in tags:
+            for key in self.__tags.pop(tag, ()):
+                self.__remover(key)
+
+    async def clear(self) -> None:
+        self.__itens.clear()
+        self.__tags.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            **super().stats(),
+            "evictions": self.evictions,
+            "size": len(self.__itens),
+        }
+
+    def __remover(self, key: str) -> None:
+        item = self.__itens.pop(key, None)
+        if item is None:
+            return
+
+        for tag in item[2]:
+            chaves = self.__tags.get(tag)
+            if chaves is not None:
+                chaves.discard(key)
+                if not chaves:
+                    del self.__tags[tag]
+
+
+def _criar_cache() -> CacheBackend:
+    settings = get_settings()
+    if not settings.CACHE_ENABLED:
+        return NullCache()
+    if (settings.WEB_CONCURRENCY or 1) > 1:
+        # Cada worker teria o próprio MemoryCache, e uma escrita só invalida
+        # o do processo que a atendeu: os demais serviriam dados antigos até
+        # o TTL. Com vários workers, instale um backend compartilhado com
+        # set_cache
+        return NullCache()
+    return MemoryCache(settings.CACHE_MAX_ITEMS, settings.CACHE_TTL)
+
+
+_cache: CacheBackend | None = None
+
+
+def get_cache() -> CacheBackend:
+    global _cache
+    if _cache is None:
+        _cache = _criar_cache()
+    return _cache
+
+
+def set_cache(backend: CacheBackend | None) -> None:
+    global _cache
+    _cache = backend
@@ -0,0 +1,37 @@
+import hashlib
+
+from fastapi import Request, Response
+
+
+# Os clientes podem guardar a resposta, mas precisam revalidá-la a cada uso
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*partes) -> str:
+    # ETag fraco: o mesmo conteúdo pode ir com ou sem compressão
+    chave = "\x1f".join(str(parte) for parte in partes)
+    return f'W/"{hashlib.blake2b(chave.encode(), digest_size=12).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    cabecalho = request.headers.get("if-none-match")
+    if not cabecalho:
+        return False
+    if cabecalho.strip() == "*":
+        return True
+
+    # Comparação fraca: o prefixo W/ é ignorado dos dois lados
+    alvo = etag.removeprefix("W/")
+    return any(
+        valor.strip().removeprefix("W/") == alvo for valor in cabecalho.split(",")
+    )
+
+
+def etag_headers(etag: str | None) -> dict[str, str]:
+    if etag is None:
+        return {}
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=etag_headers(etag))
@@ -1,18 +1,322 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+import asyncio
+from itertools import cycle
+from time import perf_counter, time
+from typing import Any, Callable
+
+from starlette.requests import Request
+from starlette.responses import Response
+from sqlalchemy import (
+    ForeignKeyConstraint,
+    UniqueConstraint,
+    event,
+    exc,
+    inspect,
+    text,
+)
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
-from app.core.settings import Settings
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.schema import AddConstraint, CreateColumn
+from app.core.instrumentation import instrument_engine, record_pool_wait
+from app.core.settings import Settings, get_settings
+
+
+class PoolStats:
+    def __init__(self):
+        self.connects = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def registrar_espera(self, segundos: float) -> None:
+        self.checkouts += 1
+        self.wait_total += segundos
+        self.wait_max = max(self.wait_max, segundos)
+
+    def snapshot(self, pool) -> dict[str, Any]:
+        dados = {
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_total_ms": round(self.wait_total * 1000, 3),
+            "wait_avg_ms": round(self.wait_total * 1000 / (self.checkouts or 1), 3),
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+        }
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            dados.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=pool.overflow(),
+            )
+        return dados
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    # Mede o tempo que cada requisição espera por uma conexão do pool
+    def connect(self):
+        inicio = perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            pool_stats.timeouts += 1
+            raise
+        finally:
+            espera = perf_counter() - inicio
+            pool_stats.registrar_espera(espera)
+            record_pool_wait(espera)
+
+
+def engine_options(settings: Settings, database_url: str = None) -> dict[str, Any]:
+    url = make_url(database_url or settings.DATABASE_URL)
+    opcoes: dict[str, Any] = {
+        "echo": settings.DB_ECHO,
+        "query_cache_size": settings.DB_QUERY_CACHE_SIZE,
+    }
+
+    # SQLite em memória usa um pool estático, sem opções de dimensionamento
+    if url.get_backend_name() != "sqlite" or url.database not in (None, "", ":memory:"):
+        opcoes.update(
+            poolclass=InstrumentedPool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
 
+    if url.get_driver_name() == "asyncpg":
+        # Cache de prepared statements mantido pelo asyncpg em cada conexão
+        opcoes["connect_args"] = {
+            "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE
+        }
+        if settings.DB_STATEMENT_TIMEOUT:
+            opcoes["connect_args"]["server_settings"] = {
+                "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT)
+            }
 
-DATABASE_URL = Settings().DATABASE_URL
+    return opcoes
 
 
 Base = declarative_base()
-engine = create_async_engine(DATABASE_URL, echo=True)
-SessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
 
 
-async def get_db():
-    async with SessionLocal() as session:
+def _contar_conexao(dbapi_connection, connection_record):
+    pool_stats.connects += 1
+
+
+class ReplicaRouter:
+    # Escolhe a réplica de leitura de cada sessão: em rodízio ou pela que tem
+    # menos conexões em uso no pool deste processo
+    def __init__(self, urls: list[str], strategy: str, settings: Settings):
+        self.strategy = strategy
+        self.engines: list[AsyncEngine] = []
+        self.sessions: dict[AsyncEngine, sessionmaker] = {}
+        for url in urls:
+            replica = create_async_engine(url, **engine_options(settings, url))
+            instrument_engine(replica)
+            self.engines.append(replica)
+            self.sessions[replica] = sessionmaker(
+                bind=replica, class_=AsyncSession, expire_on_commit=False
+            )
+        self.__rodizio = cycle(self.engines)
+
+    def choose(self) -> AsyncEngine:
+        if self.strategy == "least_connections":
+            return min(self.engines, key=lambda replica: replica.pool.checkedout())
+        return next(self.__rodizio)
+
+    def session(self) -> AsyncSession:
+        return self.sessions[self.choose()]()
+
+
+def _replica_router(settings: Settings) -> ReplicaRouter | None:
+    urls = [url.strip() for url in settings.DATABASE_READ_URLS.split(",") if url.strip()]
+    if not urls:
+        return None
+    return ReplicaRouter(urls, settings.DB_READ_STRATEGY, settings)
+
+
+class Database:
+    # Engine do primário, fábrica de sessões e réplicas de um processo
+    def __init__(self, settings: Settings):
+        self.engine = create_async_engine(
+            settings.DATABASE_URL, **engine_options(settings)
+        )
+        instrument_engine(self.engine)
+        event.listen(self.engine.sync_engine, "connect", _contar_conexao)
+        self.sessions = sessionmaker(
+            bind=self.engine, class_=AsyncSession, expire_on_commit=False
+        )
+        self.replicas = _replica_router(settings)
+
+    def session(self) -> AsyncSession:
+        return self.sessions()
+
+    def all_engines(self) -> list[AsyncEngine]:
+        return [self.engine, *(self.replicas.engines if self.replicas else [])]
+
+
+_database: Database | None = None
+
+
+def get_database() -> Database:
+    # Criado no primeiro uso, e não na importação: o driver do banco só é
+    # carregado quando a aplicação (ou o comando) realmente precisa dele
+    global _database
+    if _database is None:
+        _database = Database(get_settings())
+    return _database
+
+
+def set_database(database: Database | None) -> None:
+    global _database
+    _database = database
+
+
+def get_engine() -> AsyncEngine:
+    return get_database().engine
+
+
+def all_engines() -> list[AsyncEngine]:
+    return get_database().all_engines()
+
+
+def get_pool_stats() -> dict[str, Any]:
+    replicas = get_database().replicas
+    dados = pool_stats.snapshot(get_engine().pool)
+    if replicas:
+        dados["replicas"] = [
+            {
+                "host": replica.url.host or replica.url.database,
+                "checked_out": replica.pool.checkedout(),
+            }
+            for replica in replicas.engines
+        ]
+    return dados
+
+
+async def create_schema() -> None:
+    # Importa os modelos para registrar todas as tabelas em Base.metadata
+    import app.model  # noqa: F401
+
+    async with get_engine().begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # Serializa migrações disparadas ao mesmo tempo por várias instâncias
+            await conn.execute(
+                text("SELECT pg_advisory_xact_lock(hashtext('create_schema'))")
+            )
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
+        await conn.run_sync(_add_missing_constraints)
+        await conn.run_sync(_create_missing_indexes)
+
+
+def _add_missing_columns(conn) -> None:
+    # Colunas acrescentadas a tabelas que já existiam (a recorrência em
+    # tb_despesas, por exemplo) entram com o server_default do modelo, que
+    # preenche as linhas antigas. O SQLite não aceita ADD COLUMN IF NOT
+    # EXISTS; nos dois casos só as colunas ausentes no inspetor são criadas
+    inspetor = inspect(conn)
+    condicao = "IF NOT EXISTS " if conn.dialect.name == "postgresql" else ""
+    for tabela in Base.metadata.sorted_tables:
+        existentes = {coluna["name"] for coluna in inspetor.get_columns(tabela.name)}
+        for coluna in tabela.columns:
+            if coluna.name in existentes:
+                continue
+            definicao = CreateColumn(coluna).compile(dialect=conn.dialect)
+            conn.execute(
+                text(f"ALTER TABLE {tabela.name} ADD COLUMN {condicao}{definicao}")
+            )
+
+
+def _add_missing_constraints(conn) -> None:
+    # Restrições nomeadas das colunas acrescentadas depois (a recorrência das
+    # despesas). O SQLite não tem ALTER TABLE ADD CONSTRAINT: lá a unicidade
+    # vira um índice único e a chave estrangeira fica de fora
+    inspetor = inspect(conn)
+    sqlite = conn.dialect.name == "sqlite"
+    for tabela in Base.metadata.sorted_tables:
+        existentes = {
+            item["name"]
+            for item in (
+                *inspetor.get_foreign_keys(tabela.name),
+                *inspetor.get_unique_constraints(tabela.name),
+                *inspetor.get_indexes(tabela.name),
+            )
+        }
+        for restricao in tabela.constraints:
+            if restricao.name is None or restricao.name in existentes:
+                continue
+            if isinstance(restricao, UniqueConstraint) and sqlite:
+                colunas = ", ".join(restricao.columns.keys())
+                conn.execute(
+                    text(
+                        f"CREATE UNIQUE INDEX {restricao.name} "
+                        f"ON {tabela.name} ({colunas})"
+                    )
+                )
+            elif isinstance(restricao, UniqueConstraint) or (
+                isinstance(restricao, ForeignKeyConstraint) and not sqlite
+            ):
+                conn.execute(AddConstraint(restricao))
+
+
+def _create_missing_indexes(conn) -> None:
+    # O create_all pula as tabelas que já existem e, com elas, os índices
+    # declarados depois da criação; aqui cada índice é criado se ainda não
+    # existir, respeitando o ddl_if (os de trigrama são só do Postgres, e a
+    # extensão pg_trgm já foi criada pelo before_create do create_all)
+    for tabela in Base.metadata.sorted_tables:
+        for indice in tabela.indexes:
+            indice.create(conn, checkfirst=True)
+
+
+async def warm_pool(conexoes: int) -> None:
+    # Abre as conexões em paralelo para que fiquem todas no pool ao final
+    async def abrir(alvo: AsyncEngine):
+        async with alvo.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(
+        *(abrir(alvo) for alvo in all_engines() for _ in range(conexoes))
+    )
+
+
+async def dispose_engines() -> None:
+    for alvo in all_engines():
+        await alvo.dispose()
+
+
+# Cookie que mantém as leituras do cliente no primário logo após uma escrita,
+# enquanto as réplicas ainda podem não ter recebido a alteração
+STICKY_COOKIE = "db_primary_until"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+# Marcas em session.info lidas pelo cache dos services: o que vem de uma
+# réplica pode estar atrasado e não é gravado, e um cliente que escreveu há
+# pouco não lê do cache
+SESSION_REPLICA = "replica"
+SESSION_STICKY = "sticky"
+
+
+async def get_db(request: Request = None, response: Response = None):
+    if request is not None and response is not None and get_database().replicas:
+        if request.method not in SAFE_METHODS:
+            sticky = get_settings().DB_READ_STICKY_SECONDS
+            response.set_cookie(
+                STICKY_COOKIE,
+                str(int(time()) + sticky),
+                max_age=sticky,
+                httponly=True,
+                samesite="lax",
+            )
+
+    async with get_database().session() as session:
         try:
             yield session
         except Exception as e:
@@ -20,3 +324,37 @@ async def get_db():
             raise e
         finally:
             await session.close()
+
+
+def get_session_factory() -> Callable[[], AsyncSession]:
+    # Para quem abre as próprias sessões fora do ciclo da dependência (ex.:
+    # respostas em streaming); pode ser trocado em dependency_overrides
+    return get_database().session
+
+
+async def get_read_db(request: Request = None):
+    # Sessão para rotas só de leitura: vai a uma réplica, a menos que o
+    # cliente tenha escrito há pouco (cookie de read-your-writes)
+    database = get_database()
+    sticky = request is not None and _is_sticky(request)
+    primario = database.replicas is None or sticky
+
+    async with (
+        database.session() if primario else database.replicas.session()
+    ) as session:
+        session.info[SESSION_REPLICA] = not primario
+        session.info[SESSION_STICKY] = sticky
+        try:
+            yield session
+        except Exception as e:
+            await session.rollback()
+            raise e
+        finally:
+            await session.close()
+
+
+def _is_sticky(request: Request) -> bool:
+    try:
+        return int(request.cookies.get(STICKY_COOKIE, 0)) > time()
+    except ValueError:
+        return False
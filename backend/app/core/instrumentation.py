@@ -0,0 +1,220 @@
+import logging
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+logger = logging.getLogger(__name__)
+
+# Limites superiores (em ms e em quantidade de consultas) dos histogramas
+LATENCY_BUCKETS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self.pool_wait = 0.0
+        self.statements: Counter[str] = Counter()
+
+    def server_timing(self, total: float) -> str:
+        return ", ".join(
+            [
+                f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} queries, {self.rows} rows"',
+                f"pool;dur={self.pool_wait * 1000:.2f}",
+                f"total;dur={total * 1000:.2f}",
+            ]
+        )
+
+
+_atual: ContextVar[RequestMetrics | None] = ContextVar("request_metrics", default=None)
+
+
+def current_metrics() -> RequestMetrics | None:
+    return _atual.get()
+
+
+def record_pool_wait(segundos: float) -> None:
+    metricas = _atual.get()
+    if metricas is not None:
+        metricas.pool_wait += segundos
+
+
+def instrument_engine(engine) -> None:
+    alvo = getattr(engine, "sync_engine", engine)
+
+    # O início fica no contexto da execução, e não na conexão: um statement
+    # que falha não chega ao after_cursor_execute e não deixa sobras no pool
+    @event.listens_for(alvo, "before_cursor_execute")
+    def _inicio(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_start = perf_counter()
+
+    @event.listens_for(alvo, "after_cursor_execute")
+    def _fim(conn, cursor, statement, parameters, context, executemany):
+        metricas = _atual.get()
+        if metricas is None:
+            return
+        inicio = context._metrics_start
+
+        metricas.queries += 1
+        metricas.db_time += perf_counter() - inicio
+        if statement.lstrip()[:6].upper() == "SELECT":
+            metricas.statements[statement] += 1
+        # O SQLite não informa a quantidade de linhas de um SELECT (-1)
+        if cursor.rowcount > 0:
+            metricas.rows += cursor.rowcount
+
+
+class _Histogram:
+    def __init__(self, limites: tuple[float, ...]):
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)
+        self.soma = 0.0
+        self.total = 0
+
+    def observe(self, valor: float) -> None:
+        self.contagens[bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        rotulos = [str(limite) for limite in self.limites] + ["+Inf"]
+        return {
+            "count": self.total,
+            "sum": round(self.soma, 3),
+            "buckets": dict(zip(rotulos, self.contagens)),
+        }
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.rows = 0
+        self.db_time = 0.0
+        self.pool_wait = 0.0
+        self.budget_exceeded = 0
+        self.latency_ms = _Histogram(LATENCY_BUCKETS)
+        self.db_time_ms = _Histogram(LATENCY_BUCKETS)
+        self.queries_per_request = _Histogram(QUERY_BUCKETS)
+
+    def observe(self, metricas: RequestMetrics, total: float) -> None:
+        self.requests += 1
+        self.queries += metricas.queries
+        self.rows += metricas.rows
+        self.db_time += metricas.db_time
+        self.pool_wait += metricas.pool_wait
+        self.latency_ms.observe(total * 1000)
+        self.db_time_ms.observe(metricas.db_time * 1000)
+        self.queries_per_request.observe(metricas.queries)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "queries": self.queries,
+            "rows": self.rows,
+            "db_time_ms": round(self.db_time * 1000, 3),
+            "pool_wait_ms": round(self.pool_wait * 1000, 3),
+            "budget_exceeded": self.budget_exceeded,
+            "histograms": {
+                "latency_ms": self.latency_ms.to_dict(),
+                "db_time_ms": self.db_time_ms.to_dict(),
+                "queries_per_request": self.queries_per_request.to_dict(),
+            },
+        }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.routes: dict[str, RouteMetrics] = {}
+
+    def observe(self, rota: str, metricas: RequestMetrics, total: float) -> RouteMetrics:
+        registro = self.routes.setdefault(rota, RouteMetrics())
+        registro.observe(metricas, total)
+        return registro
+
+    def snapshot(self) -> dict[str, Any]:
+        return {rota: dados.to_dict() for rota, dados in sorted(self.routes.items())}
+
+    def clear(self) -> None:
+        self.routes.clear()
+
+
+registry = MetricsRegistry()
+
+
+class QueryMetricsMiddleware:
+    # Mede as consultas de cada requisição, devolve os números no cabeçalho
+    # Server-Timing e acumula histogramas por rota. No modo estrito, estourar
+    # o orçamento de consultas ou repetir o mesmo SELECT várias vezes
+    # (indício de N+1) gera uma exceção, o que faz os testes falharem
+    def __init__(
+        self,
+        app: ASGIApp,
+        query_budget: int = None,
+        n_plus_one_threshold: int = None,
+        strict: bool = False,
+    ):
+        self.app = app
+        self.query_budget = query_budget
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.strict = strict
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metricas = RequestMetrics()
+        token = _atual.set(metricas)
+        inicio = perf_counter()
+
+        async def enviar(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", metricas.server_timing(perf_counter() - inicio))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _atual.reset(token)
+            rota = scope.get("route")
+            rota = f"{scope['method']} {rota.path if rota else 'unmatched'}"
+            registro = registry.observe(rota, metricas, perf_counter() - inicio)
+
+        problemas = self._verificar(metricas)
+        if problemas:
+            registro.budget_exceeded += 1
+            mensagem = f"{rota}: {'; '.join(problemas)}"
+            if self.strict:
+                raise QueryBudgetExceeded(mensagem)
+            logger.warning(mensagem)
+
+    def _verificar(self, metricas: RequestMetrics) -> list[str]:
+        problemas = []
+        if self.query_budget is not None and metricas.queries > self.query_budget:
+            problemas.append(
+                f"{metricas.queries} consultas, acima do orçamento de {self.query_budget}"
+            )
+
+        if self.n_plus_one_threshold and metricas.statements:
+            statement, repeticoes = metricas.statements.most_common(1)[0]
+            if repeticoes >= self.n_plus_one_threshold:
+                problemas.append(
+                    f"possível N+1: statement repetido {repeticoes} vezes: "
+                    f"{' '.join(statement.split())[:200]}"
+                )
+        return problemas
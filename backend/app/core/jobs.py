@@ -0,0 +1,299 @@
+import asyncio
+import logging
+import os
+import socket
+from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_session_factory
+from app.core.settings import get_settings
+from app.repository.job import JobRepository
+from app.schema.job import JobOutputSchema
+
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[AsyncSession, BaseModel], Awaitable[Any]]
+
+# Tarefas conhecidas: tipo -> (handler, schema do payload)
+handlers: dict[str, tuple[JobHandler, type[BaseModel]]] = {}
+
+_jsonable = TypeAdapter(Any)
+
+# Tarefa sendo executada pelo handler atual (ex.: para chaves de idempotência)
+_atual: ContextVar[JobOutputSchema | None] = ContextVar("job", default=None)
+
+
+def current_job() -> JobOutputSchema | None:
+    return _atual.get()
+
+
+def job_handler(tipo: str, schema: type[BaseModel]):
+    def registrar(handler: JobHandler) -> JobHandler:
+        handlers[tipo] = (handler, schema)
+        return handler
+
+    return registrar
+
+
+def validate_payload(tipo: str, payload: dict) -> dict:
+    # Valida na hora de enfileirar, para o erro voltar na própria requisição
+    if tipo not in handlers:
+        raise ValueError(
+            f"Tarefa desconhecida: {tipo}. Disponíveis: {', '.join(sorted(handlers))}"
+        )
+    _, schema = handlers[tipo]
+    return schema.model_validate(payload).model_dump(mode="json")
+
+
+def _agora() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobBackend(ABC):
+    # Interface para o armazenamento da fila; um broker externo (ex.: Redis)
+    # deve implementar os mesmos métodos
+
+    @abstractmethod
+    async def enqueue(
+        self, tipo: str, payload: dict, max_tentativas: int
+    ) -> JobOutputSchema: ...
+
+    @abstractmethod
+    async def get(self, id: int) -> JobOutputSchema: ...
+
+    @abstractmethod
+    async def claim(self, worker: str, lease: float) -> JobOutputSchema | None: ...
+
+    @abstractmethod
+    async def heartbeat(self, id: int, worker: str, lease: float) -> bool: ...
+
+    @abstractmethod
+    async def complete(self, id: int, worker: str, resultado: Any) -> None: ...
+
+    @abstractmethod
+    async def fail(
+        self, id: int, worker: str, erro: str, retry_in: float = None
+    ) -> None: ...
+
+    async def wait(self, timeout: float) -> None:
+        # Espera por novas tarefas; sem notificação, apenas aguarda o intervalo
+        await asyncio.sleep(timeout)
+
+
+class DatabaseJobBackend(JobBackend):
+    # Fila durável na tabela tb_jobs do próprio banco da aplicação
+
+    def __init__(self, session_factory=None):
+        self.session_factory = session_factory or get_session_factory()
+        self.__novas = asyncio.Event()
+
+    async def enqueue(
+        self, tipo: str, payload: dict, max_tentativas: int
+    ) -> JobOutputSchema:
+        agora = _agora()
+        async with self.session_factory() as db:
+            busca = await JobRepository(db).create(
+                tipo=tipo,
+                status="pendente",
+                payload=payload,
+                tentativas=0,
+                max_tentativas=max_tentativas,
+                disponivel_em=agora,
+                criado_em=agora,
+            )
+        # Acorda os workers deste processo; os demais acham a tarefa no
+        # próximo intervalo de consulta
+        self.__novas.set()
+        return JobOutputSchema.model_validate(busca)
+
+    async def get(self, id: int) -> JobOutputSchema:
+        async with self.session_factory() as db:
+            busca = await JobRepository(db).get_by_id(id)
+        return JobOutputSchema.model_validate(busca)
+
+    async def claim(self, worker: str, lease: float) -> JobOutputSchema | None:
+        agora = _agora()
+        async with self.session_factory() as db:
+            busca = await JobRepository(db).claim(
+                worker, agora, agora + timedelta(seconds=lease)
+            )
+        return None if busca is None else JobOutputSchema.model_validate(busca)
+
+    async def heartbeat(self, id: int, worker: str, lease: float) -> bool:
+        async with self.session_factory() as db:
+            return await JobRepository(db).heartbeat(
+                id, worker, _agora() + timedelta(seconds=lease)
+            )
+
+    async def complete(self, id: int, worker: str, resultado: Any) -> None:
+        async with self.session_factory() as db:
+            await JobRepository(db).finish(id, worker, resultado, _agora())
+
+    async def fail(self, id: int, worker: str, erro: str, retry_in: float = None) -> None:
+        agora = _agora()
+        retry_em = None if retry_in is None else agora + timedelta(seconds=retry_in)
+        async with self.session_factory() as db:
+            await JobRepository(db).fail(id, worker, erro, agora, retry_em)
+
+    async def wait(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self.__novas.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self.__novas.clear()
+
+
+class JobWorker:
+    # Executa as tarefas da fila em `concurrency` corrotinas do próprio
+    # processo. Falhas são repetidas com espera exponencial até
+    # max_tentativas; enquanto roda, a tarefa tem o lease renovado, e se o
+    # processo cair ela volta para a fila quando o lease expirar
+    def __init__(
+        self,
+        backend: JobBackend,
+        concurrency: int = 2,
+        lease: float = 300.0,
+        poll_interval: float = 1.0,
+        retry_backoff: float = 5.0,
+        session_factory=None,
+    ):
+        self.backend = backend
+        self.concurrency = concurrency
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.retry_backoff = retry_backoff
+        self.session_factory = session_factory or get_session_factory()
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self.__parando = False
+        self.__tarefas: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        self.__parando = False
+        self.__tarefas = [
+            asyncio.create_task(self._loop(), name=f"job-worker-{numero}")
+            for numero in range(self.concurrency)
+        ]
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        # Deixa as tarefas em andamento terminarem; as que estourarem o prazo
+        # são canceladas e voltam para a fila quando o lease expirar
+        self.__parando = True
+        if not self.__tarefas:
+            return
+
+        _, pendentes = await asyncio.wait(self.__tarefas, timeout=timeout)
+        for tarefa in pendentes:
+            tarefa.cancel()
+        await asyncio.gather(*pendentes, return_exceptions=True)
+        self.__tarefas = []
+
+    async def _loop(self) -> None:
+        while not self.__parando:
+            try:
+                job = await self.backend.claim(self.name, self.lease)
+                if job is None:
+                    await self.backend.wait(self.poll_interval)
+                else:
+                    await self.run(job)
+            except Exception:
+                # Banco fora do ar, por exemplo; o worker continua tentando
+                logger.exception("Falha ao processar a fila de tarefas")
+                await asyncio.sleep(self.poll_interval)
+
+    async def run(self, job: JobOutputSchema) -> None:
+        if job.tentativas > job.max_tentativas:
+            # Abandonada por workers que caíram mais vezes que o permitido
+            await self.backend.fail(job.id, self.name, job.erro or "Tentativas esgotadas.")
+            return
+
+        if job.tipo not in handlers:
+            await self.backend.fail(job.id, self.name, f"Tarefa desconhecida: {job.tipo}")
+            return
+
+        handler, schema = handlers[job.tipo]
+        token = _atual.set(job)
+        try:
+            execucao = asyncio.create_task(self._execute(handler, schema, job))
+        finally:
+            _atual.reset(token)
+        renovar = asyncio.create_task(self._heartbeat(job.id, execucao))
+        try:
+            resultado = await execucao
+        except asyncio.CancelledError:
+            if not renovar.done():
+                raise  # O próprio worker foi cancelado (ex.: stop)
+            # Lease perdido: outro worker pode já ter pegado a tarefa, e a
+            # conclusão (ou a falha) fica por conta dele
+            logger.warning("Tarefa %s (%s) interrompida: lease perdido", job.id, job.tipo)
+        except Exception as error:
+            logger.exception("Tarefa %s (%s) falhou", job.id, job.tipo)
+            retry_in = None
+            if job.tentativas < job.max_tentativas:
+                retry_in = self.retry_backoff * 2 ** (job.tentativas - 1)
+            await self.backend.fail(
+                job.id, self.name, f"{type(error).__name__}: {error}", retry_in
+            )
+        else:
+            await self.backend.complete(
+                job.id, self.name, _jsonable.dump_python(resultado, mode="json")
+            )
+        finally:
+            renovar.cancel()
+
+    async def _execute(
+        self, handler: JobHandler, schema: type[BaseModel], job: JobOutputSchema
+    ) -> Any:
+        async with self.session_factory() as db:
+            return await handler(db, schema.model_validate(job.payload))
+
+    async def _heartbeat(self, id: int, execucao: asyncio.Task) -> None:
+        # Renova o lease enquanto a tarefa roda. Se ele foi perdido (renovação
+        # recusada, ou falhando por mais tempo que o lease), outro worker pode
+        # pegar a tarefa: a execução daqui é cancelada
+        loop = asyncio.get_running_loop()
+        renovado = loop.time()
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                if await self.backend.heartbeat(id, self.name, self.lease):
+                    renovado = loop.time()
+                    continue
+                logger.warning("Lease da tarefa %s perdido", id)
+            except Exception:
+                logger.exception("Falha ao renovar o lease da tarefa %s", id)
+                if loop.time() - renovado < self.lease:
+                    continue
+            execucao.cancel()
+            return
+
+
+_backend: JobBackend | None = None
+
+
+def get_job_backend() -> JobBackend:
+    global _backend
+    if _backend is None:
+        _backend = DatabaseJobBackend()
+    return _backend
+
+
+def set_job_backend(backend: JobBackend) -> None:
+    global _backend
+    _backend = backend
+
+
+def create_job_worker(concurrency: int = None) -> JobWorker:
+    settings = get_settings()
+    return JobWorker(
+        get_job_backend(),
+        concurrency=concurrency or settings.JOB_CONCURRENCY,
+        lease=settings.JOB_LEASE_SECONDS,
+        poll_interval=settings.JOB_POLL_INTERVAL,
+        retry_backoff=settings.JOB_RETRY_BACKOFF,
+    )
@@ -0,0 +1,37 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date, datetime
+from decimal import InvalidOperation
+from typing import Any
+
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+def _serializar(valor: Any) -> str:
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    return str(valor)
+
+
+def encode_cursor(valores: list[Any]) -> str:
+    dados = json.dumps(valores, separators=(",", ":"), default=_serializar)
+    return urlsafe_b64encode(dados.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, colunas: list[InstrumentedAttribute]) -> list[Any]:
+    try:
+        valores = json.loads(urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(valores, list) or len(valores) != len(colunas):
+            raise ValueError
+
+        convertidos = []
+        for coluna, valor in zip(colunas, valores):
+            tipo = coluna.type.python_type
+            if tipo in (date, datetime):
+                convertidos.append(tipo.fromisoformat(valor))
+            else:
+                convertidos.append(tipo(valor))
+        return convertidos
+    # Decimal("abc") levanta InvalidOperation, que não é ValueError
+    except (ValueError, TypeError, InvalidOperation):
+        raise ValueError("Cursor inválido.")
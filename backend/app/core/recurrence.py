@@ -0,0 +1,52 @@
+from calendar import monthrange
+from datetime import date, timedelta
+from typing import Iterator
+
+
+FREQUENCIAS = ("mensal", "semanal")
+
+
+def add_months(data: date, meses: int, dia: int = None) -> date:
+    # Mantém o dia de referência, limitado ao último dia do mês (31 -> 28/29/30)
+    total = data.year * 12 + data.month - 1 + meses
+    ano, mes = divmod(total, 12)
+    mes += 1
+    return date(ano, mes, min(dia or data.day, monthrange(ano, mes)[1]))
+
+
+def occurrences(
+    frequencia: str,
+    intervalo: int,
+    inicio: date,
+    ate: date,
+    fim: date = None,
+    depois_de: date = None,
+) -> Iterator[date]:
+    # Datas da regra entre `depois_de` (exclusivo) e min(ate, fim) (inclusivo)
+    limite = min(ate, fim) if fim else ate
+
+    if frequencia == "semanal":
+        passo = timedelta(weeks=intervalo)
+        atual = inicio
+        if depois_de is not None and depois_de >= inicio:
+            # Pula direto para a primeira ocorrência depois da marca
+            atual = inicio + passo * ((depois_de - inicio) // passo + 1)
+        while atual <= limite:
+            yield atual
+            atual += passo
+        return
+
+    if frequencia != "mensal":
+        raise ValueError(f"Frequência inválida: {frequencia}")
+
+    passo = 0
+    if depois_de is not None and depois_de >= inicio:
+        meses = (depois_de.year - inicio.year) * 12 + depois_de.month - inicio.month
+        passo = meses // intervalo * intervalo
+    while True:
+        atual = add_months(inicio, passo, inicio.day)
+        if atual > limite:
+            return
+        if depois_de is None or atual > depois_de:
+            yield atual
+        passo += intervalo
@@ -0,0 +1,111 @@
+import asyncio
+import hashlib
+import hmac
+import os
+from base64 import b64decode, b64encode
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.settings import get_settings
+
+
+PREFIXO = "scrypt"
+
+
+def hash_password(senha: str, n: int, r: int, p: int) -> str:
+    salt = os.urandom(16)
+    chave = _derivar(senha, salt, n, r, p)
+    return "$".join(
+        [PREFIXO, str(n), str(r), str(p), b64encode(salt).decode(), b64encode(chave).decode()]
+    )
+
+
+def verify_password(senha: str, armazenada: str) -> bool:
+    if not is_hashed(armazenada):
+        # Senhas gravadas antes do hash eram salvas como texto puro
+        return hmac.compare_digest(senha.encode(), armazenada.encode())
+
+    _, n, r, p, salt, chave = armazenada.split("$")
+    calculada = _derivar(senha, b64decode(salt), int(n), int(r), int(p))
+    return hmac.compare_digest(calculada, b64decode(chave))
+
+
+def is_hashed(armazenada: str) -> bool:
+    return armazenada.startswith(f"{PREFIXO}$") and armazenada.count("$") == 5
+
+
+def needs_rehash(armazenada: str, n: int, r: int, p: int) -> bool:
+    return not is_hashed(armazenada) or armazenada.split("$")[1:4] != [
+        str(n),
+        str(r),
+        str(p),
+    ]
+
+
+def _derivar(senha: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        senha.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r * p, dklen=32
+    )
+
+
+class PasswordHasher:
+    # O scrypt libera o GIL, então um pool de threads limitado tira o custo de
+    # CPU do event loop sem bloquear as demais requisições
+    def __init__(self, n: int, r: int, p: int, workers: int):
+        self.n = n
+        self.r = r
+        self.p = p
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hash"
+        )
+        self.__dummy: str | None = None
+
+    async def hash(self, senha: str) -> str:
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, hash_password, senha, self.n, self.r, self.p
+        )
+
+    async def verify(self, senha: str, armazenada: str) -> bool:
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, verify_password, senha, armazenada
+        )
+
+    async def dummy(self) -> str:
+        # Hash usado quando o usuário não existe, para igualar o tempo da
+        # verificação; calculado no pool, e não no event loop, no primeiro uso
+        if self.__dummy is None:
+            self.__dummy = await self.hash(os.urandom(16).hex())
+        return self.__dummy
+
+    def needs_rehash(self, armazenada: str) -> bool:
+        return needs_rehash(armazenada, self.n, self.r, self.p)
+
+
+_hasher: PasswordHasher | None = None
+
+
+def get_password_hasher() -> PasswordHasher:
+    global _hasher
+    if _hasher is None:
+        settings = get_settings()
+        _hasher = PasswordHasher(
+            settings.PASSWORD_HASH_N,
+            settings.PASSWORD_HASH_R,
+            settings.PASSWORD_HASH_P,
+            settings.PASSWORD_HASH_WORKERS,
+        )
+    return _hasher
+
+
+def set_password_hasher(hasher: PasswordHasher) -> None:
+    global _hasher
+    _hasher = hasher
+
+
+async def close_password_hasher() -> None:
+    # Aguarda os hashes em andamento numa thread, sem parar o event loop; um
+    # novo pool é criado no próximo uso
+    global _hasher
+    if _hasher is not None:
+        hasher, _hasher = _hasher, None
+        await asyncio.to_thread(hasher.executor.shutdown, wait=True)
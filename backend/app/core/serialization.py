@@ -0,0 +1,48 @@
+import csv
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from io import StringIO
+from typing import Any, Iterable, Sequence
+
+
+def to_jsonable(valor: Any) -> Any:
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return float(valor)
+    return valor
+
+
+def to_json(campos: Sequence[str], linhas: Iterable[Sequence[Any]]) -> bytes:
+    return json.dumps(
+        [
+            {campo: to_jsonable(valor) for campo, valor in zip(campos, linha)}
+            for linha in linhas
+        ],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def to_ndjson(campos: Sequence[str], linhas: Iterable[Sequence[Any]]) -> str:
+    return "".join(
+        json.dumps(
+            {campo: to_jsonable(valor) for campo, valor in zip(campos, linha)},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        + "\n"
+        for linha in linhas
+    )
+
+
+def to_csv(
+    campos: Sequence[str], linhas: Iterable[Sequence[Any]], cabecalho: bool = False
+) -> str:
+    saida = StringIO()
+    escritor = csv.writer(saida, lineterminator="\n")
+    if cabecalho:
+        escritor.writerow(campos)
+    escritor.writerows([to_jsonable(valor) for valor in linha] for linha in linhas)
+    return saida.getvalue()
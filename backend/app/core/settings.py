@@ -1,16 +1,153 @@
 from os.path import dirname, join
+from typing import Any, Literal
+
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 BASE_DIR = dirname(dirname(dirname(__file__)))
 
+# Valores padrão por ambiente, usados quando a variável não é informada
+ENV_DEFAULTS: dict[str, dict[str, Any]] = {
+    "producao": {
+        "DB_ECHO": False,
+        "DB_POOL_SIZE": 10,
+        "DB_MAX_OVERFLOW": 20,
+        "DB_STATEMENT_TIMEOUT": 30_000,
+        "DB_CREATE_SCHEMA_ON_STARTUP": False,
+    },
+    "desenvolvimento": {
+        "DB_ECHO": True,
+        "DB_POOL_SIZE": 5,
+        "DB_MAX_OVERFLOW": 5,
+        "DB_CREATE_SCHEMA_ON_STARTUP": True,
+    },
+    # Usado pelo app.core.testing: o schema é criado pelas fixtures, e cache,
+    # limites e worker ficam desligados para cada teste ver só os próprios dados
+    "teste": {
+        "DB_ECHO": False,
+        "DB_POOL_WARMUP": 0,
+        "DB_CREATE_SCHEMA_ON_STARTUP": False,
+        "CACHE_ENABLED": False,
+        "RATE_LIMIT_ENABLED": False,
+        "ADMISSION_ENABLED": False,
+        "JOB_WORKER_ENABLED": False,
+        "PASSWORD_HASH_N": 2**4,
+        "PASSWORD_HASH_WORKERS": 1,
+    },
+}
+
 
 class Settings(BaseSettings):
     DATABASE_URL: str
     ENV: str = "producao"
 
+    # Réplicas de leitura, separadas por vírgula; vazias, tudo vai ao primário
+    DATABASE_READ_URLS: str = ""
+    DB_READ_STRATEGY: Literal["round_robin", "least_connections"] = "round_robin"
+    # Por quanto tempo, após uma escrita, as leituras do cliente ficam no primário
+    DB_READ_STICKY_SECONDS: int = 5
+
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT: int | None = None  # Em milissegundos
+    DB_QUERY_CACHE_SIZE: int = 1200
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 500
+    # Conexões abertas antes do worker aceitar requisições (padrão: DB_POOL_SIZE)
+    DB_POOL_WARMUP: int | None = None
+    # Em produção o schema é criado pelo `python -m app.cli migrate`
+    DB_CREATE_SCHEMA_ON_STARTUP: bool = False
+
+    # Orçamento de consultas por requisição; no modo estrito o excesso gera erro
+    DB_QUERY_BUDGET: int | None = None
+    DB_N_PLUS_ONE_THRESHOLD: int | None = 10
+    DB_QUERY_BUDGET_STRICT: bool = False
+
+    CACHE_ENABLED: bool = True
+    CACHE_TTL: float = 30.0
+    CACHE_MAX_ITEMS: int = 10_000
+
+    # Controle de admissão: token bucket por cliente (429) e limites de
+    # requisições simultâneas por processo e por rota (503). Sem
+    # ADMISSION_MAX_IN_FLIGHT, o limite é a capacidade do pool de conexões
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_RATE: float = 20.0  # Requisições por segundo
+    RATE_LIMIT_BURST: int = 40
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_IN_FLIGHT: int | None = None
+    ADMISSION_ROUTE_LIMITS: dict[str, int] = {
+        "/despesas/bulk*": 2,
+        "/despesas/user/*/export": 2,
+        "/despesas/user/*/summary": 4,
+        "/recorrencias/gerar": 1,
+    }
+    ADMISSION_QUEUE_TIMEOUT: float = 0.1  # Espera máxima por uma vaga, em segundos
+
+    # Respostas menores que GZIP_MINIMUM_SIZE bytes vão sem compressão
+    GZIP_MINIMUM_SIZE: int = 1000
+    GZIP_COMPRESSLEVEL: int = 6
+
+    # Parâmetros do scrypt (custo) e threads dedicadas ao hash de senhas
+    PASSWORD_HASH_N: int = 2**14
+    PASSWORD_HASH_R: int = 8
+    PASSWORD_HASH_P: int = 1
+    PASSWORD_HASH_WORKERS: int = 4
+
+    # Geração das despesas recorrentes: até quantos dias à frente e quantas
+    # regras por lote
+    RECORRENCIA_HORIZONTE_DIAS: int = 90
+    RECORRENCIA_BATCH_SIZE: int = 1000
+
+    # Fila de tarefas em segundo plano (tb_jobs). Com JOB_WORKER_ENABLED
+    # desligado, as tarefas ficam para o `python -m app.cli worker`
+    JOB_WORKER_ENABLED: bool = True
+    JOB_CONCURRENCY: int = 2
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF: float = 5.0  # Segundos, dobra a cada tentativa
+    JOB_POLL_INTERVAL: float = 1.0
+    JOB_LEASE_SECONDS: int = 300
+
+    # Servidor de produção (python -m app.server); sem WEB_CONCURRENCY, um
+    # worker por núcleo disponível
+    HOST: str = "0.0.0.0"
+    PORT: int = 8080
+    WEB_CONCURRENCY: int | None = None
+    # Proxies cujo X-Forwarded-For é aceito (IPs/redes separados por vírgula).
+    # O IP resolvido identifica o cliente no rate limit: com "*", qualquer um
+    # troca de identidade a cada requisição mudando o cabeçalho
+    FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+    GRACEFUL_SHUTDOWN_TIMEOUT: int = 30
+
     model_config = SettingsConfigDict(
         env_file=join(BASE_DIR, f".env.{ENV}"),
         env_file_encoding="utf-8",
         extra="ignore",
     )
+
+    @model_validator(mode="after")
+    def apply_env_defaults(self) -> "Settings":
+        for campo, valor in ENV_DEFAULTS.get(self.ENV, {}).items():
+            if campo not in self.model_fields_set:
+                setattr(self, campo, valor)
+        return self
+
+
+_settings: Settings | None = None
+
+
+def get_settings() -> Settings:
+    # Lidas só no primeiro uso: importar os módulos do app (modelos, CLI,
+    # ferramentas) não exige DATABASE_URL
+    global _settings
+    if _settings is None:
+        _settings = Settings()
+    return _settings
+
+
+def set_settings(settings: Settings | None) -> None:
+    global _settings
+    _settings = settings
@@ -0,0 +1,231 @@
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, text
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool, StaticPool
+
+from app.core.database import set_database
+from app.core.settings import Settings, set_settings
+
+
+# Infraestrutura para os testes da API. Carregue como plugin no conftest.py:
+#
+#     pytest_plugins = ["app.core.testing"]
+#
+# e use as fixtures `db` (sessão do teste) e `client` (httpx ligado ao app).
+# O banco vem de TEST_DATABASE_URL, por padrão SQLite em memória; com
+# pytest-xdist cada worker usa o próprio banco, com o schema criado uma vez
+# e cada teste rodando numa transação desfeita ao final.
+
+TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+
+
+def worker_id() -> str:
+    # Definido pelo pytest-xdist (gw0, gw1, ...); sem ele, um processo só
+    return os.environ.get("PYTEST_XDIST_WORKER", "master")
+
+
+def _em_memoria(url: URL) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def test_database_url(database_url: str = None) -> URL:
+    url = make_url(database_url or os.environ.get("TEST_DATABASE_URL", TEST_DATABASE_URL))
+    if _em_memoria(url):
+        # Cada processo já tem o seu banco em memória
+        return url
+    if url.get_backend_name() == "sqlite":
+        nome, extensao = os.path.splitext(url.database)
+        return url.set(database=f"{nome}_{worker_id()}{extensao}")
+    return url.set(database=f"{url.database}_{worker_id()}")
+
+
+def configure_test_environment(database_url: str = None) -> Settings:
+    # Instala as configurações de teste antes do primeiro get_settings; o
+    # .env não é lido, então o banco de produção nunca é usado pelos testes
+    settings = Settings(
+        _env_file=None,
+        ENV="teste",
+        DATABASE_URL=test_database_url(database_url).render_as_string(
+            hide_password=False
+        ),
+    )
+    set_settings(settings)
+    set_database(None)
+    return settings
+
+
+def create_test_engine(url: URL) -> AsyncEngine:
+    if url.get_backend_name() != "sqlite":
+        return create_async_engine(url, poolclass=NullPool)
+
+    if _em_memoria(url):
+        # Uma única conexão compartilhada, senão cada uma veria outro banco
+        engine = create_async_engine(
+            url, poolclass=StaticPool, connect_args={"check_same_thread": False}
+        )
+    else:
+        engine = create_async_engine(url, poolclass=NullPool)
+
+    # O pysqlite abre as transações por conta própria e quebra os SAVEPOINTs;
+    # aqui o BEGIN é emitido pelo SQLAlchemy
+    @event.listens_for(engine.sync_engine, "connect")
+    def _conectar(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _iniciar(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    return engine
+
+
+async def _ensure_database(url: URL) -> None:
+    # No Postgres, cada worker do xdist ganha um banco próprio
+    if url.get_backend_name() != "postgresql":
+        return
+
+    servidor = create_async_engine(
+        url.set(database="postgres"), isolation_level="AUTOCOMMIT", poolclass=NullPool
+    )
+    try:
+        async with servidor.connect() as conn:
+            existe = await conn.scalar(
+                text("SELECT 1 FROM pg_database WHERE datname = :nome"),
+                {"nome": url.database},
+            )
+            if not existe:
+                await conn.execute(text(f'CREATE DATABASE "{url.database}"'))
+    finally:
+        await servidor.dispose()
+
+
+class TestDatabase:
+    # Banco de um worker de testes: o schema é criado em setup() e cada teste
+    # roda dentro de transaction(), numa conexão com uma transação externa que
+    # é desfeita ao final. As sessões abertas pelo app nessa conexão
+    # transformam seus commits em SAVEPOINTs
+    __test__ = False
+
+    def __init__(self, database_url: str = None):
+        self.url = test_database_url(database_url)
+        self.engine: AsyncEngine | None = None
+        self.__conexao = None
+
+    async def setup(self) -> None:
+        from app.core.database import Base
+        import app.model  # noqa: F401
+
+        await _ensure_database(self.url)
+        self.engine = create_test_engine(self.url)
+        async with self.engine.begin() as conn:
+            # Um banco persistente pode ter sobrado de uma execução anterior
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+
+    async def teardown(self) -> None:
+        await self.engine.dispose()
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[AsyncSession]:
+        async with self.engine.connect() as conexao:
+            transacao = await conexao.begin()
+            self.__conexao = conexao
+            try:
+                async with self.session() as db:
+                    yield db
+            finally:
+                self.__conexao = None
+                await transacao.rollback()
+
+    def session(self) -> AsyncSession:
+        # Mesma assinatura do Database.session, para servir de session_factory
+        if self.__conexao is None:
+            raise RuntimeError("Nenhum teste em andamento: use transaction().")
+        return AsyncSession(
+            bind=self.__conexao,
+            join_transaction_mode="create_savepoint",
+            expire_on_commit=False,
+        )
+
+    def override(self, app) -> None:
+        from app.core.database import get_db, get_read_db, get_session_factory
+        from app.core.jobs import DatabaseJobBackend, set_job_backend
+
+        async def _get_db():
+            async with self.session() as db:
+                yield db
+
+        app.dependency_overrides[get_db] = _get_db
+        app.dependency_overrides[get_read_db] = _get_db
+        app.dependency_overrides[get_session_factory] = lambda: self.session
+        set_job_backend(DatabaseJobBackend(self.session))
+
+    def restore(self, app) -> None:
+        from app.core.jobs import set_job_backend
+
+        app.dependency_overrides.clear()
+        set_job_backend(None)
+
+    async def run_jobs(self) -> int:
+        # Executa as tarefas pendentes na hora, sem o worker em segundo plano
+        from app.core.jobs import DatabaseJobBackend, JobWorker
+
+        worker = JobWorker(DatabaseJobBackend(self.session), session_factory=self.session)
+        executadas = 0
+        while (job := await worker.backend.claim(worker.name, worker.lease)) is not None:
+            await worker.run(job)
+            executadas += 1
+        return executadas
+
+
+def pytest_configure(config) -> None:
+    configure_test_environment()
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def test_database() -> AsyncIterator[TestDatabase]:
+    # Escopo de sessão: com o xdist, uma vez por worker
+    banco = TestDatabase()
+    await banco.setup()
+    yield banco
+    await banco.teardown()
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def db(test_database: TestDatabase) -> AsyncIterator[AsyncSession]:
+    async with test_database.transaction() as session:
+        yield session
+
+
+@pytest.fixture(scope="session")
+def test_app():
+    from main import create_app
+
+    return create_app()
+
+
+@pytest.fixture
+def app(test_app, test_database: TestDatabase, db: AsyncSession):
+    app = test_app
+    test_database.override(app)
+    yield app
+    test_database.restore(app)
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def client(app):
+    import httpx
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        yield client
@@ -0,0 +1,3 @@
+# Importa todos os modelos para que Base.metadata conheça todas as tabelas
+# (e as chaves estrangeiras entre elas) antes do create_all
+from app.model import despesa, job, recorrencia, resumo, user  # noqa: F401
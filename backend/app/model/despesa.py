@@ -1,4 +1,5 @@
 from sqlalchemy import (
+    DDL,
     Column,
     Integer,
     String,
@@ -6,6 +7,9 @@ from sqlalchemy import (
     Date,
     CheckConstraint,
     ForeignKeyConstraint,
+    Index,
+    UniqueConstraint,
+    event,
 )
 from app.core.database import Base
 
@@ -23,6 +27,9 @@ class Despesa(Base):
     user_id = Column(
         Integer, nullable=False, comment="ID do usuário que criou a despesa"
     )
+    recorrencia_id = Column(
+        Integer, nullable=True, comment="Regra de recorrência que gerou a despesa"
+    )
 
     __table_args__ = (
         CheckConstraint(
@@ -36,4 +43,41 @@ class Despesa(Base):
             ondelete="CASCADE",
             onupdate="CASCADE",
         ),
+        ForeignKeyConstraint(
+            ["recorrencia_id"],
+            ["tb_recorrencias.id"],
+            name="fk_despesa_recorrencia_id",
+            ondelete="SET NULL",
+        ),
+        # Uma ocorrência por data: torna a geração das recorrências idempotente
+        UniqueConstraint(
+            "recorrencia_id", "vencimento", name="uq_despesas_recorrencia_vencimento"
+        ),
+        Index("ix_despesas_vencimento_id", "vencimento", "id"),
+        Index("ix_despesas_user_id", "user_id"),
+        Index("ix_despesas_user_id_vencimento", "user_id", "vencimento"),
+        Index(
+            "ix_despesas_user_id_status_vencimento", "user_id", "status", "vencimento"
+        ),
+        # Índices de trigramas (pg_trgm) para a busca por nome e tipo; atendem
+        # tanto ao operador de similaridade (%) quanto a ILIKE '%texto%'
+        Index(
+            "ix_despesas_nome_trgm",
+            "nome",
+            postgresql_using="gin",
+            postgresql_ops={"nome": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_despesas_tipo_trgm",
+            "tipo",
+            postgresql_using="gin",
+            postgresql_ops={"tipo": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
     )
+
+
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
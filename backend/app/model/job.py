@@ -0,0 +1,65 @@
+from sqlalchemy import (
+    JSON,
+    CheckConstraint,
+    Column,
+    DateTime,
+    ForeignKeyConstraint,
+    Index,
+    Integer,
+    String,
+    Text,
+)
+from app.core.database import Base
+
+
+class Job(Base):
+    __tablename__ = "tb_jobs"
+    __comment__ = "Fila de tarefas executadas em segundo plano"
+
+    id = Column(Integer, primary_key=True, index=True)
+    tipo = Column(String(50), nullable=False, comment="Nome do handler registrado")
+    status = Column(String(10), nullable=False, default="pendente")
+    payload = Column(JSON, nullable=False, default=dict)
+    resultado = Column(JSON, nullable=True)
+    erro = Column(Text, nullable=True)
+    tentativas = Column(Integer, nullable=False, default=0)
+    max_tentativas = Column(Integer, nullable=False, default=3)
+    disponivel_em = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        comment="A partir de quando pode ser executada (espera entre tentativas)",
+    )
+    bloqueado_ate = Column(
+        DateTime(timezone=True),
+        nullable=True,
+        comment="Fim do lease do worker; depois disso a tarefa volta para a fila",
+    )
+    worker = Column(String(100), nullable=True)
+    criado_em = Column(DateTime(timezone=True), nullable=False)
+    iniciado_em = Column(DateTime(timezone=True), nullable=True)
+    concluido_em = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ('pendente', 'executando', 'concluido', 'falhou')",
+            "ck_jobs_status",
+        ),
+        Index("ix_jobs_status_disponivel_em", "status", "disponivel_em"),
+    )
+
+
+class JobEfeito(Base):
+    __tablename__ = "tb_job_efeitos"
+    __comment__ = "Tarefas cujos efeitos já foram gravados (chave de idempotência)"
+
+    job_id = Column(Integer, primary_key=True)
+    aplicado_em = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["job_id"],
+            ["tb_jobs.id"],
+            name="fk_job_efeitos_job_id",
+            ondelete="CASCADE",
+        ),
+    )
@@ -0,0 +1,48 @@
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Numeric,
+    Date,
+    CheckConstraint,
+    ForeignKeyConstraint,
+    Index,
+)
+from app.core.database import Base
+
+
+class Recorrencia(Base):
+    __tablename__ = "tb_recorrencias"
+    __comment__ = "Regras de despesas recorrentes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    nome = Column(String(100), nullable=False)
+    tipo = Column(String(100), nullable=False)
+    valor = Column(Numeric, nullable=False)
+    user_id = Column(Integer, nullable=False)
+    frequencia = Column(String(10), nullable=False)
+    intervalo = Column(
+        Integer, nullable=False, default=1, comment="A cada N meses ou semanas"
+    )
+    inicio = Column(Date, nullable=False, comment="Primeiro vencimento")
+    fim = Column(Date, nullable=True, comment="Último vencimento possível")
+    gerado_ate = Column(
+        Date, nullable=True, comment="Horizonte até onde as despesas já foram geradas"
+    )
+
+    __table_args__ = (
+        CheckConstraint(
+            "frequencia IN ('mensal', 'semanal')",
+            "ck_recorrencias_frequencia",
+        ),
+        CheckConstraint("intervalo > 0", "ck_recorrencias_intervalo"),
+        ForeignKeyConstraint(
+            ["user_id"],
+            ["tb_users.id"],
+            name="fk_recorrencia_user_id",
+            ondelete="CASCADE",
+            onupdate="CASCADE",
+        ),
+        Index("ix_recorrencias_user_id", "user_id"),
+        Index("ix_recorrencias_gerado_ate", "gerado_ate"),
+    )
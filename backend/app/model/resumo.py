@@ -0,0 +1,31 @@
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Numeric,
+    Date,
+    ForeignKeyConstraint,
+)
+from app.core.database import Base
+
+
+class ResumoMensal(Base):
+    __tablename__ = "tb_resumo_mensal"
+    __comment__ = "Totais das despesas por usuário, mês e tipo"
+
+    user_id = Column(Integer, primary_key=True)
+    mes = Column(Date, primary_key=True, comment="Primeiro dia do mês de vencimento")
+    tipo = Column(String(100), primary_key=True)
+    pendente = Column(Numeric, nullable=False, default=0)
+    quitado = Column(Numeric, nullable=False, default=0)
+    quantidade = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["user_id"],
+            ["tb_users.id"],
+            name="fk_resumo_user_id",
+            ondelete="CASCADE",
+            onupdate="CASCADE",
+        ),
+    )
@@ -15,3 +15,9 @@ class User(Base):
     nome = Column(String(100), nullable=False)
     email = Column(String(255), unique=True)
     senha = Column(Text, nullable=False)
+    # Versões usadas nos ETags: a do próprio registro e a da coleção de
+    # despesas do usuário, incrementada em toda escrita em tb_despesas
+    versao = Column(Integer, nullable=False, default=1, server_default="1")
+    versao_despesas = Column(
+        Integer, nullable=False, default=1, server_default="1"
+    )
@@ -1,25 +1,71 @@
-from typing import Generic, TypeVar
+from collections import namedtuple
+from functools import lru_cache
+from typing import AsyncIterator, Generic, TypeVar
 
+from sqlalchemy import Row, delete, insert, lambda_stmt, tuple_, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.core.pagination import decode_cursor, encode_cursor
 
 
 Model = TypeVar("Model") # Modelo do banco de dados
 
+CHUNK_SIZE = 500
+STREAM_SIZE = 1000
+
+
+@lru_cache
+def _linha_antiga(nome: str, campos: tuple[str, ...]) -> type:
+    # Tupla nomeada com os valores antigos das colunas monitoradas; acesso por
+    # atributo, como as Row de um SELECT
+    return namedtuple(nome, campos)
+
 
 class BaseRepository(Generic[Model]):
-    def __init__(self, model: type[Model], db: AsyncSession):
+    # Colunas das quais dependem dados derivados (ex.: tabelas de resumo).
+    # Quando definidas, as escritas capturam os valores antigos e novos
+    # dessas colunas e chamam _on_change antes do commit
+    tracked_columns: list[str] = []
+    # Coluna inteira incrementada pelo próprio UPDATE a cada alteração do
+    # registro; serve de versão para ETags e requisições condicionais
+    version_column: str | None = None
+
+    def __init__(
+        self,
+        model: type[Model],
+        db: AsyncSession,
+        cursor_columns: list[InstrumentedAttribute] = None,
+    ):
         self.model = model
         self.__db = db
+        # Colunas (únicas em conjunto) usadas na ordenação da paginação por cursor
+        self.cursor_columns = cursor_columns or [model.id]
 
+    @property
+    def db(self) -> AsyncSession:
+        return self.__db
+
+    # As consultas mais frequentes usam lambda_stmt: a construção e a
+    # compilação ficam em cache e apenas os parâmetros mudam a cada chamada
     async def get_all(self, limit=15, offset=0) -> list[Model]:
-        busca = await self.__db.execute(select(self.model).limit(limit).offset(offset))
+        model = self.model
+        query = lambda_stmt(lambda: select(model))
+        query += lambda s: s.limit(limit).offset(offset)
+
+        busca = await self.__db.execute(query)
         busca = busca.scalars().all()
 
         return busca
 
     async def get_by_id(self, id: int) -> Model:
-        busca = await self.__db.execute(select(self.model).where(self.model.id == id))
+        model = self.model
+        query = lambda_stmt(lambda: select(model))
+        query += lambda s: s.where(model.id == id)
+
+        busca = await self.__db.execute(query)
         busca = busca.scalar_one_or_none()
 
         if busca is None:
@@ -35,25 +81,371 @@ class BaseRepository(Generic[Model]):
 
         return busca
 
+    async def get_rows(
+        self, columns: list[str], *filter, limit=15, offset=0, order_by=()
+    ) -> list[Row]:
+        # Busca apenas as colunas pedidas, como tuplas, sem montar objetos do ORM
+        busca = await self.__db.execute(
+            select(*(getattr(self.model, coluna) for coluna in columns))
+            .where(*filter)
+            .order_by(*order_by)
+            .limit(limit)
+            .offset(offset)
+        )
+        return busca.all()
+
+    async def get_page(
+        self,
+        *filter,
+        cursor: str = None,
+        limit=15,
+        columns: list[InstrumentedAttribute] = None,
+        descending: bool = False,
+    ) -> tuple[list[Model], str | None]:
+        # `columns` troca a ordenação padrão; precisa terminar em uma coluna única
+        colunas = columns or self.cursor_columns
+        query = select(self.model).where(*filter)
+        if descending:
+            query = query.order_by(*(coluna.desc() for coluna in colunas))
+        else:
+            query = query.order_by(*colunas)
+
+        if cursor is not None:
+            valores = decode_cursor(cursor, colunas)
+            if descending:
+                query = query.where(tuple_(*colunas) < tuple_(*valores))
+            else:
+                query = query.where(tuple_(*colunas) > tuple_(*valores))
+
+        busca = await self.__db.execute(query.limit(limit + 1))
+        busca = busca.scalars().all()
+
+        if len(busca) <= limit:
+            return busca, None
+
+        busca = busca[:limit]
+        proximo = encode_cursor([getattr(busca[-1], coluna.key) for coluna in colunas])
+        return busca, proximo
+
+    async def stream(
+        self, *filter, columns: list[InstrumentedAttribute] = None, yield_per=STREAM_SIZE
+    ) -> AsyncIterator[list[Row]]:
+        # Percorre o resultado com cursor no servidor, entregando lotes de linhas
+        query = (
+            select(*(columns or [self.model]))
+            .where(*filter)
+            .order_by(*self.cursor_columns)
+            .execution_options(yield_per=yield_per)
+        )
+        busca = await self.__db.stream(query)
+
+        async for lote in busca.partitions():
+            yield lote
+
     async def create(self, **data) -> Model:
         obj = self.model(**data)
         self.__db.add(obj)
+        await self.__db.flush()
+        await self._changed([], [obj])
         await self.__db.commit()
         await self.__db.refresh(obj)
         return obj
 
     async def update(self, id: int, **data) -> Model:
-        obj = await self.get_by_id(id)
-        for key, value in data.items():
-            setattr(obj, key, value)
-        self.__db.add(obj)
+        # Um único UPDATE ... RETURNING, sem SELECT prévio nem refresh
+        busca, antigos = await self._update_returning([id], data, self.model)
+
+        if not busca:
+            raise ValueError("{objeto} com ID = {id} não encontrado.")
+        obj = busca[0][0]
+
+        await self._changed(antigos, [obj])
         await self.__db.commit()
-        await self.__db.refresh(obj)
         return obj
 
-    async def delete(self, id: int) -> None:
-        obj = await self.get_by_id(id)
-        await self.__db.delete(obj)
+    async def delete(self, id: int) -> Row:
+        # Devolve a linha removida, com as colunas monitoradas
+        busca = await self.__db.execute(
+            delete(self.model)
+            .where(self.model.id == id)
+            .returning(*self._returning_columns())
+        )
+        busca = busca.all()
+
+        if not busca:
+            raise ValueError("{objeto} com ID = {id} não encontrado.")
+
+        await self._changed(busca, [])
         await self.__db.commit()
+        return busca[0]
+
+    async def create_many(
+        self, items: list[dict], chunk_size=CHUNK_SIZE
+    ) -> tuple[list[Model], list[tuple[int, str]]]:
+        criados, erros = [], []
+
+        for inicio in range(0, len(items), chunk_size):
+            lote = items[inicio : inicio + chunk_size]
+            try:
+                async with self.__db.begin_nested():
+                    busca = await self.__db.scalars(
+                        insert(self.model).returning(
+                            self.model, sort_by_parameter_order=True
+                        ),
+                        lote,
+                    )
+                    busca = busca.all()
+                    await self._changed([], busca)
+                    criados.extend(busca)
+            except IntegrityError as error:
+                erros.extend(
+                    self._erros_lote(range(inicio, inicio + len(lote)), error)
+                )
+
+        await self.__db.commit()
+        return criados, erros
+
+    async def update_many(
+        self, items: list[dict], chunk_size=CHUNK_SIZE
+    ) -> tuple[list[Model], list[tuple[int, str]]]:
+        atualizados = []
+        unicos, erros = self._sem_repetidos([item["id"] for item in items])
+
+        for inicio in range(0, len(unicos), chunk_size):
+            lote = [
+                (indice, items[indice])
+                for indice, _ in unicos[inicio : inicio + chunk_size]
+            ]
+            ids = [item["id"] for _, item in lote]
+            existentes = await self.__db.execute(
+                select(*self._returning_columns())
+                .where(self.model.id.in_(ids))
+                .with_for_update()
+            )
+            antigos = {linha.id: linha for linha in existentes.all()}
+
+            encontrados, indices = [], []
+            for indice, item in lote:
+                if item["id"] in antigos:
+                    encontrados.append(item)
+                    indices.append(indice)
+                else:
+                    erros.append((indice, self._nao_encontrado(item["id"])))
+
+            if not encontrados:
+                continue
+
+            try:
+                async with self.__db.begin_nested():
+                    await self.__db.execute(update(self.model), encontrados)
+                    if self.version_column is not None:
+                        # O UPDATE em lote por chave primária não aceita expressões
+                        await self.__db.execute(
+                            update(self.model)
+                            .where(self.model.id.in_([item["id"] for item in encontrados]))
+                            .values(**self._version_bump())
+                            .execution_options(synchronize_session=False)
+                        )
+                    busca = await self.__db.scalars(
+                        select(self.model)
+                        .where(self.model.id.in_([item["id"] for item in encontrados]))
+                        .execution_options(populate_existing=True)
+                    )
+                    busca = busca.all()
+                    await self._changed(
+                        [antigos[item["id"]] for item in encontrados], busca
+                    )
+                    atualizados.extend(busca)
+            except IntegrityError as error:
+                erros.extend(self._erros_lote(indices, error))
+
+        await self.__db.commit()
+        return atualizados, sorted(erros)
+
+    async def delete_many(
+        self, ids: list[int], chunk_size=CHUNK_SIZE
+    ) -> tuple[list[Row], list[tuple[int, str]]]:
+        # Devolve as linhas removidas, com as colunas monitoradas
+        removidos = []
+        unicos, erros = self._sem_repetidos(ids)
+
+        for inicio in range(0, len(unicos), chunk_size):
+            lote = unicos[inicio : inicio + chunk_size]
+            busca = await self.__db.execute(
+                delete(self.model)
+                .where(self.model.id.in_([id for _, id in lote]))
+                .returning(*self._returning_columns())
+            )
+            busca = {linha.id: linha for linha in busca.all()}
+            if busca:
+                await self._changed(list(busca.values()), [])
+
+            for indice, id in lote:
+                if id in busca:
+                    removidos.append(busca[id])
+                else:
+                    erros.append((indice, self._nao_encontrado(id)))
+
+        await self.__db.commit()
+        return removidos, sorted(erros)
+
+    async def update_by_ids(
+        self, ids: list[int], chunk_size=CHUNK_SIZE, **data
+    ) -> tuple[list[Row], list[tuple[int, str]]]:
+        # Aplica os mesmos valores a vários registros, um UPDATE por lote, e
+        # devolve as linhas atualizadas com as colunas monitoradas
+        atualizados = []
+        unicos, erros = self._sem_repetidos(ids)
+
+        for inicio in range(0, len(unicos), chunk_size):
+            lote = unicos[inicio : inicio + chunk_size]
+            busca, antigos = await self._update_returning(
+                [id for _, id in lote], data, *self._returning_columns()
+            )
+            busca = {linha.id: linha for linha in busca}
+            if busca:
+                await self._changed(antigos, list(busca.values()))
+
+            for indice, id in lote:
+                if id in busca:
+                    atualizados.append(busca[id])
+                else:
+                    erros.append((indice, self._nao_encontrado(id)))
+
+        await self.__db.commit()
+        return atualizados, sorted(erros)
+
+    async def _on_change(self, antigos: list, novos: list) -> None:
+        # Recebe as linhas (com as colunas monitoradas) antes e depois da escrita
+        pass
+
+    async def _on_write(self, linhas: list) -> None:
+        # Chamado em toda escrita, antes do commit, com as linhas afetadas
+        # (valores antigos e novos, com as colunas monitoradas)
+        pass
+
+    async def _changed(self, antigos: list | None, novos: list) -> None:
+        # antigos é None quando a escrita não tocou nenhuma coluna monitorada
+        if antigos is not None and self.tracked_columns:
+            await self._on_change(antigos, novos)
+        await self._on_write([*(antigos or []), *novos])
+
+    def _version_bump(self) -> dict:
+        if self.version_column is None:
+            return {}
+        coluna = getattr(self.model, self.version_column)
+        return {self.version_column: coluna + 1}
+
+    def _returning_columns(self) -> list[InstrumentedAttribute]:
+        return [
+            self.model.id,
+            *(getattr(self.model, coluna) for coluna in self.tracked_columns),
+        ]
+
+    async def _update_returning(
+        self, ids: list[int], data: dict, *returning
+    ) -> tuple[list[Row], list | None]:
+        # UPDATE ... RETURNING dos registros `ids`. Devolve as linhas do
+        # RETURNING e os valores antigos das colunas monitoradas (None quando
+        # a escrita não toca nenhuma delas)
+        query = (
+            update(self.model)
+            .values(**data, **self._version_bump())
+            .execution_options(synchronize_session=False)
+        )
+        if not set(self.tracked_columns) & set(data):
+            busca = await self.__db.execute(
+                query.where(self.model.id.in_(ids)).returning(*returning)
+            )
+            return busca.all(), None
+
+        if self.__db.get_bind().dialect.name == "postgresql":
+            # Os valores antigos vêm no mesmo statement, de um SELECT ... FOR
+            # UPDATE no FROM (o bloqueio faz a leitura ver a versão mais nova
+            # da linha se outra transação a alterou antes)
+            busca = await self.__db.execute(self._old_values_update(ids, data, *returning))
+            busca = busca.all()
+            antigo = _linha_antiga(
+                f"{self.model.__name__}Antigo",
+                tuple(coluna.key for coluna in self._returning_columns()),
+            )
+            antigos = [
+                antigo(*(linha._mapping[f"antigo_{campo}"] for campo in antigo._fields))
+                for linha in busca
+            ]
+            return busca, antigos
+
+        # O SQLite não aceita colunas do FROM no RETURNING de um UPDATE ...
+        # FROM: os valores antigos saem de um SELECT antes do UPDATE
+        antigos = await self.__db.execute(
+            select(*self._returning_columns())
+            .where(self.model.id.in_(ids))
+            .with_for_update()
+        )
+        antigos = antigos.all()
+        busca = await self.__db.execute(
+            query.where(self.model.id.in_(ids)).returning(*returning)
+        )
+        return busca.all(), antigos
+
+    def _old_values_update(self, ids: list[int], data: dict, *returning):
+        # UPDATE ... FROM (SELECT ... FOR UPDATE) AS antigo ... RETURNING,
+        # com as colunas monitoradas de antes da escrita como antigo_<coluna>
+        antigo = (
+            select(*self._returning_columns())
+            .where(self.model.id.in_(ids))
+            .with_for_update()
+            .subquery("antigo")
+        )
+        return (
+            update(self.model)
+            .where(self.model.id == antigo.c.id)
+            .values(**data, **self._version_bump())
+            .returning(
+                *returning,
+                *(coluna.label(f"antigo_{coluna.key}") for coluna in antigo.c),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    def _dialect_insert(self, model: type = None):
+        # INSERT do dialeto em uso, que expõe on_conflict_do_nothing/do_update
+        dialeto = self.__db.get_bind().dialect.name
+        if dialeto == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialeto == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            raise ValueError(f"Banco de dados sem suporte a ON CONFLICT: {dialeto}")
+
+        return dialect_insert(model or self.model)
+
+    def _nao_encontrado(self, id: int) -> str:
+        return f"{self.model.__name__} com ID = {id} não encontrado."
+
+    def _sem_repetidos(
+        self, ids: list[int]
+    ) -> tuple[list[tuple[int, int]], list[tuple[int, str]]]:
+        # (posição, id) da primeira ocorrência de cada id; as repetições viram
+        # erros do próprio item, em vez de contar o mesmo registro duas vezes
+        unicos, erros, vistos = [], [], set()
+        for indice, id in enumerate(ids):
+            if id in vistos:
+                erros.append(
+                    (indice, f"{self.model.__name__} com ID = {id} repetido no lote.")
+                )
+            else:
+                vistos.add(id)
+                unicos.append((indice, id))
+        return unicos, erros
+
+    def _erros_lote(
+        self, indices: list[int], error: IntegrityError
+    ) -> list[tuple[int, str]]:
+        detalhe = str(error.orig).splitlines()[0]
+        return [
+            (indice, f"Lote rejeitado pelo banco de dados: {detalhe}")
+            for indice in indices
+        ]
 
     
\ No newline at end of file
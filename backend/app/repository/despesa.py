@@ -1,14 +1,217 @@
+from datetime import date
+from typing import AsyncIterator
+
+from sqlalchemy import Float, Row, and_, case, extract, func, literal, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.pagination import decode_cursor, encode_cursor
 from app.model.despesa import Despesa
 from app.repository.base import BaseRepository
+from app.repository.resumo import ResumoRepository
+from app.repository.user import UserRepository
+
+
+# Ordenações aceitas na listagem por usuário; "-" na frente inverte a ordem
+ORDENACOES = {"vencimento": Despesa.vencimento, "valor": Despesa.valor}
 
 
 class DespesaRepository(BaseRepository[Despesa]):
+    # Colunas usadas pelo resumo mensal (tb_resumo_mensal)
+    tracked_columns = ["user_id", "vencimento", "tipo", "valor", "status"]
+
     def __init__(self, db: AsyncSession):
-        super().__init__(Despesa, db)
+        super().__init__(Despesa, db, [Despesa.vencimento, Despesa.id])
+        self.resumo = ResumoRepository(db)
+        self.users = UserRepository(db)
+
+
+    async def get_by_user_id(
+        self, user_id: int, order: str = "vencimento", limit: int = 15, **filtros
+    ) -> list[Despesa]:
+        colunas, descending = self._ordenacao(order)
+        busca = await self.db.execute(
+            select(Despesa)
+            .where(*self._user_filter(user_id, **filtros))
+            .order_by(*(coluna.desc() if descending else coluna for coluna in colunas))
+            .limit(limit)
+        )
+        return busca.scalars().all()
+
+    async def get_page_by_user_id(
+        self,
+        user_id: int,
+        order: str = "vencimento",
+        cursor: str = None,
+        limit: int = 15,
+        **filtros,
+    ) -> tuple[list[Despesa], str | None]:
+        colunas, descending = self._ordenacao(order)
+        return await self.get_page(
+            *self._user_filter(user_id, **filtros),
+            cursor=cursor,
+            limit=limit,
+            columns=colunas,
+            descending=descending,
+        )
+
+    async def summary(
+        self,
+        user_id: int,
+        group_by: list[str],
+        inicio: date = None,
+        fim: date = None,
+    ) -> list[Row]:
+        colunas = {
+            "month": [
+                extract("year", Despesa.vencimento).label("ano"),
+                extract("month", Despesa.vencimento).label("mes"),
+            ],
+            "tipo": [Despesa.tipo],
+            "status": [Despesa.status],
+        }
+        agrupamento = [coluna for grupo in group_by for coluna in colunas[grupo]]
+
+        filtros = [Despesa.user_id == user_id]
+        if inicio is not None:
+            filtros.append(Despesa.vencimento >= inicio)
+        if fim is not None:
+            filtros.append(Despesa.vencimento <= fim)
+
+        busca = await self.db.execute(
+            select(
+                *agrupamento,
+                func.sum(Despesa.valor).label("total"),
+                func.count().label("quantidade"),
+            )
+            .where(*filtros)
+            .group_by(*agrupamento)
+            .order_by(*agrupamento)
+        )
+        return busca.all()
+
+    async def get_rows_by_user_id(
+        self,
+        user_id: int,
+        columns: list[str],
+        order: str = "vencimento",
+        limit: int = 15,
+        **filtros,
+    ) -> list[Row]:
+        colunas, descending = self._ordenacao(order)
+        return await self.get_rows(
+            columns,
+            *self._user_filter(user_id, **filtros),
+            limit=limit,
+            order_by=[coluna.desc() if descending else coluna for coluna in colunas],
+        )
+
+    def stream_by_user_id(
+        self, user_id: int, campos: list[str]
+    ) -> AsyncIterator[list[Row]]:
+        return self.stream(
+            Despesa.user_id == user_id,
+            columns=[getattr(Despesa, campo) for campo in campos],
+        )
+
+    async def search(
+        self, user_id: int, termo: str, cursor: str = None, limit: int = 15
+    ) -> tuple[list[Despesa], str | None]:
+        # Ordena pela relevância e pagina por (relevância, id), sem OFFSET
+        query, relevancia = self.search_statement(user_id, termo)
+        if cursor is not None:
+            ultima, ultimo_id = decode_cursor(cursor, [relevancia, Despesa.id])
+            query = query.where(
+                or_(
+                    relevancia < ultima,
+                    and_(relevancia == ultima, Despesa.id > ultimo_id),
+                )
+            )
+
+        busca = (await self.db.execute(query.limit(limit + 1))).all()
+        if len(busca) <= limit:
+            return [linha.Despesa for linha in busca], None
+
+        busca = busca[:limit]
+        proximo = encode_cursor([busca[-1].relevancia, busca[-1].Despesa.id])
+        return [linha.Despesa for linha in busca], proximo
+
+    def search_statement(self, user_id: int, termo: str):
+        # "!" como escape: a barra invertida é tratada de forma diferente
+        # conforme o banco (standard_conforming_strings no Postgres)
+        padrao = "%{}%".format(
+            termo.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+        )
+        contem = or_(
+            Despesa.nome.ilike(padrao, escape="!"),
+            Despesa.tipo.ilike(padrao, escape="!"),
+        )
+
+        if self.db.get_bind().dialect.name == "postgresql":
+            # Similaridade de trigramas (pg_trgm), servida pelos índices GIN
+            relevancia = func.greatest(
+                func.similarity(Despesa.nome, termo),
+                func.similarity(Despesa.tipo, termo),
+                type_=Float,
+            )
+            filtro = or_(contem, Despesa.nome.op("%")(termo), Despesa.tipo.op("%")(termo))
+        else:
+            # Sem pg_trgm: nome igual, depois começando com o termo, depois contendo
+            relevancia = case(
+                (func.lower(Despesa.nome) == termo.lower(), literal(1.0)),
+                (
+                    func.lower(Despesa.nome).startswith(termo.lower(), autoescape=True),
+                    literal(0.75),
+                ),
+                else_=literal(0.5),
+            )
+            filtro = contem
+
+        query = (
+            select(Despesa, relevancia.label("relevancia"))
+            .where(Despesa.user_id == user_id, filtro)
+            .order_by(relevancia.desc(), Despesa.id)
+        )
+        return query, relevancia
+
+    async def get_balance(self, user_id: int, mes: date) -> list:
+        return await self.resumo.get_by_month(user_id, mes)
+
+    def _user_filter(
+        self,
+        user_id: int,
+        inicio: date = None,
+        fim: date = None,
+        status: str = None,
+        tipo: str = None,
+        valor_min: float = None,
+        valor_max: float = None,
+    ) -> list:
+        # Predicados sobre user_id + status/vencimento, atendidos pelos índices
+        # ix_despesas_user_id_vencimento e ix_despesas_user_id_status_vencimento
+        filtro = [Despesa.user_id == user_id]
+        if inicio is not None:
+            filtro.append(Despesa.vencimento >= inicio)
+        if fim is not None:
+            filtro.append(Despesa.vencimento <= fim)
+        if status is not None:
+            filtro.append(Despesa.status == status)
+        if tipo is not None:
+            filtro.append(Despesa.tipo == tipo)
+        if valor_min is not None:
+            filtro.append(Despesa.valor >= valor_min)
+        if valor_max is not None:
+            filtro.append(Despesa.valor <= valor_max)
+        return filtro
+
+    def _ordenacao(self, order: str) -> tuple[list, bool]:
+        coluna = ORDENACOES.get(order.lstrip("-"))
+        if coluna is None:
+            raise ValueError(f"order deve ser um de: {', '.join(ORDENACOES)}")
+        return [coluna, Despesa.id], order.startswith("-")
 
+    async def _on_change(self, antigos: list, novos: list) -> None:
+        await self.resumo.apply(antigos, novos)
 
-    async def get_by_user_id(self, user_id: int) -> list[Despesa]:
-        busca = await self.get_by_filter(Despesa.user_id == user_id)
-        return busca
\ No newline at end of file
+    async def _on_write(self, linhas: list) -> None:
+        # Nova versão da coleção de despesas de cada usuário afetado (ETag)
+        await self.users.bump_despesas_version(linha.user_id for linha in linhas)
\ No newline at end of file
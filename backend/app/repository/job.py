@@ -0,0 +1,107 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.model.job import Job, JobEfeito
+from app.repository.base import BaseRepository
+
+
+class JobRepository(BaseRepository[Job]):
+    def __init__(self, db: AsyncSession):
+        super().__init__(Job, db)
+
+    async def claim(self, worker: str, agora: datetime, lease_ate: datetime) -> Job | None:
+        # Pega a próxima tarefa disponível (ou abandonada por um worker que
+        # caiu) em um único UPDATE; no Postgres o SKIP LOCKED deixa workers
+        # concorrentes pegarem tarefas diferentes sem esperar um pelo outro
+        proxima = (
+            select(Job.id)
+            .where(
+                or_(
+                    and_(Job.status == "pendente", Job.disponivel_em <= agora),
+                    and_(Job.status == "executando", Job.bloqueado_ate < agora),
+                )
+            )
+            .order_by(Job.disponivel_em, Job.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        busca = await self.db.execute(
+            update(Job)
+            .where(Job.id == proxima)
+            .values(
+                status="executando",
+                tentativas=Job.tentativas + 1,
+                worker=worker,
+                bloqueado_ate=lease_ate,
+                iniciado_em=agora,
+            )
+            .returning(Job)
+            .execution_options(synchronize_session=False)
+        )
+        obj = busca.scalar_one_or_none()
+        await self.db.commit()
+        return obj
+
+    async def heartbeat(self, id: int, worker: str, lease_ate: datetime) -> bool:
+        return await self._update_owned(id, worker, bloqueado_ate=lease_ate)
+
+    async def finish(self, id: int, worker: str, resultado: Any, agora: datetime) -> bool:
+        return await self._update_owned(
+            id,
+            worker,
+            status="concluido",
+            resultado=resultado,
+            erro=None,
+            bloqueado_ate=None,
+            concluido_em=agora,
+        )
+
+    async def fail(
+        self, id: int, worker: str, erro: str, agora: datetime, retry_em: datetime = None
+    ) -> bool:
+        if retry_em is None:
+            return await self._update_owned(
+                id,
+                worker,
+                status="falhou",
+                erro=erro,
+                bloqueado_ate=None,
+                concluido_em=agora,
+            )
+
+        return await self._update_owned(
+            id,
+            worker,
+            status="pendente",
+            erro=erro,
+            worker=None,
+            bloqueado_ate=None,
+            disponivel_em=retry_em,
+        )
+
+    async def register_effect(self, id: int, agora: datetime) -> bool:
+        # Grava a chave de idempotência da tarefa sem commit, na transação dos
+        # efeitos dela: False se outra execução já os gravou. No Postgres, uma
+        # execução concorrente espera a outra terminar antes de decidir
+        busca = await self.db.execute(
+            self._dialect_insert(JobEfeito)
+            .values(job_id=id, aplicado_em=agora)
+            .on_conflict_do_nothing(index_elements=[JobEfeito.job_id])
+        )
+        return busca.rowcount > 0
+
+    async def _update_owned(self, id: int, dono: str, **data) -> bool:
+        # Só o worker que detém a tarefa pode alterá-la; se o lease expirou e
+        # outro worker a pegou, a escrita atrasada é descartada
+        busca = await self.db.execute(
+            update(Job)
+            .where(Job.id == id, Job.worker == dono, Job.status == "executando")
+            .values(**data)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+        return busca.rowcount > 0
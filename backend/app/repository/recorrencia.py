@@ -0,0 +1,86 @@
+from datetime import date
+
+from sqlalchemy import Row, and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.model.despesa import Despesa
+from app.model.recorrencia import Recorrencia
+from app.repository.base import CHUNK_SIZE, BaseRepository
+from app.repository.despesa import DespesaRepository
+from app.repository.resumo import ResumoRepository
+from app.repository.user import UserRepository
+
+
+class RecorrenciaRepository(BaseRepository[Recorrencia]):
+    def __init__(self, db: AsyncSession):
+        super().__init__(Recorrencia, db)
+        self.resumo = ResumoRepository(db)
+        self.users = UserRepository(db)
+
+    async def get_by_user_id(self, user_id: int) -> list[Recorrencia]:
+        busca = await self.get_by_filter(Recorrencia.user_id == user_id)
+        return busca
+
+    async def get_pending(
+        self,
+        horizonte: date,
+        depois_de_id: int = 0,
+        limit: int = 1000,
+        ids: list[int] = None,
+    ) -> list[Row]:
+        # Regras ainda não geradas até o horizonte (nem até o próprio fim),
+        # percorridas por id (keyset). Devolve tuplas, para não acumular
+        # milhões de objetos na sessão
+        query = (
+            select(*Recorrencia.__table__.columns)
+            .where(
+                Recorrencia.id > depois_de_id,
+                or_(
+                    Recorrencia.gerado_ate.is_(None),
+                    and_(
+                        Recorrencia.gerado_ate < horizonte,
+                        or_(
+                            Recorrencia.fim.is_(None),
+                            Recorrencia.fim > Recorrencia.gerado_ate,
+                        ),
+                    ),
+                ),
+            )
+            .order_by(Recorrencia.id)
+            .limit(limit)
+        )
+        if ids is not None:
+            query = query.where(Recorrencia.id.in_(ids))
+
+        busca = await self.db.execute(query)
+        return busca.all()
+
+    async def materialize(
+        self, despesas: list[dict], marcas: list[dict], chunk_size=CHUNK_SIZE
+    ) -> int:
+        # Insere as ocorrências em lotes; as que já existem são ignoradas pela
+        # restrição única (recorrencia_id, vencimento), sem consulta prévia
+        colunas = [getattr(Despesa, coluna) for coluna in DespesaRepository.tracked_columns]
+        criadas, usuarios = 0, set()
+        for inicio in range(0, len(despesas), chunk_size):
+            busca = await self.db.execute(
+                self._dialect_insert(Despesa)
+                .values(despesas[inicio : inicio + chunk_size])
+                .on_conflict_do_nothing(
+                    index_elements=[Despesa.recorrencia_id, Despesa.vencimento]
+                )
+                .returning(*colunas)
+            )
+            # Só as linhas realmente inseridas voltam no RETURNING
+            busca = busca.all()
+            await self.resumo.apply([], busca)
+            usuarios.update(linha.user_id for linha in busca)
+            criadas += len(busca)
+
+        await self.users.bump_despesas_version(usuarios)
+
+        if marcas:
+            await self.db.execute(update(Recorrencia), marcas)
+
+        await self.db.commit()
+        return criadas
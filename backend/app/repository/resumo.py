@@ -0,0 +1,140 @@
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import Date, case, cast, delete, func, insert, select, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.model.despesa import Despesa
+from app.model.resumo import ResumoMensal
+from app.repository.base import CHUNK_SIZE, BaseRepository
+
+
+class ResumoRepository(BaseRepository[ResumoMensal]):
+    def __init__(self, db: AsyncSession):
+        super().__init__(
+            ResumoMensal,
+            db,
+            [ResumoMensal.user_id, ResumoMensal.mes, ResumoMensal.tipo],
+        )
+
+    async def get_by_month(self, user_id: int, mes: date) -> list[ResumoMensal]:
+        busca = await self.db.execute(
+            select(ResumoMensal)
+            .where(ResumoMensal.user_id == user_id, ResumoMensal.mes == mes.replace(day=1))
+            .order_by(ResumoMensal.tipo)
+        )
+        return busca.scalars().all()
+
+    async def apply(self, antigos: list, novos: list) -> None:
+        # Soma a diferença entre as despesas antes e depois da escrita, na
+        # mesma transação, com um upsert por lote de (usuário, mês, tipo)
+        deltas: dict[tuple, list] = {}
+        for sinal, linhas in ((-1, antigos), (1, novos)):
+            for linha in linhas:
+                chave = (linha.user_id, linha.vencimento.replace(day=1), linha.tipo)
+                delta = deltas.setdefault(chave, [Decimal(0), Decimal(0), 0])
+                delta[0 if linha.status == "P" else 1] += sinal * Decimal(str(linha.valor))
+                delta[2] += sinal
+
+        # Ordenadas para que transações concorrentes travem as linhas na mesma ordem
+        linhas = [
+            {
+                "user_id": user_id,
+                "mes": mes,
+                "tipo": tipo,
+                "pendente": pendente,
+                "quitado": quitado,
+                "quantidade": quantidade,
+            }
+            for (user_id, mes, tipo), (pendente, quitado, quantidade) in sorted(
+                deltas.items()
+            )
+            if pendente or quitado or quantidade
+        ]
+
+        for inicio in range(0, len(linhas), CHUNK_SIZE):
+            query = self._dialect_insert().values(linhas[inicio : inicio + CHUNK_SIZE])
+            await self.db.execute(
+                query.on_conflict_do_update(
+                    index_elements=self.cursor_columns,
+                    set_={
+                        "pendente": ResumoMensal.pendente + query.excluded.pendente,
+                        "quitado": ResumoMensal.quitado + query.excluded.quitado,
+                        "quantidade": ResumoMensal.quantidade + query.excluded.quantidade,
+                    },
+                )
+            )
+
+    async def rebuild(self, user_id: int = None) -> int:
+        # Recalcula o resumo a partir de tb_despesas com um INSERT ... SELECT
+        filtro = [] if user_id is None else [ResumoMensal.user_id == user_id]
+        await self.db.execute(delete(ResumoMensal).where(*filtro))
+
+        busca = await self.db.execute(
+            insert(ResumoMensal).from_select(
+                ["user_id", "mes", "tipo", "pendente", "quitado", "quantidade"],
+                self._aggregate(user_id),
+            )
+        )
+        await self.db.commit()
+        return busca.rowcount
+
+    async def check(self, user_id: int = None) -> list[dict]:
+        # Compara o resumo gravado com o recalculado, sem alterar nada
+        filtro = [] if user_id is None else [ResumoMensal.user_id == user_id]
+        gravado = await self.db.execute(select(*self._colunas()).where(*filtro))
+        esperado = await self.db.execute(self._aggregate(user_id))
+
+        gravado = {tuple(linha[:3]): self._totais(linha) for linha in gravado}
+        esperado = {tuple(linha[:3]): self._totais(linha) for linha in esperado}
+
+        divergencias = []
+        for chave in sorted(gravado.keys() | esperado.keys()):
+            atual = gravado.get(chave, (0.0, 0.0, 0))
+            correto = esperado.get(chave, (0.0, 0.0, 0))
+            if atual != correto:
+                divergencias.append(
+                    {
+                        "user_id": chave[0],
+                        "mes": chave[1],
+                        "tipo": chave[2],
+                        "gravado": atual,
+                        "esperado": correto,
+                    }
+                )
+        return divergencias
+
+    def _aggregate(self, user_id: int = None):
+        mes = self._inicio_do_mes(Despesa.vencimento)
+        filtro = [] if user_id is None else [Despesa.user_id == user_id]
+        return (
+            select(
+                Despesa.user_id,
+                mes,
+                Despesa.tipo,
+                func.sum(case((Despesa.status == "P", Despesa.valor), else_=0)),
+                func.sum(case((Despesa.status == "Q", Despesa.valor), else_=0)),
+                func.count(),
+            )
+            .where(*filtro)
+            .group_by(Despesa.user_id, mes, Despesa.tipo)
+        )
+
+    def _colunas(self) -> list:
+        return [
+            ResumoMensal.user_id,
+            ResumoMensal.mes,
+            ResumoMensal.tipo,
+            ResumoMensal.pendente,
+            ResumoMensal.quitado,
+            ResumoMensal.quantidade,
+        ]
+
+    def _inicio_do_mes(self, coluna):
+        if self.db.get_bind().dialect.name == "sqlite":
+            return type_coerce(func.date(coluna, "start of month"), Date)
+        return cast(func.date_trunc("month", coluna), Date)
+
+    @staticmethod
+    def _totais(linha) -> tuple[float, float, int]:
+        return (round(float(linha[3]), 2), round(float(linha[4]), 2), int(linha[5]))
@@ -1,3 +1,6 @@
+from typing import Iterable
+
+from sqlalchemy import lambda_stmt, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.model.user import User
@@ -5,19 +8,41 @@ from app.repository.base import BaseRepository
 
 
 class UserRepository(BaseRepository[User]):
+    version_column = "versao"
+
     def __init__(self, db: AsyncSession):
         super().__init__(User, db)
 
     async def get_by_email(self, email: str) -> User:
-        busca = await self.get_by_filter(User.email == email)
+        query = lambda_stmt(lambda: select(User).where(User.email == email).limit(1))
+        busca = (await self.db.execute(query)).scalar_one_or_none()
         if busca:
-            return busca[0]
+            return busca
 
         raise ValueError(f"Usuário com email = {email} não encontrado")
     
     async def get_by_username(self, username: str) -> User:
-        busca = await self.get_by_filter(User.nome == username)
+        query = lambda_stmt(lambda: select(User).where(User.nome == username).limit(1))
+        busca = (await self.db.execute(query)).scalar_one_or_none()
         if busca:
-            return busca[0]
+            return busca
 
         raise ValueError(f"Usuário com nome = {username} não encontrado")
+
+    async def get_despesas_version(self, id: int) -> int | None:
+        query = lambda_stmt(lambda: select(User.versao_despesas).where(User.id == id))
+        return (await self.db.execute(query)).scalar_one_or_none()
+
+    async def bump_despesas_version(self, ids: Iterable[int]) -> None:
+        # Roda na transação da escrita das despesas; a ordem fixa dos ids evita
+        # deadlock entre escritas concorrentes que tocam os mesmos usuários
+        ids = sorted(set(ids))
+        if not ids:
+            return
+
+        await self.db.execute(
+            update(User)
+            .where(User.id.in_(ids))
+            .values(versao_despesas=User.versao_despesas + 1)
+            .execution_options(synchronize_session=False)
+        )
@@ -0,0 +1,18 @@
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel, Field
+
+
+Item = TypeVar("Item")
+
+
+class BulkErrorSchema(BaseModel):
+
+    index: int = Field(..., ge=0, description="Posição do item na requisição")
+    detail: str = Field(..., description="Motivo da falha")
+
+
+class BulkResultSchema(BaseModel, Generic[Item]):
+
+    items: list[Item] = Field(..., description="Itens processados com sucesso")
+    errors: list[BulkErrorSchema] = Field(..., description="Itens que falharam")
@@ -18,5 +18,70 @@ class DespesaSchema(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class DespesaPatchSchema(BaseModel):
+    # Todos os campos são opcionais; apenas os enviados são gravados
+
+    nome: str = Field(None, description="Nome da despesa")
+    tipo: str = Field(None, description="Tipo da despesa")
+    status: Literal["P", "Q"] = Field(
+        None, description="Status da despesa: P - Pendente, Q - Quitada"
+    )
+    vencimento: date = Field(None, description="Data de vencimento do ativo")
+    valor: float = Field(None, gt=0, description="Valor da despesa")
+    user_id: int = Field(None, gt=0, description="Usuário que está relacionado")
+
+
+class DespesaFilterSchema(BaseModel):
+    # Filtros da listagem por usuário, convertidos em predicados SQL
+
+    inicio: date | None = Field(None, alias="from", description="Vencimento a partir de")
+    fim: date | None = Field(None, alias="to", description="Vencimento até")
+    status: Literal["P", "Q"] | None = Field(
+        None, description="Status da despesa: P - Pendente, Q - Quitada"
+    )
+    tipo: str | None = Field(None, description="Tipo da despesa")
+    valor_min: float | None = Field(None, ge=0, description="Valor mínimo")
+    valor_max: float | None = Field(None, ge=0, description="Valor máximo")
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class DespesaBulkUpdateSchema(DespesaSchema):
+    id: int = Field(..., gt=0, description="ID da despesa a ser atualizada")
+
+
 class DespesaOutputSchema(DespesaSchema):
     id: int = Field(..., gt=0)
+    recorrencia_id: int | None = Field(
+        None, description="Regra de recorrência que gerou a despesa"
+    )
+
+
+class DespesaBalanceTipoSchema(BaseModel):
+
+    tipo: str = Field(..., description="Tipo da despesa")
+    pending: float = Field(..., description="Total pendente")
+    paid: float = Field(..., description="Total quitado")
+    count: int = Field(..., ge=0, description="Quantidade de despesas")
+
+
+class DespesaBalanceSchema(BaseModel):
+
+    month: str = Field(..., description="Mês de vencimento (AAAA-MM)")
+    pending: float = Field(..., description="Total pendente no mês")
+    paid: float = Field(..., description="Total quitado no mês")
+    count: int = Field(..., ge=0, description="Quantidade de despesas no mês")
+    by_tipo: list[DespesaBalanceTipoSchema] = Field(
+        ..., description="Totais do mês por tipo"
+    )
+
+
+class DespesaSummarySchema(BaseModel):
+
+    month: str | None = Field(None, description="Mês de vencimento (AAAA-MM)")
+    tipo: str | None = Field(None, description="Tipo da despesa")
+    status: Literal["P", "Q"] | None = Field(
+        None, description="Status da despesa: P - Pendente, Q - Quitada"
+    )
+    total: float = Field(..., description="Soma dos valores do grupo")
+    count: int = Field(..., ge=0, description="Quantidade de despesas do grupo")
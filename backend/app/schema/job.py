@@ -0,0 +1,51 @@
+from datetime import date, datetime
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field, ConfigDict
+
+from app.repository.base import CHUNK_SIZE
+from app.schema.despesa import DespesaSchema
+
+
+class JobSchema(BaseModel):
+
+    tipo: str = Field(..., description="Tarefa a executar (ex.: recorrencias.gerar)")
+    payload: dict[str, Any] = Field(
+        default_factory=dict, description="Parâmetros da tarefa"
+    )
+    max_tentativas: int = Field(
+        None, gt=0, le=10, description="Tentativas antes de marcar como falha"
+    )
+
+
+class JobOutputSchema(BaseModel):
+    id: int = Field(..., gt=0)
+    tipo: str = Field(..., description="Tarefa executada")
+    status: Literal["pendente", "executando", "concluido", "falhou"] = Field(
+        ..., description="Situação da tarefa"
+    )
+    payload: dict[str, Any] = Field(..., description="Parâmetros da tarefa")
+    resultado: Any = Field(None, description="Retorno da tarefa, quando concluída")
+    erro: str | None = Field(None, description="Erro da última tentativa")
+    tentativas: int = Field(..., ge=0)
+    max_tentativas: int = Field(..., gt=0)
+    criado_em: datetime
+    iniciado_em: datetime | None = None
+    concluido_em: datetime | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class GerarRecorrenciasPayload(BaseModel):
+    horizonte: date | None = Field(None, description="Gera as despesas até esta data")
+    batch_size: int | None = Field(None, gt=0, le=10_000, description="Regras por lote")
+
+
+class RebuildResumoPayload(BaseModel):
+    user_id: int | None = Field(None, gt=0, description="Apenas um usuário")
+    check: bool = Field(False, description="Só lista as divergências, sem gravar")
+
+
+class ImportarDespesasPayload(BaseModel):
+    items: list[DespesaSchema] = Field(..., description="Despesas a criar")
+    chunk_size: int = Field(CHUNK_SIZE, gt=0, le=5000)
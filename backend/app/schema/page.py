@@ -0,0 +1,14 @@
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel, Field
+
+
+Item = TypeVar("Item")
+
+
+class PageSchema(BaseModel, Generic[Item]):
+
+    items: list[Item] = Field(..., description="Itens da página")
+    next_cursor: str | None = Field(
+        None, description="Cursor da próxima página, nulo na última página"
+    )
@@ -0,0 +1,38 @@
+from datetime import date
+from typing import Literal
+
+from pydantic import BaseModel, Field, ConfigDict, model_validator
+
+
+class RecorrenciaSchema(BaseModel):
+
+    nome: str = Field(..., description="Nome das despesas geradas")
+    tipo: str = Field(..., description="Tipo das despesas geradas")
+    valor: float = Field(..., gt=0, description="Valor de cada despesa")
+    user_id: int = Field(..., gt=0, description="Usuário que está relacionado")
+    frequencia: Literal["mensal", "semanal"] = Field(
+        ..., description="Unidade da recorrência"
+    )
+    intervalo: int = Field(1, gt=0, description="A cada N meses ou semanas")
+    inicio: date = Field(..., description="Primeiro vencimento")
+    fim: date | None = Field(None, description="Último vencimento possível")
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @model_validator(mode="after")
+    def check_fim(self):
+        if self.fim is not None and self.fim < self.inicio:
+            raise ValueError("A data final deve ser posterior ao início.")
+        return self
+
+
+class RecorrenciaOutputSchema(RecorrenciaSchema):
+    id: int = Field(..., gt=0)
+    gerado_ate: date | None = Field(
+        None, description="Horizonte até onde as despesas já foram geradas"
+    )
+
+
+class RecorrenciaMaterializeSchema(BaseModel):
+    created: int = Field(..., ge=0, description="Despesas criadas")
+    rules: int = Field(..., ge=0, description="Regras processadas")
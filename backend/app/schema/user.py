@@ -11,9 +11,21 @@ class UserSchema(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class UserPatchSchema(BaseModel):
+
+    nome: str = Field(None, description="Nome do ativo")
+    email: EmailStr = Field(None, description="Email do usuário")
+    senha: str = Field(None, min_length=6, description="Senha do usuário")
+
+
 class UserOutputSchema(BaseModel):
     id: int = Field(..., gt=0)
     nome: str = Field(..., description="Nome do ativo")
     email: EmailStr = Field(..., description="Email do usuário")
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class UserLoginSchema(BaseModel):
+    email: EmailStr = Field(..., description="Email do usuário")
+    senha: str = Field(..., description="Senha do usuário")
@@ -0,0 +1,60 @@
+"""Servidor de produção: uvicorn com um worker por núcleo disponível.
+
+    python -m app.cli migrate
+    python -m app.server [--workers N] [--port 8080]
+"""
+
+import argparse
+import os
+from os.path import dirname
+
+import uvicorn
+
+from app.core.settings import get_settings
+
+
+BACKEND_DIR = dirname(dirname(__file__))
+
+
+def cpu_count() -> int:
+    # Respeita o limite de CPUs do processo (cgroups/taskset), quando houver
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def workers_count(configurado: int = None) -> int:
+    return max(1, configurado or get_settings().WEB_CONCURRENCY or cpu_count())
+
+
+def main() -> None:
+    settings = get_settings()
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=settings.HOST)
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    parser.add_argument("--workers", type=int, help="Padrão: WEB_CONCURRENCY ou nº de CPUs")
+    args = parser.parse_args()
+
+    # Cada worker é um processo com o próprio event loop e pool de conexões,
+    # e monta a aplicação com create_app; o schema não é criado aqui, e sim
+    # no passo de migração. Os workers herdam WEB_CONCURRENCY, que desliga o
+    # cache em memória quando há mais de um
+    workers = workers_count(args.workers)
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    uvicorn.run(
+        "main:create_app",
+        factory=True,
+        app_dir=BACKEND_DIR,
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.FORWARDED_ALLOW_IPS,
+        timeout_graceful_shutdown=settings.GRACEFUL_SHUTDOWN_TIMEOUT,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,14 @@
-from typing import Generic, TypeVar
+from typing import Any, Awaitable, Callable, Generic, Iterable, TypeVar
 from pydantic import BaseModel
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.repository.base import BaseRepository
+from app.core.cache import CacheBackend, get_cache
+from app.core.database import SESSION_REPLICA, SESSION_STICKY
+from app.core.serialization import to_json
+from app.repository.base import CHUNK_SIZE, BaseRepository
+from app.schema.bulk import BulkErrorSchema, BulkResultSchema
+from app.schema.page import PageSchema
 
 
 Repository = TypeVar("Repository", bound=BaseRepository)
@@ -12,29 +17,189 @@ InputShema = TypeVar("SchemaInput", bound=BaseModel)
 
 
 class BaseService(Generic[Repository, InputShema, OutputSchema]):
-    def __init__(self, repository: type[Repository], output_schema: type[OutputSchema], db: AsyncSession):
+    def __init__(
+        self,
+        repository: type[Repository],
+        output_schema: type[OutputSchema],
+        db: AsyncSession,
+        cache: CacheBackend = None,
+    ):
         self.repository = repository(db)
         self.output_schema = output_schema
+        self.cache = cache or get_cache()
+        self.namespace = self.repository.model.__tablename__
 
     async def get_all(self, limit: int = 15, offset: int = 0) -> list[OutputSchema]:
-        busca = await self.repository.get_all(limit, offset)
+        async def carregar():
+            busca = await self.repository.get_all(limit, offset)
+            return [self.output_schema.model_validate(objeto) for objeto in busca]
 
-        return [self.output_schema.model_validate(objeto) for objeto in busca]
+        return await self._cached(
+            f"{self.namespace}:all:{limit}:{offset}",
+            carregar,
+            lambda busca: [
+                f"{self.namespace}:all",
+                *(tag for objeto in busca for tag in self._entity_tags(objeto)),
+            ],
+        )
+
+    async def get_all_json(self, limit: int = 15, offset: int = 0) -> bytes:
+        # Caminho de leitura enxuto: colunas do schema de saída serializadas
+        # direto para JSON, sem validação do Pydantic por linha
+        campos = list(self.output_schema.model_fields)
+
+        async def carregar():
+            return await self.repository.get_rows(campos, limit=limit, offset=offset)
+
+        busca = await self._cached(
+            f"{self.namespace}:rows:all:{limit}:{offset}",
+            carregar,
+            lambda busca: [
+                f"{self.namespace}:all",
+                *(tag for linha in busca for tag in self._entity_tags(linha)),
+            ],
+        )
+        return self.rows_to_json(busca)
+
+    def rows_to_json(self, linhas: list) -> bytes:
+        # Linhas com as colunas do schema de saída, na mesma ordem
+        return to_json(list(self.output_schema.model_fields), linhas)
+
+    async def get_page(
+        self, cursor: str = None, limit: int = 15
+    ) -> PageSchema[OutputSchema]:
+        busca, proximo = await self.repository.get_page(cursor=cursor, limit=limit)
+
+        return PageSchema[self.output_schema](
+            items=[self.output_schema.model_validate(objeto) for objeto in busca],
+            next_cursor=proximo,
+        )
 
     async def get_by_id(self, id: int) -> OutputSchema:
-        busca = await self.repository.get_by_id(id)
+        async def carregar():
+            busca = await self.repository.get_by_id(id)
+            return self.output_schema.model_validate(busca)
 
-        return self.output_schema.model_validate(busca)
+        return await self._cached(
+            f"{self.namespace}:id:{id}", carregar, self._entity_tags
+        )
 
     async def create(self, schema: InputShema) -> OutputSchema:
         resposta = await self.repository.create(**schema.model_dump())
+        resposta = self.output_schema.model_validate(resposta)
 
-        return self.output_schema.model_validate(resposta)
+        await self.cache.invalidate(*self._collection_tags(resposta))
+        return resposta
 
     async def update(self, id: int, schema: InputShema) -> OutputSchema:
         resposta = await self.repository.update(id, **schema.model_dump())
+        resposta = self.output_schema.model_validate(resposta)
 
-        return self.output_schema.model_validate(resposta)
+        await self.cache.invalidate(
+            f"{self.namespace}:{id}", *self._collection_tags(resposta)
+        )
+        return resposta
+
+    async def patch(self, id: int, schema: BaseModel) -> OutputSchema:
+        dados = schema.model_dump(exclude_unset=True)
+        if not dados:
+            return await self.get_by_id(id)
+
+        resposta = await self.repository.update(id, **dados)
+        resposta = self.output_schema.model_validate(resposta)
+
+        await self.cache.invalidate(
+            f"{self.namespace}:{id}", *self._collection_tags(resposta)
+        )
+        return resposta
 
     async def delete(self, id: int) -> None:
-        await self.repository.delete(id)
+        removido = await self.repository.delete(id)
+        await self.cache.invalidate(
+            f"{self.namespace}:{id}", *self._collection_tags(removido)
+        )
+
+    async def create_many(
+        self, schemas: list[InputShema], chunk_size: int = CHUNK_SIZE
+    ) -> BulkResultSchema[OutputSchema]:
+        resposta, erros = await self.repository.create_many(
+            [schema.model_dump() for schema in schemas], chunk_size
+        )
+        resposta = [self.output_schema.model_validate(objeto) for objeto in resposta]
+
+        await self.cache.invalidate(
+            *{tag for objeto in resposta for tag in self._collection_tags(objeto)}
+        )
+        return self._bulk_result(resposta, erros)
+
+    async def update_many(
+        self, schemas: list[BaseModel], chunk_size: int = CHUNK_SIZE
+    ) -> BulkResultSchema[OutputSchema]:
+        resposta, erros = await self.repository.update_many(
+            [schema.model_dump() for schema in schemas], chunk_size
+        )
+        resposta = [self.output_schema.model_validate(objeto) for objeto in resposta]
+
+        await self.cache.invalidate(
+            *{
+                tag
+                for objeto in resposta
+                for tag in (
+                    f"{self.namespace}:{objeto.id}",
+                    *self._collection_tags(objeto),
+                )
+            }
+        )
+        return self._bulk_result(resposta, erros)
+
+    async def delete_many(
+        self, ids: list[int], chunk_size: int = CHUNK_SIZE
+    ) -> BulkResultSchema[int]:
+        resposta, erros = await self.repository.delete_many(ids, chunk_size)
+
+        await self.cache.invalidate(*self._written_tags(resposta))
+        return self._bulk_result([linha.id for linha in resposta], erros)
+
+    async def _cached(
+        self,
+        chave: str,
+        carregar: Callable[[], Awaitable[Any]],
+        tags: Callable[[Any], Iterable[str]],
+    ) -> Any:
+        sessao = self.repository.db.info
+        if not sessao.get(SESSION_STICKY):
+            busca = await self.cache.get(chave)
+            if busca is not None:
+                return busca
+
+        versao = self.cache.version
+        busca = await carregar()
+        if not sessao.get(SESSION_REPLICA):
+            await self.cache.set(chave, busca, tags(busca), since=versao)
+        return busca
+
+    def _entity_tags(self, objeto: OutputSchema) -> list[str]:
+        # Tags que identificam a entidade em qualquer consulta em cache
+        return [f"{self.namespace}:{objeto.id}"]
+
+    def _collection_tags(self, objeto: OutputSchema) -> list[str]:
+        # Tags das consultas em que a entidade pode passar a aparecer
+        return [f"{self.namespace}:all"]
+
+    def _written_tags(self, linhas: list) -> set[str]:
+        # Linhas devolvidas pelo repositório (id e colunas monitoradas) de uma
+        # remoção ou atualização em lote
+        return {
+            tag
+            for linha in linhas
+            for tag in (f"{self.namespace}:{linha.id}", *self._collection_tags(linha))
+        }
+
+    def _bulk_result(self, itens: list, erros: list[tuple[int, str]]) -> BulkResultSchema:
+        return BulkResultSchema(
+            items=itens,
+            errors=[
+                BulkErrorSchema(index=indice, detail=detalhe)
+                for indice, detalhe in erros
+            ],
+        )
@@ -1,16 +1,246 @@
+from datetime import date
+from typing import AsyncIterator, Literal
+
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.schema.despesa import DespesaOutputSchema, DespesaSchema
+from app.core.serialization import to_csv, to_ndjson
+
+from app.repository.base import CHUNK_SIZE
+from app.schema.bulk import BulkResultSchema
+from app.schema.page import PageSchema
+from app.schema.despesa import (
+    DespesaBalanceSchema,
+    DespesaBalanceTipoSchema,
+    DespesaFilterSchema,
+    DespesaOutputSchema,
+    DespesaSchema,
+    DespesaSummarySchema,
+)
 from app.repository.despesa import DespesaRepository
 from .base import BaseService
 
 
+SUMMARY_GROUPS = ("month", "tipo", "status")
+
+
 class DespesaService(
     BaseService[DespesaRepository, DespesaSchema, DespesaOutputSchema]
 ):
     def __init__(self, db: AsyncSession):
         super().__init__(DespesaRepository, DespesaOutputSchema, db)
 
-    async def get_by_user_id(self, user_id: int) -> list[DespesaOutputSchema]:
-        busca = await self.repository.get_by_user_id(user_id)
-        return [DespesaOutputSchema.model_validate(objeto) for objeto in busca]
+    async def get_by_user_id(
+        self,
+        user_id: int,
+        filtros: DespesaFilterSchema = None,
+        order: str = "vencimento",
+        limit: int = 15,
+    ) -> list[DespesaOutputSchema]:
+        filtros = self._filtros(filtros)
+
+        async def carregar():
+            busca = await self.repository.get_by_user_id(
+                user_id, order, limit, **filtros
+            )
+            return [DespesaOutputSchema.model_validate(objeto) for objeto in busca]
+
+        if filtros:
+            return await carregar()
+
+        return await self._cached(
+            f"{self.namespace}:user:{user_id}:list:{order}:{limit}",
+            carregar,
+            lambda busca: [
+                f"{self.namespace}:user:{user_id}",
+                f"{self.namespace}:owner:{user_id}",
+                *(tag for objeto in busca for tag in self._entity_tags(objeto)),
+            ],
+        )
+
+    async def get_by_user_id_json(
+        self,
+        user_id: int,
+        filtros: DespesaFilterSchema = None,
+        order: str = "vencimento",
+        limit: int = 15,
+    ) -> bytes:
+        _, busca = await self.get_versioned_rows_by_user_id(
+            user_id, filtros, order, limit
+        )
+        return self.rows_to_json(busca)
+
+    async def get_collection_version(self, user_id: int) -> int | None:
+        return await self.repository.users.get_despesas_version(user_id)
+
+    async def get_versioned_rows_by_user_id(
+        self,
+        user_id: int,
+        filtros: DespesaFilterSchema = None,
+        order: str = "vencimento",
+        limit: int = 15,
+    ) -> tuple[int | None, list[Row]]:
+        # A versão da coleção fica em cache junto com as linhas, então o ETag
+        # sempre descreve o conteúdo devolvido. É lida antes das linhas: uma
+        # escrita concorrente gera, no máximo, um ETag antigo para dados novos
+        campos = list(DespesaOutputSchema.model_fields)
+        filtros = self._filtros(filtros)
+
+        async def carregar():
+            versao = await self.repository.users.get_despesas_version(user_id)
+            busca = await self.repository.get_rows_by_user_id(
+                user_id, campos, order, limit, **filtros
+            )
+            return versao, busca
+
+        if filtros:
+            return await carregar()
+
+        return await self._cached(
+            f"{self.namespace}:rows:user:{user_id}:list:{order}:{limit}",
+            carregar,
+            lambda busca: [
+                f"{self.namespace}:user:{user_id}",
+                f"{self.namespace}:owner:{user_id}",
+                *(tag for linha in busca[1] for tag in self._entity_tags(linha)),
+            ],
+        )
+
+    async def get_page_by_user_id(
+        self,
+        user_id: int,
+        filtros: DespesaFilterSchema = None,
+        order: str = "vencimento",
+        cursor: str = None,
+        limit: int = 15,
+    ) -> PageSchema[DespesaOutputSchema]:
+        busca, proximo = await self.repository.get_page_by_user_id(
+            user_id, order, cursor, limit, **self._filtros(filtros)
+        )
+
+        return PageSchema[DespesaOutputSchema](
+            items=[DespesaOutputSchema.model_validate(objeto) for objeto in busca],
+            next_cursor=proximo,
+        )
+
+    async def mark_as_paid(
+        self, ids: list[int], chunk_size: int = CHUNK_SIZE
+    ) -> BulkResultSchema[int]:
+        resposta, erros = await self.repository.update_by_ids(
+            ids, chunk_size, status="Q"
+        )
+
+        await self.cache.invalidate(*self._written_tags(resposta))
+        return self._bulk_result([linha.id for linha in resposta], erros)
+
+    async def summary(
+        self,
+        user_id: int,
+        group_by: list[str],
+        inicio: date = None,
+        fim: date = None,
+    ) -> list[DespesaSummarySchema]:
+        invalidos = set(group_by) - set(SUMMARY_GROUPS)
+        if invalidos or not group_by:
+            raise ValueError(
+                f"group_by deve conter apenas: {', '.join(SUMMARY_GROUPS)}"
+            )
+        if inicio is not None and fim is not None and inicio > fim:
+            raise ValueError("A data inicial deve ser anterior à data final.")
+
+        # Preserva a ordem informada, ignorando grupos repetidos
+        group_by = list(dict.fromkeys(group_by))
+        busca = await self.repository.summary(user_id, group_by, inicio, fim)
+
+        resumo = []
+        for linha in busca:
+            dados = linha._mapping
+            resumo.append(
+                DespesaSummarySchema(
+                    month=(
+                        f"{int(dados['ano']):04d}-{int(dados['mes']):02d}"
+                        if "month" in group_by
+                        else None
+                    ),
+                    tipo=dados.get("tipo"),
+                    status=dados.get("status"),
+                    total=dados["total"],
+                    count=dados["quantidade"],
+                )
+            )
+        return resumo
+
+    async def search(
+        self, user_id: int, termo: str, cursor: str = None, limit: int = 15
+    ) -> PageSchema[DespesaOutputSchema]:
+        busca, proximo = await self.repository.search(user_id, termo, cursor, limit)
+
+        return PageSchema[DespesaOutputSchema](
+            items=[DespesaOutputSchema.model_validate(objeto) for objeto in busca],
+            next_cursor=proximo,
+        )
+
+    async def balance(self, user_id: int, mes: str = None) -> DespesaBalanceSchema:
+        try:
+            inicio = date.fromisoformat(f"{mes}-01") if mes else date.today()
+        except ValueError:
+            raise ValueError("O mês deve estar no formato AAAA-MM.")
+
+        # Lido de tb_resumo_mensal: uma linha por tipo, sem varrer as despesas
+        busca = await self.repository.get_balance(user_id, inicio)
+        tipos = [
+            DespesaBalanceTipoSchema(
+                tipo=linha.tipo,
+                pending=linha.pendente,
+                paid=linha.quitado,
+                count=linha.quantidade,
+            )
+            for linha in busca
+            if linha.quantidade
+        ]
+        return DespesaBalanceSchema(
+            month=inicio.strftime("%Y-%m"),
+            pending=sum(tipo.pending for tipo in tipos),
+            paid=sum(tipo.paid for tipo in tipos),
+            count=sum(tipo.count for tipo in tipos),
+            by_tipo=tipos,
+        )
+
+    def _filtros(self, filtros: DespesaFilterSchema = None) -> dict:
+        # Só as listagens sem filtro vão para o cache: uma escrita pode fazer
+        # uma despesa entrar em um filtro sem invalidar as consultas dele
+        if filtros is None:
+            return {}
+
+        if filtros.inicio and filtros.fim and filtros.inicio > filtros.fim:
+            raise ValueError("A data inicial deve ser anterior à data final.")
+        if (
+            filtros.valor_min is not None
+            and filtros.valor_max is not None
+            and filtros.valor_min > filtros.valor_max
+        ):
+            raise ValueError("O valor mínimo deve ser menor que o valor máximo.")
+        return filtros.model_dump(exclude_none=True)
+
+    def _entity_tags(self, objeto: DespesaOutputSchema) -> list[str]:
+        return [*super()._entity_tags(objeto), f"{self.namespace}:owner:{objeto.user_id}"]
+
+    def _collection_tags(self, objeto: DespesaOutputSchema) -> list[str]:
+        return [
+            *super()._collection_tags(objeto),
+            f"{self.namespace}:user:{objeto.user_id}",
+        ]
+
+    async def export_by_user_id(
+        self, user_id: int, format: Literal["csv", "ndjson"] = "csv"
+    ) -> AsyncIterator[str]:
+        campos = list(DespesaOutputSchema.model_fields)
+
+        if format == "csv":
+            yield to_csv(campos, [], cabecalho=True)
+
+        async for lote in self.repository.stream_by_user_id(user_id, campos):
+            if format == "csv":
+                yield to_csv(campos, lote)
+            else:
+                yield to_ndjson(campos, lote)
@@ -0,0 +1,74 @@
+from datetime import datetime, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.jobs import (
+    JobBackend,
+    current_job,
+    get_job_backend,
+    job_handler,
+    validate_payload,
+)
+from app.core.settings import get_settings
+from app.repository.job import JobRepository
+from app.repository.resumo import ResumoRepository
+from app.schema.bulk import BulkResultSchema
+from app.schema.job import (
+    GerarRecorrenciasPayload,
+    ImportarDespesasPayload,
+    JobOutputSchema,
+    JobSchema,
+    RebuildResumoPayload,
+)
+from app.service.despesa import DespesaService
+from app.service.recorrencia import RecorrenciaService
+
+
+class JobService:
+    def __init__(self, backend: JobBackend = None):
+        self.backend = backend or get_job_backend()
+
+    async def enqueue(self, schema: JobSchema) -> JobOutputSchema:
+        payload = validate_payload(schema.tipo, schema.payload)
+        return await self.backend.enqueue(
+            schema.tipo,
+            payload,
+            schema.max_tentativas or get_settings().JOB_MAX_ATTEMPTS,
+        )
+
+    async def get_by_id(self, id: int) -> JobOutputSchema:
+        return await self.backend.get(id)
+
+
+# Tarefas executadas pelo JobWorker; cada uma recebe uma sessão própria
+
+
+@job_handler("recorrencias.gerar", GerarRecorrenciasPayload)
+async def gerar_recorrencias(db: AsyncSession, payload: GerarRecorrenciasPayload):
+    return await RecorrenciaService(db).materialize(payload.horizonte, payload.batch_size)
+
+
+@job_handler("resumo.rebuild", RebuildResumoPayload)
+async def rebuild_resumo(db: AsyncSession, payload: RebuildResumoPayload):
+    repository = ResumoRepository(db)
+    if payload.check:
+        return {"divergences": await repository.check(payload.user_id)}
+    return {"rows": await repository.rebuild(payload.user_id)}
+
+
+@job_handler("despesas.importar", ImportarDespesasPayload)
+async def importar_despesas(db: AsyncSession, payload: ImportarDespesasPayload):
+    # Idempotente pelo id da tarefa: a chave é gravada no mesmo commit das
+    # despesas, e uma segunda execução (lease perdido, worker que caiu entre
+    # o commit e a conclusão) não as cria de novo
+    job = current_job()
+    if job is not None and not await JobRepository(db).register_effect(
+        job.id, datetime.now(timezone.utc)
+    ):
+        return {"already_imported": True}
+
+    resposta = await DespesaService(db).create_many(payload.items, payload.chunk_size)
+    # Só os ids: o resultado fica gravado na fila e não precisa repetir as despesas
+    return BulkResultSchema[int](
+        items=[objeto.id for objeto in resposta.items], errors=resposta.errors
+    )
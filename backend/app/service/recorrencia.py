@@ -0,0 +1,103 @@
+from datetime import date, timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.recurrence import occurrences
+from app.core.settings import get_settings
+from app.repository.recorrencia import RecorrenciaRepository
+from app.schema.recorrencia import (
+    RecorrenciaMaterializeSchema,
+    RecorrenciaOutputSchema,
+    RecorrenciaSchema,
+)
+from .base import BaseService
+
+
+class RecorrenciaService(
+    BaseService[RecorrenciaRepository, RecorrenciaSchema, RecorrenciaOutputSchema]
+):
+    def __init__(self, db: AsyncSession):
+        super().__init__(RecorrenciaRepository, RecorrenciaOutputSchema, db)
+
+    async def get_by_user_id(self, user_id: int) -> list[RecorrenciaOutputSchema]:
+        async def carregar():
+            busca = await self.repository.get_by_user_id(user_id)
+            return [self.output_schema.model_validate(objeto) for objeto in busca]
+
+        return await self._cached(
+            f"{self.namespace}:user:{user_id}:list",
+            carregar,
+            lambda busca: [
+                f"{self.namespace}:user:{user_id}",
+                *(tag for objeto in busca for tag in self._entity_tags(objeto)),
+            ],
+        )
+
+    async def create(self, schema: RecorrenciaSchema) -> RecorrenciaOutputSchema:
+        resposta = await super().create(schema)
+        # Já deixa as próximas ocorrências da nova regra disponíveis
+        await self.materialize(ids=[resposta.id])
+        return await self.get_by_id(resposta.id)
+
+    async def delete(self, id: int) -> None:
+        regra = await self.get_by_id(id)
+        await super().delete(id)
+        # As despesas geradas continuam existindo, sem o vínculo com a regra
+        await self.cache.invalidate(
+            f"{self.namespace}:user:{regra.user_id}",
+            f"tb_despesas:owner:{regra.user_id}",
+        )
+
+    async def materialize(
+        self, horizonte: date = None, batch_size: int = None, ids: list[int] = None
+    ) -> RecorrenciaMaterializeSchema:
+        settings = get_settings()
+        horizonte = horizonte or date.today() + timedelta(
+            days=settings.RECORRENCIA_HORIZONTE_DIAS
+        )
+        batch_size = batch_size or settings.RECORRENCIA_BATCH_SIZE
+
+        criadas = regras = 0
+        ultimo_id = 0
+        while True:
+            lote = await self.repository.get_pending(horizonte, ultimo_id, batch_size, ids)
+            if not lote:
+                break
+
+            despesas, marcas, usuarios = [], [], set()
+            for regra in lote:
+                for vencimento in occurrences(
+                    regra.frequencia,
+                    regra.intervalo,
+                    regra.inicio,
+                    horizonte,
+                    regra.fim,
+                    regra.gerado_ate,
+                ):
+                    despesas.append(
+                        {
+                            "nome": regra.nome,
+                            "tipo": regra.tipo,
+                            "valor": regra.valor,
+                            "status": "P",
+                            "vencimento": vencimento,
+                            "user_id": regra.user_id,
+                            "recorrencia_id": regra.id,
+                        }
+                    )
+                    usuarios.add(regra.user_id)
+                # Uma regra encerrada fica gerada até o fim e sai das próximas buscas
+                gerado_ate = min(horizonte, regra.fim) if regra.fim else horizonte
+                marcas.append({"id": regra.id, "gerado_ate": gerado_ate})
+
+            criadas += await self.repository.materialize(despesas, marcas)
+            regras += len(lote)
+            ultimo_id = lote[-1].id
+
+            await self.cache.invalidate(
+                "tb_despesas:all",
+                *(f"tb_despesas:user:{user_id}" for user_id in usuarios),
+                *(f"{self.namespace}:{regra.id}" for regra in lote),
+            )
+
+        return RecorrenciaMaterializeSchema(created=criadas, rules=regras)
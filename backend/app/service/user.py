@@ -1,5 +1,7 @@
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.security import get_password_hasher
 from app.schema.user import UserOutputSchema, UserSchema
 from app.repository.user import UserRepository
 from .base import BaseService
@@ -8,11 +10,74 @@ from .base import BaseService
 class UserService(BaseService[UserRepository, UserSchema, UserOutputSchema]):
     def __init__(self, db: AsyncSession):
         super().__init__(UserRepository, UserOutputSchema, db)
+        self.hasher = get_password_hasher()
 
     async def get_by_email(self, email: str) -> UserOutputSchema:
-        busca = await self.repository.get_by_email(email)
-        return UserOutputSchema.model_validate(busca)
+        async def carregar():
+            busca = await self.repository.get_by_email(email)
+            return UserOutputSchema.model_validate(busca)
+
+        return await self._cached(
+            f"{self.namespace}:email:{email}", carregar, self._entity_tags
+        )
     
     async def get_by_username(self, username: str) -> UserOutputSchema:
-        busca = await self.repository.get_by_username(username)
-        return UserOutputSchema.model_validate(busca)
+        async def carregar():
+            busca = await self.repository.get_by_username(username)
+            return UserOutputSchema.model_validate(busca)
+
+        return await self._cached(
+            f"{self.namespace}:username:{username}", carregar, self._entity_tags
+        )
+
+    async def get_versioned_by_id(self, id: int) -> tuple[int, UserOutputSchema]:
+        # Versão e dados em cache na mesma entrada, para o ETag bater com o corpo
+        async def carregar():
+            busca = await self.repository.get_by_id(id)
+            return busca.versao, UserOutputSchema.model_validate(busca)
+
+        return await self._cached(
+            f"{self.namespace}:versioned:{id}",
+            carregar,
+            lambda busca: self._entity_tags(busca[1]),
+        )
+
+    async def authenticate(self, email: str, senha: str) -> UserOutputSchema:
+        # Pelo email, que é único; o nome pode se repetir entre usuários
+        try:
+            busca = await self.repository.get_by_email(email)
+        except ValueError:
+            # Faz o mesmo trabalho de um login válido para não revelar
+            # pelo tempo de resposta quais usuários existem
+            await self.hasher.verify(senha, await self.hasher.dummy())
+            raise ValueError("Email ou senha inválidos.")
+
+        if not await self.hasher.verify(senha, busca.senha):
+            raise ValueError("Email ou senha inválidos.")
+
+        resposta = UserOutputSchema.model_validate(busca)
+        # Senhas antigas (texto puro ou com outros parâmetros) são
+        # regravadas com os parâmetros atuais no primeiro login
+        if self.hasher.needs_rehash(busca.senha):
+            await self.repository.update(busca.id, senha=await self.hasher.hash(senha))
+        return resposta
+
+    async def create(self, schema: UserSchema) -> UserOutputSchema:
+        return await super().create(await self._hash_senha(schema))
+
+    async def update(self, id: int, schema: UserSchema) -> UserOutputSchema:
+        return await super().update(id, await self._hash_senha(schema))
+
+    async def patch(self, id: int, schema: BaseModel) -> UserOutputSchema:
+        return await super().patch(id, await self._hash_senha(schema))
+
+    async def delete(self, id: int) -> None:
+        await super().delete(id)
+        # As despesas do usuário são removidas em cascata pelo banco
+        await self.cache.invalidate(f"tb_despesas:owner:{id}")
+
+    async def _hash_senha(self, schema: BaseModel) -> BaseModel:
+        if schema.senha is None:
+            return schema
+        # model_copy mantém os campos enviados (exclude_unset do patch)
+        return schema.model_copy(update={"senha": await self.hasher.hash(schema.senha)})
@@ -0,0 +1,154 @@
+"""Benchmark de latência de clientes comuns enquanto outro cliente abusa da API.
+
+Clientes bem-comportados (um IP cada) consultam suas despesas em ritmo
+moderado enquanto um cliente abusivo dispara listagens grandes e exportações
+a uma taxa fixa, bem acima do que o servidor consegue atender. Mede p50/p99 dos clientes
+comuns e as respostas recebidas pelo abusivo, com o controle de admissão
+(rate limit + limites de concorrência) ligado ou, com --no-limits, desligado.
+
+    python -m benchmarks.abuse --reset --duration 10
+    python -m benchmarks.abuse --no-limits --duration 10
+"""
+
+import argparse
+import asyncio
+import random
+from collections import Counter
+from time import perf_counter
+
+from benchmarks.common import configure, seed, summarize, write_results
+
+
+async def comportado(client, user_id: int, args, fim: float, latencias, erros: Counter):
+    rotas = (f"/despesas/user/{user_id}?limit=50", f"/users/{user_id}")
+    numero = 0
+    while perf_counter() < fim:
+        inicio = perf_counter()
+        resposta = await client.get(rotas[numero % len(rotas)])
+        await resposta.aread()
+        latencias.append(perf_counter() - inicio)
+        if resposta.status_code >= 400:
+            erros[resposta.status_code] += 1
+        numero += 1
+        await asyncio.sleep(args.interval)
+
+
+async def abusivo(client, users: int, args, fim: float, respostas: Counter, aleatorio):
+    # Carga em malha aberta: a mesma taxa de chegada nos dois modos,
+    # independente de quanto o servidor demora para responder (ou recusar)
+    async def requisicao(caminho: str):
+        resposta = await client.get(caminho)
+        await resposta.aread()
+        respostas[resposta.status_code] += 1
+
+    pendentes = set()
+    proxima = perf_counter()
+    while perf_counter() < fim:
+        if len(pendentes) < args.abuse_concurrency:
+            if aleatorio.random() < 0.8:
+                caminho = f"/despesas/?limit=1000&offset={aleatorio.randrange(10_000)}"
+            else:
+                caminho = f"/despesas/user/{aleatorio.randint(1, users)}/export"
+            tarefa = asyncio.create_task(requisicao(caminho))
+            pendentes.add(tarefa)
+            tarefa.add_done_callback(pendentes.discard)
+        else:
+            respostas["descartada no cliente"] += 1
+
+        proxima += 1 / args.abuse_rate
+        await asyncio.sleep(max(0.0, proxima - perf_counter()))
+
+    await asyncio.gather(*pendentes)
+
+
+async def main(args) -> dict:
+    import httpx
+
+    from app.core.admission import admission_stats
+    from app.core.database import dispose_engines, get_engine
+    from main import app
+
+    populacao = await seed(args.users, args.despesas, reset=args.reset)
+    aleatorio = random.Random(args.seed)
+
+    def cliente(ip: str) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app, client=(ip, 50000)),
+            base_url="http://benchmark",
+            timeout=120,
+        )
+
+    comportados = [cliente(f"10.0.1.{numero}") for numero in range(args.clients)]
+    abusador = cliente("10.0.9.9")
+    latencias, erros, respostas = [], Counter(), Counter()
+
+    async with app.router.lifespan_context(app):
+        fim = perf_counter() + args.duration
+        inicio = perf_counter()
+        await asyncio.gather(
+            *(
+                comportado(client, numero + 1, args, fim, latencias, erros)
+                for numero, client in enumerate(comportados)
+            ),
+            abusivo(abusador, populacao["users"], args, fim, respostas, aleatorio),
+        )
+        duracao = perf_counter() - inicio
+        estatisticas = admission_stats()
+
+    for client in (*comportados, abusador):
+        await client.aclose()
+
+    resultado = summarize(latencias, duracao, sum(erros.values()), [])
+    resultado["max_ms"] = round(max(latencias) * 1000, 3) if latencias else 0.0
+    resultado["errors_by_status"] = dict(erros)
+
+    modo = "sem limites" if args.no_limits else "com limites"
+    print(
+        f"{modo}: clientes comuns {resultado['requests']} req"
+        f"  p50 {resultado['p50_ms']:.2f} ms  p99 {resultado['p99_ms']:.2f} ms"
+        f"  max {resultado['max_ms']:.2f} ms  erros {dict(erros)}"
+    )
+    print(f"{modo}: respostas ao cliente abusivo {dict(sorted(respostas.items()))}")
+
+    await dispose_engines()
+    return {
+        "params": {
+            "limits": not args.no_limits,
+            "clients": args.clients,
+            "interval": args.interval,
+            "abuse_rate": args.abuse_rate,
+            "abuse_concurrency": args.abuse_concurrency,
+            "duration": args.duration,
+            "database": get_engine().url.get_backend_name(),
+        },
+        "well_behaved": resultado,
+        "abuser": dict(respostas),
+        "admission": estatisticas,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="Banco usado pelo app (padrão: SQLite local)")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--despesas", type=int, default=200, help="Despesas por usuário")
+    parser.add_argument("--clients", type=int, default=10, help="Clientes comuns")
+    parser.add_argument(
+        "--interval", type=float, default=0.2, help="Pausa entre requisições de um cliente comum (s)"
+    )
+    parser.add_argument(
+        "--abuse-rate", type=float, default=200.0, help="Requisições por segundo do abusivo"
+    )
+    parser.add_argument(
+        "--abuse-concurrency", type=int, default=200, help="Máximo de requisições abertas do abusivo"
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="Duração da carga (s)")
+    parser.add_argument("--no-limits", action="store_true", help="Desliga o controle de admissão")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="Recria as tabelas antes de popular")
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args()
+
+    ligado = "false" if args.no_limits else "true"
+    configure(args.database_url, RATE_LIMIT_ENABLED=ligado, ADMISSION_ENABLED=ligado)
+    write_results(args.output, asyncio.run(main(args)))
@@ -0,0 +1,258 @@
+"""Benchmark de latência e vazão das rotas da API.
+
+Popula um banco local (SQLite por padrão, ou o informado em --database-url)
+e dispara cada rota de UserEndpoint e DespesaEndpoint com a concorrência
+pedida, registrando RPS, p50/p95/p99 e consultas ao banco por requisição.
+
+    python -m benchmarks.api --users 100 --despesas 500 --output resultado.json
+    python -m benchmarks.api --baseline resultado.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from itertools import count
+from time import perf_counter
+
+from benchmarks.common import QueryCounter, configure, seed, summarize, write_results
+
+
+def cenarios(users: int, aleatorio: random.Random) -> dict:
+    # Cada cenário devolve (método, caminho, corpo) para a próxima requisição
+    def user_id():
+        return aleatorio.randint(1, users)
+
+    def despesa(user=None):
+        return {
+            "nome": "benchmark",
+            "tipo": "boleto",
+            "status": "P",
+            "vencimento": "2025-06-10",
+            "valor": 99.9,
+            "user_id": user or user_id(),
+        }
+
+    novos = count()
+
+    return {
+        "GET /users/": lambda: ("GET", "/users/", None),
+        "GET /users/pagina": lambda: ("GET", "/users/pagina", None),
+        "GET /users/{id}": lambda: ("GET", f"/users/{user_id()}", None),
+        "GET /users/email/{email}": lambda: (
+            "GET",
+            f"/users/email/user{user_id() - 1}@benchmark.com",
+            None,
+        ),
+        "GET /users/username/{username}": lambda: (
+            "GET",
+            f"/users/username/user{user_id() - 1}",
+            None,
+        ),
+        "POST /users/": lambda: (
+            "POST",
+            "/users/",
+            {
+                "nome": f"novo{(n := next(novos))}",
+                "email": f"novo{n}@benchmark.com",
+                "senha": "benchmark",
+            },
+        ),
+        "PUT /users/{id}": lambda: (
+            "PUT",
+            f"/users/{(id := user_id())}",
+            {"nome": f"user{id - 1}", "email": f"user{id - 1}@benchmark.com", "senha": "benchmark"},
+        ),
+        "GET /despesas/": lambda: ("GET", "/despesas/", None),
+        "GET /despesas/pagina": lambda: ("GET", "/despesas/pagina", None),
+        "GET /despesas/{id}": lambda: ("GET", f"/despesas/{user_id()}", None),
+        "GET /despesas/user/{user_id}": lambda: (
+            "GET",
+            f"/despesas/user/{user_id()}",
+            None,
+        ),
+        "GET /despesas/user/{user_id}/summary": lambda: (
+            "GET",
+            f"/despesas/user/{user_id()}/summary",
+            None,
+        ),
+        "GET /despesas/user/{user_id}/export": lambda: (
+            "GET",
+            f"/despesas/user/{user_id()}/export?format=ndjson",
+            None,
+        ),
+        "POST /despesas/": lambda: ("POST", "/despesas/", despesa()),
+        "PUT /despesas/{id}": lambda: ("PUT", f"/despesas/{user_id()}", despesa()),
+        "POST /despesas/bulk": lambda: (
+            "POST",
+            "/despesas/bulk",
+            [despesa() for _ in range(50)],
+        ),
+    }
+
+
+async def descartaveis(client, recurso: str, total: int) -> list[int]:
+    # Cria os registros que serão removidos pelos cenários de DELETE
+    if recurso == "despesas":
+        ids = []
+        for inicio in range(0, total, 500):
+            corpo = [
+                {
+                    "nome": "descartavel",
+                    "tipo": "boleto",
+                    "status": "P",
+                    "vencimento": "2025-06-10",
+                    "valor": 1.0,
+                    "user_id": 1,
+                }
+                for _ in range(min(500, total - inicio))
+            ]
+            resposta = await client.post("/despesas/bulk", json=corpo)
+            ids.extend(item["id"] for item in resposta.json()["items"])
+        return ids
+
+    ids = []
+    for numero in range(total):
+        resposta = await client.post(
+            "/users/",
+            json={
+                "nome": f"descartavel{numero}",
+                "email": f"descartavel{numero}@benchmark.com",
+                "senha": "benchmark",
+            },
+        )
+        ids.append(resposta.json()["id"])
+    return ids
+
+
+async def executar(client, nome: str, gerar, total: int, concorrencia: int, contador):
+    latencias, queries = [], []
+    erros = 0
+    restantes = count()
+
+    async def trabalhador():
+        nonlocal erros
+        while next(restantes) < total:
+            metodo, caminho, corpo = gerar()
+            consultas = contador.start() if contador else None
+            inicio = perf_counter()
+            resposta = await client.request(metodo, caminho, json=corpo)
+            await resposta.aread()
+            latencias.append(perf_counter() - inicio)
+            if consultas is not None:
+                queries.append(consultas[0])
+            if resposta.status_code >= 400:
+                erros += 1
+
+    inicio = perf_counter()
+    await asyncio.gather(*(trabalhador() for _ in range(concorrencia)))
+    return summarize(latencias, perf_counter() - inicio, erros, queries)
+
+
+async def main(args) -> dict:
+    import httpx
+
+    from app.core.database import dispose_engines, get_engine
+
+    populacao = await seed(args.users, args.despesas, reset=args.reset)
+
+    contador = None
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60)
+    else:
+        from main import app
+
+        contador = QueryCounter()
+        contador.install(get_engine())
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=60
+        )
+
+    aleatorio = random.Random(args.seed)
+    rotas = cenarios(populacao["users"], aleatorio)
+    if args.routes:
+        rotas = {nome: gerar for nome, gerar in rotas.items() if nome in args.routes}
+
+    for recurso in ("despesas", "users"):
+        nome = f"DELETE /{recurso}/{{id}}"
+        if not args.routes or nome in args.routes:
+            rotas[nome] = None
+
+    resultados = {}
+    async with client:
+        for nome, gerar in rotas.items():
+            if gerar is None:
+                recurso = nome.split("/")[1]
+                ids = iter(
+                    await descartaveis(client, recurso, args.requests + args.warmup)
+                )
+                gerar = lambda recurso=recurso, ids=ids: (
+                    "DELETE",
+                    f"/{recurso}/{next(ids)}",
+                    None,
+                )
+            for _ in range(args.warmup):
+                metodo, caminho, corpo = gerar()
+                await client.request(metodo, caminho, json=corpo)
+            resultados[nome] = await executar(
+                client, nome, gerar, args.requests, args.concurrency, contador
+            )
+            print(
+                f"{nome:42} {resultados[nome]['rps']:>9.1f} rps"
+                f"  p50 {resultados[nome]['p50_ms']:>8.2f} ms"
+                f"  p99 {resultados[nome]['p99_ms']:>8.2f} ms"
+                f"  queries {resultados[nome]['queries_per_request']}"
+                f"  erros {resultados[nome]['errors']}"
+            )
+
+    await dispose_engines()
+    return {
+        "params": {
+            "users": args.users,
+            "despesas_por_user": args.despesas,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "cache": not args.no_cache,
+            "database": "externo" if args.url else get_engine().url.get_backend_name(),
+        },
+        "routes": resultados,
+    }
+
+
+def comparar(atual: dict, caminho: str) -> None:
+    with open(caminho, encoding="utf-8") as arquivo:
+        anterior = json.load(arquivo)
+
+    print(f"\nComparação com {caminho} (commit {anterior.get('commit')})")
+    for nome, dados in atual["routes"].items():
+        base = anterior.get("routes", {}).get(nome)
+        if not base:
+            continue
+        for metrica in ("p50_ms", "p99_ms", "rps"):
+            if base[metrica]:
+                variacao = (dados[metrica] - base[metrica]) / base[metrica] * 100
+                print(f"{nome:42} {metrica:>7} {variacao:+7.1f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="Banco usado pelo app (padrão: SQLite local)")
+    parser.add_argument("--url", help="Mede um servidor já em execução em vez do app em processo")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--despesas", type=int, default=200, help="Despesas por usuário")
+    parser.add_argument("--requests", type=int, default=500, help="Requisições por rota")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--routes", nargs="*", help="Limita o benchmark às rotas informadas")
+    parser.add_argument("--reset", action="store_true", help="Recria as tabelas antes de popular")
+    parser.add_argument("--no-cache", action="store_true", help="Desliga o cache de leitura")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="Resultado anterior para comparação")
+    args = parser.parse_args()
+
+    configure(args.database_url, cache=not args.no_cache)
+    resultados = asyncio.run(main(args))
+    write_results(args.output, resultados)
+    if args.baseline:
+        comparar(resultados, args.baseline)
@@ -0,0 +1,157 @@
+"""Benchmark da latência das leituras com o cache dos services ligado e desligado.
+
+Dispara uma mistura de leituras (listagens por usuário, páginas de
+/despesas/, despesas e usuários por ID) com escritas ocasionais (PATCH de
+despesas e quitação em lote), que invalidam o cache, e compara p50/p99,
+consultas por requisição e a taxa de acertos do cache nos dois modos.
+
+    python -m benchmarks.cache --reset --requests 5000 --concurrency 20
+    python -m benchmarks.cache --write-rate 0.2 --limit 200
+"""
+
+import argparse
+import asyncio
+import random
+from itertools import count
+from time import perf_counter
+
+from benchmarks.common import QueryCounter, configure, seed, summarize, write_results
+
+
+MODOS = ("off", "on")
+
+
+def gerador(users: int, despesas: int, args, aleatorio: random.Random):
+    # Cada chamada devolve (método, caminho, corpo) da próxima requisição
+    def proxima():
+        if aleatorio.random() < args.write_rate:
+            if aleatorio.random() < 0.5:
+                return (
+                    "PATCH",
+                    f"/despesas/{aleatorio.randint(1, despesas)}",
+                    {"valor": round(aleatorio.uniform(10, 2000), 2)},
+                )
+            return (
+                "PATCH",
+                "/despesas/bulk/quitar",
+                [aleatorio.randint(1, despesas) for _ in range(5)],
+            )
+
+        sorteio = aleatorio.random()
+        if sorteio < 0.4:
+            user_id = aleatorio.randint(1, users)
+            return "GET", f"/despesas/user/{user_id}?limit={args.limit}", None
+        if sorteio < 0.6:
+            offset = aleatorio.randrange(10) * args.limit
+            return "GET", f"/despesas/?limit={args.limit}&offset={offset}", None
+        if sorteio < 0.8:
+            return "GET", f"/despesas/{aleatorio.randint(1, despesas)}", None
+        return "GET", f"/users/{aleatorio.randint(1, users)}", None
+
+    return proxima
+
+
+async def executar(client, proxima, args, contador: QueryCounter) -> dict:
+    latencias, queries = [], []
+    erros = 0
+    restantes = count()
+
+    async def trabalhador():
+        nonlocal erros
+        while next(restantes) < args.requests:
+            metodo, caminho, corpo = proxima()
+            consultas = contador.start()
+            inicio = perf_counter()
+            resposta = await client.request(metodo, caminho, json=corpo)
+            await resposta.aread()
+            if metodo == "GET":
+                latencias.append(perf_counter() - inicio)
+                queries.append(consultas[0])
+            if resposta.status_code >= 400:
+                erros += 1
+
+    inicio = perf_counter()
+    await asyncio.gather(*(trabalhador() for _ in range(args.concurrency)))
+    return summarize(latencias, perf_counter() - inicio, erros, queries)
+
+
+async def main(args) -> dict:
+    import httpx
+
+    from app.core.cache import MemoryCache, NullCache, set_cache
+    from app.core.database import dispose_engines, get_engine
+    from app.core.settings import get_settings
+    from main import app
+
+    populacao = await seed(args.users, args.despesas, reset=args.reset)
+    settings = get_settings()
+    contador = QueryCounter()
+    contador.install(get_engine())
+
+    resultados = {}
+    async with app.router.lifespan_context(app), httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=60
+    ) as client:
+        for modo in MODOS:
+            cache = (
+                MemoryCache(settings.CACHE_MAX_ITEMS, settings.CACHE_TTL)
+                if modo == "on"
+                else NullCache()
+            )
+            set_cache(cache)
+            # Mesma semente nos dois modos: as mesmas requisições, na mesma ordem
+            proxima = gerador(
+                populacao["users"], populacao["despesas"], args, random.Random(args.seed)
+            )
+            for _ in range(args.warmup):
+                metodo, caminho, corpo = proxima()
+                await client.request(metodo, caminho, json=corpo)
+
+            dados = resultados[modo] = await executar(client, proxima, args, contador)
+            dados["cache"] = cache.stats()
+            print(
+                f"cache {modo:3}  p50 {dados['p50_ms']:>8.2f} ms  p99 {dados['p99_ms']:>8.2f} ms"
+                f"  {dados['rps']:>8.1f} leituras/s  queries/leitura {dados['queries_per_request']}"
+                f"  acertos {dados['cache'].get('hits', 0)}  erros {dados['errors']}"
+            )
+
+    desligado, ligado = resultados["off"], resultados["on"]
+    for metrica in ("p50_ms", "p99_ms"):
+        if desligado[metrica]:
+            print(f"{metrica:7} {(ligado[metrica] / desligado[metrica] - 1) * 100:+7.1f}%")
+
+    await dispose_engines()
+    return {
+        "params": {
+            "users": populacao["users"],
+            "despesas": populacao["despesas"],
+            "despesas_por_user": args.despesas,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "limit": args.limit,
+            "write_rate": args.write_rate,
+            "database": get_engine().url.get_backend_name(),
+        },
+        "modes": resultados,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="Banco usado pelo app (padrão: SQLite local)")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--despesas", type=int, default=200, help="Despesas por usuário")
+    parser.add_argument("--requests", type=int, default=5000, help="Requisições por modo")
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=50, help="Itens por listagem")
+    parser.add_argument(
+        "--write-rate", type=float, default=0.05, help="Fração de requisições de escrita"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="Recria as tabelas antes de popular")
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args()
+
+    configure(args.database_url)
+    write_results(args.output, asyncio.run(main(args)))
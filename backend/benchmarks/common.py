@@ -0,0 +1,140 @@
+import json
+import os
+import random
+import subprocess
+from contextvars import ContextVar
+from datetime import date, datetime, timedelta, timezone
+from statistics import mean
+from typing import Any
+
+
+DEFAULT_DATABASE_URL = "sqlite+aiosqlite:///benchmark.db"
+
+
+def configure(database_url: str = None, cache: bool = True, **env: Any) -> None:
+    # Precisa rodar antes do primeiro uso das configurações, que são lidas
+    # do ambiente uma vez por processo
+    os.environ["DATABASE_URL"] = database_url or os.environ.get(
+        "BENCHMARK_DATABASE_URL", DEFAULT_DATABASE_URL
+    )
+    os.environ["DB_ECHO"] = "false"
+    os.environ["CACHE_ENABLED"] = "true" if cache else "false"
+    # A carga vem de um só cliente; o limitador só entra quando pedido em env
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    os.environ["ADMISSION_ENABLED"] = "false"
+    for chave, valor in env.items():
+        os.environ[chave] = str(valor)
+
+
+async def seed(users: int, despesas_por_user: int, reset: bool = False) -> dict[str, int]:
+    from sqlalchemy import func, insert, select
+
+    from app.core.database import Base, get_database, get_engine
+    from app.model.despesa import Despesa
+    from app.model.user import User
+
+    async with get_engine().begin() as conn:
+        if reset:
+            await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with get_database().session() as db:
+        existentes = await db.scalar(select(func.count()).select_from(User))
+        if existentes:
+            despesas = await db.scalar(select(func.count()).select_from(Despesa))
+            return {"users": existentes, "despesas": despesas}
+
+        aleatorio = random.Random(42)
+        await db.execute(
+            insert(User),
+            [
+                {"nome": f"user{i}", "email": f"user{i}@benchmark.com", "senha": "benchmark"}
+                for i in range(users)
+            ],
+        )
+        ids = (await db.scalars(select(User.id).order_by(User.id))).all()
+
+        inicio = date(2024, 1, 1)
+        lote = []
+        for user_id in ids:
+            for _ in range(despesas_por_user):
+                lote.append(
+                    {
+                        "nome": aleatorio.choice(["luz", "agua", "aluguel", "internet"]),
+                        "tipo": aleatorio.choice(["boleto", "nota", "pix"]),
+                        "valor": round(aleatorio.uniform(10, 2000), 2),
+                        "status": aleatorio.choice("PQ"),
+                        "vencimento": inicio + timedelta(days=aleatorio.randrange(730)),
+                        "user_id": user_id,
+                    }
+                )
+                if len(lote) == 5000:
+                    await db.execute(insert(Despesa), lote)
+                    lote.clear()
+        if lote:
+            await db.execute(insert(Despesa), lote)
+        await db.commit()
+
+    return {"users": users, "despesas": users * despesas_por_user}
+
+
+class QueryCounter:
+    # Conta os statements enviados ao banco no contexto de cada requisição
+    current: ContextVar[list[int] | None] = ContextVar("queries", default=None)
+
+    def install(self, engine) -> None:
+        from sqlalchemy import event
+
+        @event.listens_for(engine.sync_engine, "before_cursor_execute")
+        def _contar(conn, cursor, statement, parameters, context, executemany):
+            contador = self.current.get()
+            if contador is not None:
+                contador[0] += 1
+
+    def start(self) -> list[int]:
+        contador = [0]
+        self.current.set(contador)
+        return contador
+
+
+def summarize(latencias: list[float], elapsed: float, erros: int, queries: list[int]) -> dict:
+    ordenadas = sorted(latencias)
+
+    def percentil(p: float) -> float:
+        if not ordenadas:
+            return 0.0
+        indice = min(len(ordenadas) - 1, round(p / 100 * (len(ordenadas) - 1)))
+        return round(ordenadas[indice] * 1000, 3)
+
+    return {
+        "requests": len(latencias),
+        "errors": erros,
+        "rps": round(len(latencias) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(mean(ordenadas) * 1000, 3) if ordenadas else 0.0,
+        "p50_ms": percentil(50),
+        "p95_ms": percentil(95),
+        "p99_ms": percentil(99),
+        "queries_per_request": round(mean(queries), 2) if queries else None,
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path: str, resultados: dict) -> None:
+    resultados = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        **resultados,
+    }
+    with open(path, "w", encoding="utf-8") as arquivo:
+        json.dump(resultados, arquivo, indent=2, ensure_ascii=False)
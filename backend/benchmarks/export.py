@@ -0,0 +1,169 @@
+"""Benchmark de memória da exportação de despesas (GET /despesas/user/{id}/export).
+
+Popula um usuário com --rows despesas (1 milhão por padrão), exporta tudo
+em CSV e em NDJSON e mede o tempo, os bytes enviados e o pico de RSS do
+processo acima do que já estava em uso antes da exportação. O corpo é lido
+direto do app ASGI e descartado a cada parte (o ASGITransport do httpx
+guardaria a resposta inteira); termina com código 1 se o pico passar de
+--max-rss-mb em algum formato.
+
+    python -m benchmarks.export --reset
+    python -m benchmarks.export --rows 200000 --max-rss-mb 48 --formats csv
+"""
+
+import argparse
+import asyncio
+import gc
+import resource
+import sys
+import threading
+import time
+
+from benchmarks.common import configure, seed, write_results
+
+
+def rss_atual() -> int:
+    # Em bytes; sem /proc (fora do Linux), o pico do processo até agora
+    try:
+        with open("/proc/self/statm") as arquivo:
+            return int(arquivo.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        fator = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * fator
+
+
+class PicoRss:
+    # Amostra o RSS numa thread enquanto a exportação roda no event loop
+    def __init__(self, intervalo: float = 0.005):
+        self.intervalo = intervalo
+        self.pico = 0
+        self.__parar = threading.Event()
+        self.__thread = threading.Thread(target=self._amostrar, daemon=True)
+
+    def _amostrar(self) -> None:
+        while not self.__parar.is_set():
+            self.pico = max(self.pico, rss_atual())
+            time.sleep(self.intervalo)
+
+    def __enter__(self) -> "PicoRss":
+        self.pico = rss_atual()
+        self.__thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.__parar.set()
+        self.__thread.join()
+        self.pico = max(self.pico, rss_atual())
+
+
+async def exportar(app, caminho: str) -> dict:
+    caminho, _, query = caminho.partition("?")
+    escopo = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": caminho,
+        "raw_path": caminho.encode(),
+        "query_string": query.encode(),
+        "headers": [(b"host", b"benchmark")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("benchmark", 80),
+    }
+    totais = {"status": None, "bytes": 0, "chunks": 0, "lines": 0}
+    enviado = asyncio.Event()
+    pedido = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        # O pedido uma vez; depois o "cliente" só desconecta quando a resposta
+        # terminar (o StreamingResponse fica escutando a desconexão)
+        if pedido:
+            return pedido.pop()
+        await enviado.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            totais["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            corpo = message.get("body", b"")
+            totais["bytes"] += len(corpo)
+            totais["lines"] += corpo.count(b"\n")
+            totais["chunks"] += 1
+            if not message.get("more_body", False):
+                enviado.set()
+
+    await app(escopo, receive, send)
+    return totais
+
+
+async def main(args) -> dict:
+    from app.core.database import dispose_engines, get_engine
+    from main import app
+
+    await seed(1, args.rows, reset=args.reset)
+
+    resultados = {}
+    async with app.router.lifespan_context(app):
+        # Exportação vazia (usuário sem despesas) antes de medir: imports e
+        # caches do primeiro uso ficam fora da conta
+        await exportar(app, "/despesas/user/0/export")
+        for formato in args.formats:
+            gc.collect()
+            antes = rss_atual()
+            inicio = time.perf_counter()
+            with PicoRss() as pico:
+                totais = await exportar(app, f"/despesas/user/1/export?format={formato}")
+            duracao = time.perf_counter() - inicio
+
+            acima = (pico.pico - antes) / 2**20
+            resultados[formato] = {
+                **totais,
+                "seconds": round(duracao, 2),
+                "rows_per_s": round(args.rows / duracao),
+                "rss_before_mb": round(antes / 2**20, 1),
+                "rss_peak_mb": round(pico.pico / 2**20, 1),
+                "rss_growth_mb": round(acima, 1),
+                "within_limit": acima <= args.max_rss_mb,
+            }
+            print(
+                f"{formato:7} {totais['lines']:>9} linhas  {totais['bytes'] / 2**20:>8.1f} MB"
+                f" em {duracao:>6.1f} s"
+                f"  RSS antes {antes / 2**20:>6.1f} MB  pico +{acima:>6.1f} MB"
+                f"  (limite {args.max_rss_mb} MB)  status {totais['status']}"
+            )
+
+    await dispose_engines()
+    return {
+        "params": {
+            "rows": args.rows,
+            "max_rss_mb": args.max_rss_mb,
+            "database": get_engine().url.get_backend_name(),
+        },
+        "formats": resultados,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="Banco usado pelo app (padrão: SQLite local)")
+    parser.add_argument(
+        "--rows", type=int, default=1_000_000, help="Despesas do usuário exportado"
+    )
+    parser.add_argument(
+        "--max-rss-mb", type=float, default=64, help="Crescimento máximo do RSS na exportação"
+    )
+    parser.add_argument(
+        "--formats", nargs="+", choices=["csv", "ndjson"], default=["csv", "ndjson"]
+    )
+    parser.add_argument("--reset", action="store_true", help="Recria as tabelas antes de popular")
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args()
+
+    # Sem o worker da fila: no SQLite ele disputaria o banco com a leitura longa
+    configure(args.database_url, JOB_WORKER_ENABLED="false")
+    resultados = asyncio.run(main(args))
+    write_results(args.output, resultados)
+    if not all(dados["within_limit"] for dados in resultados["formats"].values()):
+        sys.exit(1)
@@ -0,0 +1,127 @@
+"""Benchmark do tempo de importação e de montagem da aplicação.
+
+Roda cada etapa num interpretador novo com `python -X importtime`, repetindo
+--repeat vezes, e mostra a mediana do tempo total do processo, do trecho
+medido (importar os modelos, importar o main, montar o app com create_app,
+criar o engine) e os módulos com maior tempo próprio de importação.
+
+    python -m benchmarks.importtime
+    python -m benchmarks.importtime --repeat 10 --top 25 --only main create_app
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from os.path import dirname
+from statistics import median
+
+from benchmarks.common import configure, write_results
+
+
+BACKEND_DIR = dirname(dirname(__file__))
+
+# nome -> (código medido, precisa de DATABASE_URL)
+ETAPAS = {
+    "models": ("import app.model", False),
+    "cli": ("import app.cli", False),
+    "main": ("import main", False),
+    "create_app": ("import main; main.create_app()", True),
+    "engine": ("from app.core.database import get_engine; get_engine()", True),
+}
+
+LINHA = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def executar(codigo: str, com_banco: bool) -> dict:
+    ambiente = dict(os.environ)
+    if not com_banco:
+        # Modelos, CLI e main devem importar sem configuração nenhuma
+        ambiente.pop("DATABASE_URL", None)
+
+    script = (
+        "import time; _inicio = time.perf_counter()\n"
+        f"{codigo}\n"
+        "print(time.perf_counter() - _inicio)"
+    )
+    inicio = time.perf_counter()
+    processo = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=BACKEND_DIR,
+        env=ambiente,
+        capture_output=True,
+        text=True,
+    )
+    total = time.perf_counter() - inicio
+    if processo.returncode != 0:
+        raise RuntimeError(processo.stderr.strip().splitlines()[-1])
+
+    modulos = {}
+    for linha in processo.stderr.splitlines():
+        encontrado = LINHA.match(linha)
+        if encontrado:
+            proprio, acumulado, _, nome = encontrado.groups()
+            modulos[nome] = (int(proprio), int(acumulado))
+    return {
+        "total": total,
+        "medido": float(processo.stdout.strip().splitlines()[-1]),
+        "modulos": modulos,
+    }
+
+
+def medir(nome: str, repeat: int, top: int) -> dict:
+    codigo, com_banco = ETAPAS[nome]
+    execucoes = [executar(codigo, com_banco) for _ in range(repeat)]
+
+    proprios: dict[str, list[int]] = {}
+    for execucao in execucoes:
+        for modulo, (proprio, _) in execucao["modulos"].items():
+            proprios.setdefault(modulo, []).append(proprio)
+    maiores = sorted(proprios.items(), key=lambda item: median(item[1]), reverse=True)
+
+    return {
+        "code": codigo,
+        "process_ms": round(median(e["total"] for e in execucoes) * 1000, 1),
+        "measured_ms": round(median(e["medido"] for e in execucoes) * 1000, 1),
+        "modules": len(execucoes[-1]["modulos"]),
+        "app_modules": sum(
+            1
+            for modulo in execucoes[-1]["modulos"]
+            if modulo == "main" or modulo.startswith("app.")
+        ),
+        "top_self_ms": {
+            modulo: round(median(tempos) / 1000, 1) for modulo, tempos in maiores[:top]
+        },
+    }
+
+
+def main(args) -> dict:
+    resultados = {}
+    for nome in args.only or ETAPAS:
+        dados = resultados[nome] = medir(nome, args.repeat, args.top)
+        print(
+            f"{nome:11} processo {dados['process_ms']:>8.1f} ms"
+            f"  medido {dados['measured_ms']:>8.1f} ms"
+            f"  módulos {dados['modules']:>5} ({dados['app_modules']} do app)"
+        )
+        if args.verbose:
+            for modulo, tempo in dados["top_self_ms"].items():
+                print(f"    {tempo:>8.1f} ms  {modulo}")
+
+    return {"params": {"repeat": args.repeat, "python": sys.version.split()[0]}, "steps": resultados}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="Banco usado pelo app (padrão: SQLite local)")
+    parser.add_argument("--repeat", type=int, default=5, help="Interpretadores por etapa")
+    parser.add_argument("--top", type=int, default=15, help="Módulos mais lentos listados")
+    parser.add_argument("--only", nargs="+", choices=list(ETAPAS), help="Etapas medidas")
+    parser.add_argument("--verbose", action="store_true", help="Lista os módulos mais lentos")
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args()
+
+    configure(args.database_url)
+    write_results(args.output, main(args))
@@ -0,0 +1,133 @@
+"""Benchmark da latência de páginas profundas: LIMIT/OFFSET contra cursor.
+
+Popula o banco e, para cada profundidade pedida (página 1000 incluída por
+padrão), mede a mesma página por GET /despesas/?limit=&offset= e por
+GET /despesas/pagina?cursor=. O cursor de cada profundidade é obtido antes,
+seguindo next_cursor desde a primeira página, fora da medição. O cache dos
+services fica desligado para cada requisição chegar ao banco.
+
+    python -m benchmarks.pagination --reset
+    python -m benchmarks.pagination --depths 1 100 1000 5000 --users 500 --despesas 200
+"""
+
+import argparse
+import asyncio
+from time import perf_counter
+
+from benchmarks.common import QueryCounter, configure, seed, summarize, write_results
+
+
+async def cursores(client, profundidades: list[int], limit: int) -> dict[int, str | None]:
+    # Segue next_cursor até a página mais profunda, guardando o cursor de cada
+    # profundidade pedida (a página 1 não tem cursor)
+    encontrados = {}
+    cursor = None
+    for pagina in range(1, max(profundidades) + 1):
+        if pagina in profundidades:
+            encontrados[pagina] = cursor
+        if pagina == max(profundidades):
+            break
+        parametros = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        resposta = await client.get("/despesas/pagina", params=parametros)
+        resposta.raise_for_status()
+        cursor = resposta.json()["next_cursor"]
+        if cursor is None:
+            raise SystemExit(
+                f"Só há {pagina} páginas de {limit}; aumente --users/--despesas"
+            )
+    return encontrados
+
+
+async def medir(client, caminho: str, parametros: dict, total: int, contador) -> dict:
+    latencias, queries = [], []
+    erros = 0
+    inicio = perf_counter()
+    for _ in range(total):
+        consultas = contador.start()
+        comeco = perf_counter()
+        resposta = await client.get(caminho, params=parametros)
+        latencias.append(perf_counter() - comeco)
+        queries.append(consultas[0])
+        if resposta.status_code >= 400:
+            erros += 1
+    return summarize(latencias, perf_counter() - inicio, erros, queries)
+
+
+async def main(args) -> dict:
+    import httpx
+
+    from app.core.database import dispose_engines, get_engine
+    from main import app
+
+    populacao = await seed(args.users, args.despesas, reset=args.reset)
+    contador = QueryCounter()
+    contador.install(get_engine())
+
+    resultados = {}
+    async with app.router.lifespan_context(app), httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=60
+    ) as client:
+        encontrados = await cursores(client, args.depths, args.limit)
+
+        for pagina in sorted(args.depths):
+            offset = {"limit": args.limit, "offset": (pagina - 1) * args.limit}
+            cursor = {"limit": args.limit}
+            if encontrados[pagina]:
+                cursor["cursor"] = encontrados[pagina]
+
+            for _ in range(args.warmup):
+                await client.get("/despesas/", params=offset)
+                await client.get("/despesas/pagina", params=cursor)
+
+            dados = resultados[pagina] = {
+                "offset": await medir(client, "/despesas/", offset, args.requests, contador),
+                "cursor": await medir(
+                    client, "/despesas/pagina", cursor, args.requests, contador
+                ),
+            }
+            print(
+                f"página {pagina:>6}  offset p50 {dados['offset']['p50_ms']:>8.2f} ms"
+                f"  p99 {dados['offset']['p99_ms']:>8.2f} ms"
+                f"  |  cursor p50 {dados['cursor']['p50_ms']:>8.2f} ms"
+                f"  p99 {dados['cursor']['p99_ms']:>8.2f} ms"
+            )
+
+    # Quanto a página mais profunda custa em relação à primeira, em cada modo
+    rasa, funda = min(resultados), max(resultados)
+    for modo in ("offset", "cursor"):
+        if resultados[rasa][modo]["p50_ms"]:
+            fator = resultados[funda][modo]["p50_ms"] / resultados[rasa][modo]["p50_ms"]
+            print(f"{modo:7} página {funda} / página {rasa}: {fator:.1f}x")
+
+    database = get_engine().url.get_backend_name()
+    await dispose_engines()
+    return {
+        "params": {
+            "users": populacao["users"],
+            "despesas": populacao["despesas"],
+            "limit": args.limit,
+            "depths": sorted(args.depths),
+            "requests": args.requests,
+            "database": database,
+        },
+        "pages": resultados,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="Banco usado pelo app (padrão: SQLite local)")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--despesas", type=int, default=200, help="Despesas por usuário")
+    parser.add_argument("--limit", type=int, default=15, help="Itens por página")
+    parser.add_argument(
+        "--depths", nargs="+", type=int, default=[1, 10, 100, 1000], help="Páginas medidas"
+    )
+    parser.add_argument("--requests", type=int, default=200, help="Requisições por página e modo")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--reset", action="store_true", help="Recria as tabelas antes de popular")
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args()
+
+    configure(args.database_url, cache=False, JOB_WORKER_ENABLED="false")
+    write_results(args.output, asyncio.run(main(args)))
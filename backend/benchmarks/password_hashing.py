@@ -0,0 +1,183 @@
+"""Benchmark do impacto do hash de senhas no event loop.
+
+Mede a latência de uma rota leve (GET /users/{id}) e o atraso do event loop
+com o app parado e durante uma rajada de cadastros e logins. Com o hash no
+pool de threads os números das duas fases devem ficar próximos; --inline
+roda o mesmo hash direto no event loop, para comparação.
+
+    python -m benchmarks.password_hashing --signups 200 --logins 200
+    python -m benchmarks.password_hashing --inline
+"""
+
+import argparse
+import asyncio
+from itertools import count
+from time import perf_counter
+
+from benchmarks.common import configure, seed, summarize, write_results
+
+
+INTERVALO = 0.005
+
+
+async def atraso_do_loop(parar: asyncio.Event) -> list[float]:
+    # Quanto cada sleep curto demorou além do pedido: tempo em que o loop
+    # ficou ocupado sem atender mais ninguém
+    atrasos = []
+    while not parar.is_set():
+        inicio = perf_counter()
+        await asyncio.sleep(INTERVALO)
+        atrasos.append(perf_counter() - inicio - INTERVALO)
+    return atrasos
+
+
+async def sondar(client, users: int, parar: asyncio.Event) -> list[float]:
+    latencias = []
+    ids = count()
+    while not parar.is_set():
+        inicio = perf_counter()
+        resposta = await client.get(f"/users/{next(ids) % users + 1}")
+        await resposta.aread()
+        latencias.append(perf_counter() - inicio)
+        await asyncio.sleep(INTERVALO)
+    return latencias
+
+
+async def rajada(client, signups: int, logins: int, concorrencia: int) -> dict:
+    novos = count()
+    restantes = iter(["signup"] * signups + ["login"] * logins)
+    latencias, erros = [], 0
+
+    async def trabalhador():
+        nonlocal erros
+        for tipo in restantes:
+            if tipo == "signup":
+                numero = next(novos)
+                corpo = {
+                    "nome": f"rajada{numero}",
+                    "email": f"rajada{numero}@benchmark.com",
+                    "senha": "benchmark",
+                }
+                caminho = "/users/"
+            else:
+                corpo = {"email": "login@benchmark.com", "senha": "benchmark"}
+                caminho = "/users/login"
+            inicio = perf_counter()
+            resposta = await client.post(caminho, json=corpo)
+            latencias.append(perf_counter() - inicio)
+            if resposta.status_code >= 400:
+                erros += 1
+
+    inicio = perf_counter()
+    await asyncio.gather(*(trabalhador() for _ in range(concorrencia)))
+    return summarize(latencias, perf_counter() - inicio, erros, [])
+
+
+async def fase(client, users: int, duracao: float = None, carga=None) -> dict:
+    parar = asyncio.Event()
+    lag = asyncio.create_task(atraso_do_loop(parar))
+    sonda = asyncio.create_task(sondar(client, users, parar))
+
+    inicio = perf_counter()
+    resultado = {}
+    if carga is None:
+        await asyncio.sleep(duracao)
+    else:
+        resultado["burst"] = await carga
+    parar.set()
+    elapsed = perf_counter() - inicio
+
+    resultado["probe"] = summarize(await sonda, elapsed, 0, [])
+    resultado["loop_lag"] = summarize(await lag, elapsed, 0, [])
+    return resultado
+
+
+async def main(args) -> dict:
+    import httpx
+
+    from app.core.database import dispose_engines
+    from app.core.security import (
+        PasswordHasher,
+        get_password_hasher,
+        hash_password,
+        set_password_hasher,
+        verify_password,
+    )
+    from main import app
+
+    populacao = await seed(args.users, 0, reset=args.reset)
+
+    hasher = get_password_hasher()
+    if args.inline:
+
+        class InlineHasher(PasswordHasher):
+            async def hash(self, senha: str) -> str:
+                return hash_password(senha, self.n, self.r, self.p)
+
+            async def verify(self, senha: str, armazenada: str) -> bool:
+                return verify_password(senha, armazenada)
+
+        hasher = InlineHasher(hasher.n, hasher.r, hasher.p, 1)
+        set_password_hasher(hasher)
+
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=120
+    )
+    async with client:
+        await client.post(
+            "/users/",
+            json={"nome": "benchmark", "email": "login@benchmark.com", "senha": "benchmark"},
+        )
+        for id in range(1, populacao["users"] + 1):
+            await client.get(f"/users/{id}")
+
+        parado = await fase(client, populacao["users"], duracao=args.idle)
+        carga = await fase(
+            client,
+            populacao["users"],
+            carga=rajada(client, args.signups, args.logins, args.concurrency),
+        )
+
+    await dispose_engines()
+
+    for nome, dados in (("parado", parado), ("rajada", carga)):
+        print(
+            f"{nome:8} sonda p50 {dados['probe']['p50_ms']:>8.2f} ms"
+            f"  p99 {dados['probe']['p99_ms']:>8.2f} ms"
+            f"  atraso do loop p99 {dados['loop_lag']['p99_ms']:>8.2f} ms"
+        )
+    print(
+        f"rajada   {carga['burst']['rps']:.1f} req/s"
+        f"  p50 {carga['burst']['p50_ms']:.2f} ms  erros {carga['burst']['errors']}"
+    )
+
+    return {
+        "params": {
+            "signups": args.signups,
+            "logins": args.logins,
+            "concurrency": args.concurrency,
+            "mode": "inline" if args.inline else "pool",
+            "workers": None if args.inline else hasher.workers,
+            "scrypt": {"n": hasher.n, "r": hasher.r, "p": hasher.p},
+        },
+        "idle": parado,
+        "burst": carga,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="Banco usado pelo app (padrão: SQLite local)")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--signups", type=int, default=100)
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--idle", type=float, default=2.0, help="Duração da fase sem carga (s)")
+    parser.add_argument("--inline", action="store_true", help="Roda o hash no event loop")
+    parser.add_argument("--reset", action="store_true", help="Recria as tabelas antes de popular")
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args()
+
+    configure(args.database_url)
+    resultados = asyncio.run(main(args))
+    write_results(args.output, resultados)
@@ -0,0 +1,168 @@
+"""Benchmark de clientes que consultam a API periodicamente (polling).
+
+Simula clientes móveis que repetem GET /despesas/user/{user_id} e
+GET /users/{id} a cada ciclo, com escritas ocasionais nas despesas do
+usuário, e compara bytes transferidos, tempo de CPU do processo e latência
+em três modos: sem compressão nem ETag, só com gzip e com gzip + If-None-Match.
+
+    python -m benchmarks.polling --reset --clients 20 --polls 50 --limit 200
+    python -m benchmarks.polling --write-rate 0.2
+"""
+
+import argparse
+import asyncio
+import random
+from time import perf_counter, process_time
+
+from benchmarks.common import configure, seed, summarize, write_results
+
+
+MODOS = {
+    "identity": {"gzip": False, "etag": False},
+    "gzip": {"gzip": True, "etag": False},
+    "gzip+etag": {"gzip": True, "etag": True},
+}
+
+
+async def cliente(client, user_id: int, despesas: list[int], args, modo, aleatorio, totais):
+    cabecalhos = {"Accept-Encoding": "gzip" if modo["gzip"] else "identity"}
+    etags = {}
+    rotas = (f"/despesas/user/{user_id}?limit={args.limit}", f"/users/{user_id}")
+
+    for _ in range(args.polls):
+        if despesas and aleatorio.random() < args.write_rate:
+            await client.patch(
+                f"/despesas/{aleatorio.choice(despesas)}",
+                json={"valor": round(aleatorio.uniform(10, 2000), 2)},
+            )
+            totais["writes"] += 1
+
+        for rota in rotas:
+            condicional = dict(cabecalhos)
+            if modo["etag"] and rota in etags:
+                condicional["If-None-Match"] = etags[rota]
+
+            inicio = perf_counter()
+            resposta = await client.get(rota, headers=condicional)
+            await resposta.aread()
+            totais["latencias"].append(perf_counter() - inicio)
+            totais["bytes"] += resposta.num_bytes_downloaded
+            totais["decoded_bytes"] += len(resposta.content)
+
+            if resposta.status_code == 304:
+                totais["not_modified"] += 1
+            elif resposta.status_code >= 400:
+                totais["errors"] += 1
+            if "etag" in resposta.headers:
+                etags[rota] = resposta.headers["etag"]
+
+
+async def executar(client, usuarios: dict[int, list[int]], args, nome: str) -> dict:
+    modo = MODOS[nome]
+    totais = {
+        "latencias": [],
+        "bytes": 0,
+        "decoded_bytes": 0,
+        "not_modified": 0,
+        "writes": 0,
+        "errors": 0,
+    }
+    # Mesma semente em todos os modos: as escritas acontecem nos mesmos pontos
+    aleatorio = random.Random(args.seed)
+
+    cpu, inicio = process_time(), perf_counter()
+    await asyncio.gather(
+        *(
+            cliente(client, user_id, despesas, args, modo, aleatorio, totais)
+            for user_id, despesas in usuarios.items()
+        )
+    )
+    cpu, duracao = process_time() - cpu, perf_counter() - inicio
+
+    requisicoes = len(totais["latencias"])
+    resultado = summarize(totais["latencias"], duracao, totais["errors"], [])
+    resultado.update(
+        {
+            "writes": totais["writes"],
+            "not_modified": totais["not_modified"],
+            "bytes": totais["bytes"],
+            "bytes_per_request": round(totais["bytes"] / requisicoes, 1),
+            "decoded_bytes": totais["decoded_bytes"],
+            "cpu_s": round(cpu, 3),
+            "cpu_ms_per_request": round(cpu / requisicoes * 1000, 3),
+        }
+    )
+    return resultado
+
+
+async def main(args) -> dict:
+    import httpx
+
+    from app.core.cache import get_cache
+    from app.core.database import dispose_engines, get_engine
+    from main import app
+
+    await seed(args.users, args.despesas, reset=args.reset)
+
+    resultados = {}
+    async with app.router.lifespan_context(app), httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=60
+    ) as client:
+        usuarios = {}
+        for user_id in range(1, args.clients + 1):
+            resposta = await client.get(f"/despesas/user/{user_id}?limit={args.limit}")
+            usuarios[user_id] = [item["id"] for item in resposta.json()]
+
+        for nome in MODOS:
+            # Cada modo começa com o cache frio, como após um deploy
+            await get_cache().clear()
+            resultados[nome] = await executar(client, usuarios, args, nome)
+            dados = resultados[nome]
+            print(
+                f"{nome:10} {dados['bytes_per_request']:>10.1f} B/req"
+                f"  cpu {dados['cpu_ms_per_request']:>7.3f} ms/req"
+                f"  p50 {dados['p50_ms']:>7.2f} ms  p99 {dados['p99_ms']:>7.2f} ms"
+                f"  304 {dados['not_modified']:>5}/{dados['requests']}"
+                f"  writes {dados['writes']}  erros {dados['errors']}"
+            )
+
+    base = resultados["identity"]
+    for nome, dados in resultados.items():
+        if nome != "identity":
+            print(
+                f"{nome:10} bytes {(dados['bytes'] / base['bytes'] - 1) * 100:+7.1f}%"
+                f"  cpu {(dados['cpu_s'] / base['cpu_s'] - 1) * 100:+7.1f}%"
+            )
+
+    await dispose_engines()
+    return {
+        "params": {
+            "clients": args.clients,
+            "polls": args.polls,
+            "limit": args.limit,
+            "write_rate": args.write_rate,
+            "despesas_por_user": args.despesas,
+            "database": get_engine().url.get_backend_name(),
+        },
+        "modes": resultados,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="Banco usado pelo app (padrão: SQLite local)")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--despesas", type=int, default=200, help="Despesas por usuário")
+    parser.add_argument("--clients", type=int, default=20, help="Clientes, um por usuário")
+    parser.add_argument("--polls", type=int, default=50, help="Ciclos de polling por cliente")
+    parser.add_argument("--limit", type=int, default=200, help="Despesas por listagem")
+    parser.add_argument(
+        "--write-rate", type=float, default=0.05, help="Chance de escrita a cada ciclo"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="Recria as tabelas antes de popular")
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args()
+
+    configure(args.database_url)
+    write_results(args.output, asyncio.run(main(args)))
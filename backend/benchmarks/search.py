@@ -0,0 +1,124 @@
+"""Benchmark da busca de despesas por nome e tipo.
+
+Popula o banco, mostra o plano de execução da consulta de busca (EXPLAIN no
+Postgres, EXPLAIN QUERY PLAN no SQLite) com os índices usados e mede a
+latência de GET /despesas/user/{user_id}/search, incluindo as páginas
+seguintes pelo cursor.
+
+    python -m benchmarks.search --database-url postgresql+asyncpg://... --users 200
+    python -m benchmarks.search --terms luz alug net
+"""
+
+import argparse
+import asyncio
+import random
+import re
+from time import perf_counter
+
+from benchmarks.common import configure, seed, summarize, write_results
+
+
+async def plano(user_id: int, termo: str) -> list[str]:
+    from sqlalchemy import text
+
+    from app.core.database import get_database
+    from app.repository.despesa import DespesaRepository
+
+    async with get_database().session() as db:
+        query, _ = DespesaRepository(db).search_statement(user_id, termo)
+        dialeto = db.get_bind().dialect
+        sql = str(
+            query.limit(15).compile(
+                dialect=dialeto, compile_kwargs={"literal_binds": True}
+            )
+        )
+        if dialeto.name == "postgresql":
+            # Os % literais foram duplicados para o paramstyle do driver
+            busca = await db.execute(text("EXPLAIN ANALYZE " + sql.replace("%%", "%")))
+        else:
+            busca = await db.execute(text("EXPLAIN QUERY PLAN " + sql))
+        return [" ".join(str(coluna) for coluna in linha) for linha in busca.all()]
+
+
+async def main(args) -> dict:
+    import httpx
+
+    from app.core.database import dispose_engines, get_engine
+    from main import app
+
+    populacao = await seed(args.users, args.despesas, reset=args.reset)
+    aleatorio = random.Random(args.seed)
+
+    planos = {}
+    for termo in args.terms:
+        linhas = await plano(1, termo)
+        indices = sorted(set(re.findall(r"\b(ix_despesas_\w+)", "\n".join(linhas))))
+        planos[termo] = {"plan": linhas, "indexes": indices}
+        print(f"-- {termo}: índices {', '.join(indices) or 'nenhum'}")
+        for linha in linhas:
+            print(f"   {linha}")
+
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=60
+    )
+    latencias, erros, paginas = [], 0, 0
+    inicio = perf_counter()
+    async with client:
+        for _ in range(args.requests):
+            user_id = aleatorio.randint(1, populacao["users"])
+            parametros = {"q": aleatorio.choice(args.terms), "limit": args.limit}
+            # Segue o cursor por algumas páginas, como uma rolagem infinita
+            for _ in range(args.pages):
+                comeco = perf_counter()
+                resposta = await client.get(
+                    f"/despesas/user/{user_id}/search", params=parametros
+                )
+                latencias.append(perf_counter() - comeco)
+                paginas += 1
+                if resposta.status_code >= 400:
+                    erros += 1
+                    break
+                cursor = resposta.json()["next_cursor"]
+                if cursor is None:
+                    break
+                parametros["cursor"] = cursor
+    resultado = summarize(latencias, perf_counter() - inicio, erros, [])
+
+    print(
+        f"busca {resultado['rps']:.1f} req/s  p50 {resultado['p50_ms']:.2f} ms"
+        f"  p99 {resultado['p99_ms']:.2f} ms  páginas {paginas}  erros {erros}"
+    )
+
+    database = get_engine().url.get_backend_name()
+    await dispose_engines()
+    return {
+        "params": {
+            "users": args.users,
+            "despesas_por_user": args.despesas,
+            "terms": args.terms,
+            "limit": args.limit,
+            "pages": args.pages,
+            "database": database,
+        },
+        "plans": planos,
+        "search": resultado,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="Banco usado pelo app (padrão: SQLite local)")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--despesas", type=int, default=200, help="Despesas por usuário")
+    parser.add_argument("--requests", type=int, default=200, help="Buscas (cada uma com suas páginas)")
+    parser.add_argument("--pages", type=int, default=3, help="Páginas seguidas pelo cursor")
+    parser.add_argument("--limit", type=int, default=15)
+    parser.add_argument("--terms", nargs="+", default=["luz", "alug", "internet", "agu"])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="Recria as tabelas antes de popular")
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args()
+
+    configure(args.database_url)
+    resultados = asyncio.run(main(args))
+    write_results(args.output, resultados)
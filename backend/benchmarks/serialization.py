@@ -0,0 +1,107 @@
+"""Benchmark da serialização de listagens grandes: caminho JSON contra Pydantic.
+
+Lê --rows despesas (10 mil por padrão) pelos dois caminhos do service e
+mede o tempo até os bytes da resposta:
+
+- pydantic: get_all (objetos do ORM + model_validate por linha) seguido da
+  revalidação e serialização que o response_model do FastAPI fazia;
+- json: get_all_json (só as colunas do schema, como tuplas, serializadas
+  direto para JSON).
+
+O cache dos services fica desligado, e as duas saídas são comparadas antes
+da medição para garantir o mesmo contrato.
+
+    python -m benchmarks.serialization --reset
+    python -m benchmarks.serialization --rows 50000 --repeat 20
+"""
+
+import argparse
+import asyncio
+import json
+from time import perf_counter
+
+from benchmarks.common import configure, seed, summarize, write_results
+
+
+def caminhos(adaptador):
+    async def pydantic(service, rows: int) -> bytes:
+        itens = await service.get_all(rows, 0)
+        # O que o FastAPI faz com o response_model: valida de novo, gera
+        # objetos JSON e a JSONResponse os serializa
+        conteudo = adaptador.dump_python(adaptador.validate_python(itens), mode="json")
+        return json.dumps(
+            conteudo, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+
+    async def lean(service, rows: int) -> bytes:
+        return await service.get_all_json(rows, 0)
+
+    return {"pydantic": pydantic, "json": lean}
+
+
+async def main(args) -> dict:
+    from pydantic import TypeAdapter
+
+    from app.core.database import dispose_engines, get_database, get_engine
+    from app.schema.despesa import DespesaOutputSchema
+    from app.service.despesa import DespesaService
+
+    populacao = await seed(1, args.rows, reset=args.reset)
+    database = get_database()
+    modos = caminhos(TypeAdapter(list[DespesaOutputSchema]))
+
+    async def executar(modo: str) -> bytes:
+        async with database.session() as db:
+            return await modos[modo](DespesaService(db), args.rows)
+
+    saidas = {modo: await executar(modo) for modo in modos}
+    itens = {modo: json.loads(saida) for modo, saida in saidas.items()}
+    if itens["pydantic"] != itens["json"]:
+        raise SystemExit("Os dois caminhos devolveram listas diferentes")
+
+    latencias = {modo: [] for modo in modos}
+    duracoes = {modo: 0.0 for modo in modos}
+    # Alterna os modos a cada repetição para que ruído da máquina afete ambos
+    for _ in range(args.repeat):
+        for modo in modos:
+            inicio = perf_counter()
+            await executar(modo)
+            latencias[modo].append(perf_counter() - inicio)
+            duracoes[modo] += latencias[modo][-1]
+
+    resultados = {}
+    for modo in modos:
+        dados = resultados[modo] = summarize(latencias[modo], duracoes[modo], 0, [])
+        dados["bytes"] = len(saidas[modo])
+        print(
+            f"{modo:8} {len(itens[modo])} linhas  p50 {dados['p50_ms']:>9.2f} ms"
+            f"  p99 {dados['p99_ms']:>9.2f} ms  {dados['bytes'] / 2**20:.1f} MB"
+        )
+    antes, depois = resultados["pydantic"]["p50_ms"], resultados["json"]["p50_ms"]
+    if depois:
+        print(f"json é {antes / depois:.1f}x mais rápido que pydantic (p50)")
+
+    backend = get_engine().url.get_backend_name()
+    await dispose_engines()
+    return {
+        "params": {
+            "rows": len(itens["json"]),
+            "despesas": populacao["despesas"],
+            "repeat": args.repeat,
+            "database": backend,
+        },
+        "modes": resultados,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="Banco usado pelo app (padrão: SQLite local)")
+    parser.add_argument("--rows", type=int, default=10_000, help="Linhas por listagem")
+    parser.add_argument("--repeat", type=int, default=10, help="Listagens medidas por modo")
+    parser.add_argument("--reset", action="store_true", help="Recria as tabelas antes de popular")
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args()
+
+    configure(args.database_url, cache=False)
+    write_results(args.output, asyncio.run(main(args)))
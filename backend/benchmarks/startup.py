@@ -0,0 +1,143 @@
+"""Benchmark de inicialização e desligamento do servidor de produção.
+
+Mede o tempo do passo de migração, o tempo até cada configuração de
+`python -m app.server` responder à primeira requisição, a latência das
+primeiras requisições (pool frio x aquecido) e quanto o servidor leva para
+encerrar com requisições ainda em andamento.
+
+    python -m benchmarks.startup --workers 1 2 4
+    python -m benchmarks.startup --warmup 0 10
+"""
+
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from os.path import dirname
+
+from benchmarks.common import configure, summarize, write_results
+
+
+BACKEND_DIR = dirname(dirname(__file__))
+
+
+def porta_livre() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def migrar() -> float:
+    inicio = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "app.cli", "migrate"], cwd=BACKEND_DIR, check=True
+    )
+    return time.perf_counter() - inicio
+
+
+def medir(workers: int, warmup: int, requests: int, timeout: float) -> dict:
+    import httpx
+
+    porta = porta_livre()
+    url = f"http://127.0.0.1:{porta}"
+    inicio = time.perf_counter()
+    processo = subprocess.Popen(
+        [
+            sys.executable, "-m", "app.server",
+            "--host", "127.0.0.1",
+            "--port", str(porta),
+            "--workers", str(workers),
+        ],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "DB_POOL_WARMUP": str(warmup)},
+    )
+
+    try:
+        with httpx.Client(base_url=url, timeout=30) as client:
+            while True:
+                if processo.poll() is not None:
+                    raise RuntimeError(f"O servidor encerrou com código {processo.returncode}")
+                if time.perf_counter() - inicio > timeout:
+                    raise RuntimeError("O servidor não respondeu a tempo")
+                try:
+                    client.get("/metrics/pool")
+                    break
+                except httpx.TransportError:
+                    time.sleep(0.02)
+            pronto = time.perf_counter() - inicio
+
+            # Primeiras requisições, em paralelo, distribuídas entre os workers
+            def requisitar(_):
+                comeco = time.perf_counter()
+                resposta = client.get("/users/", params={"limit": 1})
+                return time.perf_counter() - comeco, resposta.status_code >= 400
+
+            with ThreadPoolExecutor(max_workers=min(requests, 16)) as executor:
+                primeiras = list(executor.map(requisitar, range(requests)))
+
+            # Desliga com requisições em andamento e confere se todas terminam
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                pendentes = [executor.submit(requisitar, None) for _ in range(8)]
+                time.sleep(0.01)
+                parada = time.perf_counter()
+                processo.send_signal(signal.SIGTERM)
+                drenadas = sum(
+                    1
+                    for futuro in pendentes
+                    if futuro.exception() is None and not futuro.result()[1]
+                )
+                processo.wait(timeout=timeout)
+                desligamento = time.perf_counter() - parada
+    finally:
+        if processo.poll() is None:
+            processo.kill()
+            processo.wait()
+
+    latencias = [latencia for latencia, _ in primeiras]
+    erros = sum(1 for _, erro in primeiras if erro)
+    return {
+        "ready_s": round(pronto, 3),
+        "first_requests": summarize(latencias, sum(latencias), erros, []),
+        "shutdown_s": round(desligamento, 3),
+        "drained": f"{drenadas}/{len(pendentes)}",
+    }
+
+
+def main(args) -> dict:
+    resultados = {"migrate_s": round(migrar(), 3), "runs": {}}
+    print(f"migração: {resultados['migrate_s']:.3f} s")
+
+    for workers in args.workers:
+        for warmup in args.warmup:
+            nome = f"workers={workers} warmup={warmup}"
+            dados = medir(workers, warmup, args.requests, args.timeout)
+            resultados["runs"][nome] = dados
+            print(
+                f"{nome:22} pronto em {dados['ready_s']:.3f} s"
+                f"  primeiras p50 {dados['first_requests']['p50_ms']:.2f} ms"
+                f"  p99 {dados['first_requests']['p99_ms']:.2f} ms"
+                f"  desligamento {dados['shutdown_s']:.3f} s"
+                f"  drenadas {dados['drained']}"
+            )
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="Banco usado pelo app (padrão: SQLite local)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2])
+    parser.add_argument(
+        "--warmup", type=int, nargs="+", default=[0, 5], help="Valores de DB_POOL_WARMUP"
+    )
+    parser.add_argument("--requests", type=int, default=32, help="Primeiras requisições")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args()
+
+    configure(args.database_url)
+    resultados = main(args)
+    write_results(args.output, resultados)
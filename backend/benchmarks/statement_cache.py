@@ -0,0 +1,106 @@
+"""Microbenchmark do custo por requisição de BaseRepository.get_by_id.
+
+Compara a consulta atual, montada com lambda_stmt (construção e compilação
+em cache, só os parâmetros mudam), com a versão anterior, que montava um
+select(model).where(model.id == id) novo a cada chamada. Cada chamada abre
+a própria sessão, como uma requisição; as rodadas alternam os dois modos
+para que ruído da máquina afete ambos igualmente.
+
+    python -m benchmarks.statement_cache --reset
+    python -m benchmarks.statement_cache --database-url postgresql+asyncpg://... --calls 20000
+"""
+
+import argparse
+import asyncio
+import random
+from time import perf_counter
+
+from benchmarks.common import configure, seed, summarize, write_results
+
+
+async def get_by_id_select(repository, id: int):
+    # O get_by_id de antes do lambda_stmt
+    from sqlalchemy import select
+
+    model = repository.model
+    busca = await repository.db.execute(select(model).where(model.id == id))
+    busca = busca.scalar_one_or_none()
+    if busca is None:
+        raise ValueError("{objeto} com ID = {id} não encontrado.")
+    return busca
+
+
+async def main(args) -> dict:
+    from app.core.database import dispose_engines, get_database, get_engine
+    from app.model.despesa import Despesa
+    from app.repository.base import BaseRepository
+
+    populacao = await seed(args.users, args.despesas, reset=args.reset)
+    database = get_database()
+    aleatorio = random.Random(args.seed)
+
+    modos = {
+        "select": get_by_id_select,
+        "lambda_stmt": lambda repository, id: repository.get_by_id(id),
+    }
+    latencias = {modo: [] for modo in modos}
+    duracoes = {modo: 0.0 for modo in modos}
+
+    async def rodada(modo: str, chamadas: int, medir: bool) -> None:
+        consulta = modos[modo]
+        inicio = perf_counter()
+        for _ in range(chamadas):
+            id = aleatorio.randint(1, populacao["despesas"])
+            comeco = perf_counter()
+            async with database.session() as db:
+                await consulta(BaseRepository(Despesa, db), id)
+            if medir:
+                latencias[modo].append(perf_counter() - comeco)
+        if medir:
+            duracoes[modo] += perf_counter() - inicio
+
+    for modo in modos:
+        await rodada(modo, args.warmup, medir=False)
+
+    por_rodada = max(1, args.calls // args.rounds)
+    for _ in range(args.rounds):
+        for modo in modos:
+            await rodada(modo, por_rodada, medir=True)
+
+    resultados = {modo: summarize(latencias[modo], duracoes[modo], 0, []) for modo in modos}
+    for modo, dados in resultados.items():
+        print(
+            f"{modo:12} média {dados['mean_ms'] * 1000:>8.1f} µs"
+            f"  p50 {dados['p50_ms'] * 1000:>8.1f} µs  p99 {dados['p99_ms'] * 1000:>8.1f} µs"
+        )
+    antes, depois = resultados["select"]["mean_ms"], resultados["lambda_stmt"]["mean_ms"]
+    print(f"diferença por chamada {(depois - antes) * 1000:+.1f} µs ({(depois / antes - 1) * 100:+.1f}%)")
+
+    backend = get_engine().url.get_backend_name()
+    await dispose_engines()
+    return {
+        "params": {
+            "despesas": populacao["despesas"],
+            "calls": por_rodada * args.rounds,
+            "rounds": args.rounds,
+            "database": backend,
+        },
+        "modes": resultados,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="Banco usado pelo app (padrão: SQLite local)")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--despesas", type=int, default=100, help="Despesas por usuário")
+    parser.add_argument("--calls", type=int, default=10000, help="Chamadas medidas por modo")
+    parser.add_argument("--rounds", type=int, default=10, help="Rodadas alternando os modos")
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="Recria as tabelas antes de popular")
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args()
+
+    configure(args.database_url)
+    write_results(args.output, asyncio.run(main(args)))
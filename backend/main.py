@@ -1,44 +1,127 @@
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
 
-from app.core.database import engine, Base
+from app.core.admission import AdmissionMiddleware, MemoryRateLimitBackend
+from app.core.cache import set_cache
+from app.core.database import create_schema, dispose_engines, set_database, warm_pool
+from app.core.instrumentation import QueryMetricsMiddleware
+from app.core.jobs import create_job_worker, set_job_backend
+from app.core.security import close_password_hasher, set_password_hasher
+from app.core.settings import Settings, get_settings, set_settings
 from app.api.version_1.endpoints.despesa import DespesaEndpoint
 from app.api.version_1.endpoints.user import UserEndpoint
+from app.api.version_1.endpoints.metrics import MetricsEndpoint
+from app.api.version_1.endpoints.recorrencia import RecorrenciaEndpoint
+from app.api.version_1.endpoints.job import JobEndpoint
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    settings = app.state.settings
+    if settings.DB_CREATE_SCHEMA_ON_STARTUP:
+        await create_schema()
+    # O worker só passa a aceitar requisições com o pool já aquecido
+    aquecidas = settings.DB_POOL_WARMUP
+    if aquecidas is None:
+        aquecidas = settings.DB_POOL_SIZE
+    await warm_pool(aquecidas)
+    worker = None
+    if settings.JOB_WORKER_ENABLED:
+        worker = create_job_worker()
+        worker.start()
     yield
-    await engine.dispose()
-
-
-app = FastAPI(
-    title="Organizador de Finanças API",
-    docs_url="/documentation",
-    redoc_url="/recaudacao",
-    openapi_url="/api/openapi.json",
-    openapi_tags=[
-        {"name": "User", "description": "Operações com Usuários"},
-        {"name": "Despesa", "description": "Operações com Despesas"},
-    ],
-    lifespan=lifespan,
-)
-
-# Allow all origins for development purposes
-origins = ["*"]
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-
-app.include_router(UserEndpoint().router)
-app.include_router(DespesaEndpoint().router)
+    # Chamado pelo uvicorn depois que as requisições em andamento terminam
+    if worker is not None:
+        await worker.stop(settings.GRACEFUL_SHUTDOWN_TIMEOUT)
+    await close_password_hasher()
+    await dispose_engines()
+
+
+def create_app(settings: Settings = None) -> FastAPI:
+    # Com settings, elas passam a valer para o processo todo: engine, cache
+    # e demais componentes são criados no primeiro uso a partir delas, e os
+    # que já existiam (com a configuração anterior) são descartados
+    if settings is not None:
+        set_settings(settings)
+        set_database(None)
+        set_cache(None)
+        set_password_hasher(None)
+        set_job_backend(None)
+    settings = get_settings()
+
+    app = FastAPI(
+        title="Organizador de Finanças API",
+        docs_url="/documentation",
+        redoc_url="/recaudacao",
+        openapi_url="/api/openapi.json",
+        openapi_tags=[
+            {"name": "User", "description": "Operações com Usuários"},
+            {"name": "Despesa", "description": "Operações com Despesas"},
+            {"name": "Recorrencia", "description": "Regras de Despesas recorrentes"},
+            {"name": "Job", "description": "Tarefas executadas em segundo plano"},
+            {"name": "Metrics", "description": "Métricas de uso do banco de dados"},
+        ],
+        lifespan=lifespan,
+    )
+    app.state.settings = settings
+
+    # Adicionado antes do CORS para ficar por dentro dele: as respostas 429/503
+    # também levam os cabeçalhos de CORS
+    if settings.RATE_LIMIT_ENABLED or settings.ADMISSION_ENABLED:
+        simultaneas = settings.ADMISSION_MAX_IN_FLIGHT or (
+            settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+        )
+        app.add_middleware(
+            AdmissionMiddleware,
+            limiter=MemoryRateLimitBackend() if settings.RATE_LIMIT_ENABLED else None,
+            rate=settings.RATE_LIMIT_RATE,
+            burst=settings.RATE_LIMIT_BURST,
+            max_in_flight=simultaneas if settings.ADMISSION_ENABLED else None,
+            route_limits=(
+                settings.ADMISSION_ROUTE_LIMITS if settings.ADMISSION_ENABLED else None
+            ),
+            queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+        )
+
+    # Allow all origins for development purposes
+    origins = ["*"]
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["Server-Timing", "ETag", "Retry-After"],
+    )
+
+    app.add_middleware(
+        GZipMiddleware,
+        minimum_size=settings.GZIP_MINIMUM_SIZE,
+        compresslevel=settings.GZIP_COMPRESSLEVEL,
+    )
+    app.add_middleware(
+        QueryMetricsMiddleware,
+        query_budget=settings.DB_QUERY_BUDGET,
+        n_plus_one_threshold=settings.DB_N_PLUS_ONE_THRESHOLD,
+        strict=settings.DB_QUERY_BUDGET_STRICT,
+    )
+
+    app.include_router(UserEndpoint().router)
+    app.include_router(DespesaEndpoint().router)
+    app.include_router(RecorrenciaEndpoint().router)
+    app.include_router(JobEndpoint().router)
+    app.include_router(MetricsEndpoint().router)
+    return app
+
+
+def __getattr__(nome: str):
+    # `main:app` (uvicorn) e `from main import app` continuam funcionando,
+    # mas a aplicação só é montada quando alguém a pede
+    if nome == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
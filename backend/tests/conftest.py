@@ -0,0 +1,78 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+from app.core.cache import MemoryCache, set_cache
+from app.repository.despesa import DespesaRepository
+from app.repository.user import UserRepository
+
+
+pytest_plugins = ["app.core.testing"]
+
+
+@pytest.fixture
+def memory_cache():
+    # O ambiente de testes roda sem cache; aqui o LRU em memória é ligado
+    cache = MemoryCache(max_items=1000, ttl=60)
+    set_cache(cache)
+    yield cache
+    set_cache(None)
+
+
+@pytest.fixture
+def make_user(db):
+    # Cria usuários direto pelo repositório, sem passar pela API
+    contador = 0
+
+    async def criar(**dados):
+        nonlocal contador
+        contador += 1
+        dados = {
+            "nome": f"user{contador}",
+            "email": f"user{contador}@teste.com",
+            "senha": "segredo1",
+            **dados,
+        }
+        return await UserRepository(db).create(**dados)
+
+    return criar
+
+
+@pytest.fixture
+def make_despesas(db):
+    async def criar(user_id: int, quantidade: int = 1, **dados):
+        itens = [
+            {
+                "nome": "luz",
+                "tipo": "boleto",
+                "status": "P",
+                "valor": 10 + numero,
+                "vencimento": date(2025, 1 + numero % 12, 1 + numero % 28),
+                "user_id": user_id,
+                **dados,
+            }
+            for numero in range(quantidade)
+        ]
+        criadas, erros = await DespesaRepository(db).create_many(itens)
+        assert not erros
+        return criadas
+
+    return criar
+
+
+@pytest.fixture
+def queries(test_database):
+    # Statements enviados ao banco durante o teste, sem o controle de
+    # transação (BEGIN/SAVEPOINT/RELEASE) usado para isolar cada teste
+    capturados = []
+    controle = ("BEGIN", "SAVEPOINT", "RELEASE", "ROLLBACK")
+
+    def _capturar(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith(controle):
+            capturados.append(" ".join(statement.split()))
+
+    engine = test_database.engine.sync_engine
+    event.listen(engine, "before_cursor_execute", _capturar)
+    yield capturados
+    event.remove(engine, "before_cursor_execute", _capturar)
@@ -0,0 +1,110 @@
+import asyncio
+from collections import Counter
+from itertools import count
+from statistics import quantiles
+from time import perf_counter
+
+import httpx
+import pytest
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+
+from app.core.admission import AdmissionMiddleware, MemoryRateLimitBackend
+from app.core.settings import get_settings
+
+
+pytestmark = pytest.mark.integration
+
+DURACAO = 1.0
+TRABALHO = 0.01  # Tempo de cada requisição no "banco"
+# A espera por vaga é cortada em queue_timeout (0.1 s); o resto da folga é
+# para o escalonamento de CPU quando os testes rodam em paralelo
+LIMITE_P99 = 0.5
+
+
+def montar_app(rate: float = 20):
+    # Um processo com 4 conexões, atrás do controle de admissão e do
+    # tratamento de X-Forwarded-For configurado para o servidor
+    pool = asyncio.Semaphore(4)
+
+    async def app(scope, receive, send):
+        async with pool:
+            await asyncio.sleep(TRABALHO)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    admissao = AdmissionMiddleware(
+        app,
+        limiter=MemoryRateLimitBackend(),
+        rate=rate,
+        burst=40,
+        max_in_flight=4,
+        queue_timeout=0.1,
+    )
+    return ProxyHeadersMiddleware(
+        admissao, trusted_hosts=get_settings().FORWARDED_ALLOW_IPS
+    )
+
+
+def cliente(app, ip: str) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app, client=(ip, 1234)),
+        base_url="http://test",
+    )
+
+
+async def test_spoofed_forwarded_for_does_not_bypass_rate_limit():
+    # Sem reposição de fichas: só o burst passa
+    app = montar_app(rate=0.001)
+    respostas = Counter()
+    async with cliente(app, "203.0.113.66") as abusivo:
+        for numero in range(60):
+            resposta = await abusivo.get(
+                "/despesas/", headers={"X-Forwarded-For": f"198.51.100.{numero}"}
+            )
+            respostas[resposta.status_code] += 1
+
+    assert respostas[429] == 20
+
+
+async def test_well_behaved_clients_keep_tail_latency_under_abuse():
+    app = montar_app()
+    fim = perf_counter() + DURACAO
+    latencias = []
+    erros = Counter()
+    abusivas = Counter()
+
+    async def comportado(ip: str):
+        async with cliente(app, ip) as http:
+            while perf_counter() < fim:
+                inicio = perf_counter()
+                resposta = await http.get("/despesas/user/1")
+                latencias.append(perf_counter() - inicio)
+                if resposta.status_code != 200:
+                    erros[resposta.status_code] += 1
+                await asyncio.sleep(0.05)
+
+    async def abusivo():
+        # 20 requisições sempre em andamento, cada uma com outro X-Forwarded-For
+        numeros = count()
+        async with cliente(app, "203.0.113.66") as http:
+
+            async def disparar():
+                while perf_counter() < fim:
+                    resposta = await http.get(
+                        "/despesas/?limit=1000",
+                        headers={"X-Forwarded-For": f"198.51.100.{next(numeros) % 250}"},
+                    )
+                    abusivas[resposta.status_code] += 1
+                    # Pela rede, cada resposta devolveria o event loop
+                    await asyncio.sleep(0.02)
+
+            await asyncio.gather(*(disparar() for _ in range(20)))
+
+    await asyncio.gather(
+        abusivo(), *(comportado(f"192.0.2.{numero}") for numero in range(1, 4))
+    )
+
+    p99 = quantiles(latencias, n=100)[98]
+    assert not erros
+    assert abusivas[429] > abusivas[200]
+    assert p99 < LIMITE_P99, f"p99 de {p99 * 1000:.1f} ms"
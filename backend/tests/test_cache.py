@@ -0,0 +1,94 @@
+import pytest
+from sqlalchemy import update
+
+from app.core.cache import MemoryCache, NullCache, _criar_cache
+from app.core.database import SESSION_REPLICA, SESSION_STICKY
+from app.core.settings import Settings, get_settings, set_settings
+from app.model.user import User
+from app.service.despesa import DespesaService
+from app.service.user import UserService
+
+
+pytestmark = pytest.mark.service
+
+
+async def renomear_sem_invalidar(db, id: int, nome: str) -> None:
+    # Simula o primário à frente do cache (ou de uma réplica atrasada)
+    await db.execute(update(User).where(User.id == id).values(nome=nome))
+
+
+async def test_replica_reads_are_not_cached(db, memory_cache, make_user):
+    user = await make_user()
+    db.info[SESSION_REPLICA] = True
+
+    await UserService(db).get_by_id(user.id)
+    await UserService(db).get_by_id(user.id)
+
+    assert memory_cache.stats()["size"] == 0
+    assert memory_cache.hits == 0
+
+
+async def test_primary_reads_are_cached(db, memory_cache, make_user):
+    user = await make_user(nome="antigo")
+
+    await UserService(db).get_by_id(user.id)
+    await renomear_sem_invalidar(db, user.id, "novo")
+
+    assert (await UserService(db).get_by_id(user.id)).nome == "antigo"
+    assert memory_cache.hits == 1
+
+
+async def test_sticky_reads_skip_the_cache(db, memory_cache, make_user):
+    user = await make_user()
+    await UserService(db).get_by_id(user.id)
+    await renomear_sem_invalidar(db, user.id, "novo")
+
+    db.info[SESSION_STICKY] = True
+    assert (await UserService(db).get_by_id(user.id)).nome == "novo"
+    assert memory_cache.hits == 0
+
+
+@pytest.mark.parametrize(
+    "remover",
+    [
+        lambda service, id: service.delete(id),
+        lambda service, id: service.delete_many([id]),
+    ],
+    ids=["delete", "delete_many"],
+)
+async def test_delete_invalidates_pages_without_the_row(
+    db, memory_cache, make_user, make_despesas, remover
+):
+    user = await make_user()
+    despesas = await make_despesas(user.id, quantidade=3)
+    service = DespesaService(db)
+    assert [d.id for d in await service.get_all(1, 1)] == [despesas[1].id]
+
+    await remover(service, despesas[0].id)
+
+    assert [d.id for d in await service.get_all(1, 1)] == [despesas[2].id]
+
+
+async def test_mark_as_paid_invalidates_the_user_collection(
+    db, memory_cache, make_user, make_despesas
+):
+    user = await make_user()
+    despesas = await make_despesas(user.id, quantidade=2)
+    service = DespesaService(db)
+    versao, _ = await service.get_versioned_rows_by_user_id(user.id, limit=1)
+
+    await service.mark_as_paid([despesas[1].id])
+
+    assert (await service.get_versioned_rows_by_user_id(user.id, limit=1))[0] > versao
+
+
+@pytest.mark.parametrize("workers, esperado", [(None, MemoryCache), (1, MemoryCache), (2, NullCache)])
+def test_memory_cache_is_disabled_with_several_workers(workers, esperado):
+    anteriores = get_settings()
+    set_settings(
+        Settings(_env_file=None, ENV="producao", DATABASE_URL="sqlite://", WEB_CONCURRENCY=workers)
+    )
+    try:
+        assert type(_criar_cache()) is esperado
+    finally:
+        set_settings(anteriores)
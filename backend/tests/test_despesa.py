@@ -0,0 +1,167 @@
+import re
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.pagination import encode_cursor
+from app.model.despesa import Despesa
+from app.repository.despesa import DespesaRepository
+
+
+pytestmark = pytest.mark.routers
+
+CORPO = {
+    "nome": "agua",
+    "tipo": "pix",
+    "status": "P",
+    "valor": 99,
+    "vencimento": "2025-03-03",
+}
+
+
+def resumir(queries: list[str]) -> list[str]:
+    # "SELECT tb_despesas", "UPDATE tb_users"... na ordem em que rodaram
+    padrao = re.compile(r"^(SELECT|UPDATE|INSERT INTO|DELETE FROM) .*?(tb_\w+)")
+    return [" ".join(padrao.match(query).groups()) for query in queries]
+
+
+async def test_not_modified_skips_the_list_query(client, make_user, make_despesas, monkeypatch):
+    user = await make_user()
+    await make_despesas(user.id, quantidade=3)
+    resposta = await client.get(f"/despesas/user/{user.id}")
+    assert resposta.status_code == 200
+    etag = resposta.headers["etag"]
+
+    async def falhar(*args, **kwargs):
+        raise AssertionError("a listagem não deveria ser carregada")
+
+    monkeypatch.setattr(DespesaRepository, "get_rows_by_user_id", falhar)
+    resposta = await client.get(
+        f"/despesas/user/{user.id}", headers={"If-None-Match": etag}
+    )
+    assert resposta.status_code == 304
+    assert resposta.headers["etag"] == etag
+
+
+def valores_antigos(test_database) -> list[str]:
+    # No Postgres o UPDATE já devolve os valores antigos das colunas do resumo
+    # (UPDATE ... FROM (SELECT ... FOR UPDATE)); no SQLite eles saem de um
+    # SELECT antes do UPDATE
+    if test_database.engine.dialect.name == "postgresql":
+        return []
+    return ["SELECT tb_despesas"]
+
+
+async def test_put_statement_count(client, test_database, make_user, make_despesas, queries):
+    user = await make_user()
+    [despesa] = await make_despesas(user.id)
+
+    queries.clear()
+    resposta = await client.put(f"/despesas/{despesa.id}", json={**CORPO, "user_id": user.id})
+
+    assert resposta.status_code == 200
+    # Um UPDATE ... RETURNING para a despesa; os outros dois statements são o
+    # resumo mensal (user-016) e a versão da coleção para o ETag (user-021)
+    assert resumir(queries) == [
+        *valores_antigos(test_database),
+        "UPDATE tb_despesas",
+        "INSERT INTO tb_resumo_mensal",
+        "UPDATE tb_users",
+    ]
+
+
+async def test_patch_without_tracked_columns_skips_the_summary(
+    client, make_user, make_despesas, queries
+):
+    user = await make_user()
+    [despesa] = await make_despesas(user.id)
+
+    queries.clear()
+    resposta = await client.patch(f"/despesas/{despesa.id}", json={"nome": "outro"})
+
+    assert resposta.status_code == 200
+    assert resumir(queries) == ["UPDATE tb_despesas", "UPDATE tb_users"]
+
+
+async def test_delete_statement_count(client, make_user, make_despesas, queries):
+    user = await make_user()
+    [despesa] = await make_despesas(user.id)
+
+    queries.clear()
+    resposta = await client.delete(f"/despesas/{despesa.id}")
+
+    assert resposta.status_code == 204
+    assert resumir(queries) == [
+        "DELETE FROM tb_despesas",
+        "INSERT INTO tb_resumo_mensal",
+        "UPDATE tb_users",
+    ]
+
+
+def test_postgres_update_reads_old_values_in_the_same_statement():
+    repository = DespesaRepository(None)
+    query = repository._old_values_update([1, 2], {"status": "Q"}, Despesa)
+    sql = " ".join(str(query.compile(dialect=postgresql.asyncpg.dialect())).split())
+
+    assert sql.startswith("UPDATE tb_despesas SET status=")
+    assert "FROM (SELECT tb_despesas.id AS id, tb_despesas.user_id AS user_id" in sql
+    assert "FOR UPDATE) AS antigo WHERE tb_despesas.id = antigo.id" in sql
+    assert "antigo.valor AS antigo_valor, antigo.status AS antigo_status" in sql
+
+
+@pytest.mark.parametrize("quantidade", [1, 3])
+async def test_mark_as_paid_statement_count_does_not_grow_with_ids(
+    client, test_database, make_user, make_despesas, queries, quantidade
+):
+    user = await make_user()
+    despesas = await make_despesas(user.id, quantidade=quantidade)
+
+    queries.clear()
+    resposta = await client.patch(
+        "/despesas/bulk/quitar", json=[despesa.id for despesa in despesas]
+    )
+
+    assert resposta.status_code == 200
+    assert resumir(queries) == [
+        *valores_antigos(test_database),
+        "UPDATE tb_despesas",
+        "INSERT INTO tb_resumo_mensal",
+        "UPDATE tb_users",
+    ]
+
+
+@pytest.mark.parametrize(
+    "order, valores",
+    [("valor", ["abc", 1]), ("vencimento", ["ontem", 1]), ("valor", [1])],
+)
+async def test_tampered_cursor_is_rejected(client, make_user, order, valores):
+    user = await make_user()
+    cursor = encode_cursor(valores)
+
+    resposta = await client.get(
+        f"/despesas/user/{user.id}/pagina", params={"order": order, "cursor": cursor}
+    )
+
+    assert resposta.status_code == 400
+    assert resposta.json()["detail"] == "Cursor inválido."
+
+
+@pytest.mark.parametrize("metodo, caminho", [("PATCH", "/bulk/quitar"), ("DELETE", "/bulk")])
+async def test_bulk_reports_repeated_ids_as_item_errors(
+    client, make_user, make_despesas, metodo, caminho
+):
+    user = await make_user()
+    a, b = await make_despesas(user.id, quantidade=2)
+
+    resposta = await client.request(
+        metodo, f"/despesas{caminho}", json=[a.id, b.id, a.id, 999999]
+    )
+
+    assert resposta.status_code == 200
+    assert resposta.json() == {
+        "items": [a.id, b.id],
+        "errors": [
+            {"index": 2, "detail": f"Despesa com ID = {a.id} repetido no lote."},
+            {"index": 3, "detail": "Despesa com ID = 999999 não encontrado."},
+        ],
+    }
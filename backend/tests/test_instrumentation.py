@@ -0,0 +1,27 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core import instrumentation
+from app.core.instrumentation import RequestMetrics, instrument_engine
+
+
+async def test_failed_statement_does_not_skew_timings():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    instrument_engine(engine)
+    metricas = RequestMetrics()
+    token = instrumentation._atual.set(metricas)
+    try:
+        async with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                await conn.execute(text("SELECT * FROM tabela_inexistente"))
+            await conn.execute(text("SELECT 1"))
+            sobras = (await conn.get_raw_connection()).info
+    finally:
+        instrumentation._atual.reset(token)
+        await engine.dispose()
+
+    assert metricas.queries == 1
+    assert 0 <= metricas.db_time < 1
+    assert "query_start" not in sobras
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+from sqlalchemy import func, select
+
+from app.core import jobs
+from app.core.jobs import DatabaseJobBackend, JobWorker
+from app.model.despesa import Despesa
+
+
+pytestmark = pytest.mark.integration
+
+
+class Vazio(BaseModel):
+    pass
+
+
+class LeasePerdido(DatabaseJobBackend):
+    # Recusa a renovação do lease, como se outro worker tivesse pegado a tarefa
+    def __init__(self, session_factory):
+        super().__init__(session_factory)
+        self.encerradas = []
+
+    async def heartbeat(self, id, worker, lease):
+        return False
+
+    async def complete(self, id, worker, resultado):
+        self.encerradas.append(("complete", id))
+
+    async def fail(self, id, worker, erro, retry_in=None):
+        self.encerradas.append(("fail", id))
+
+
+async def test_lost_lease_cancels_the_handler(client, test_database, monkeypatch):
+    cancelada = asyncio.Event()
+
+    async def lenta(db, payload):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelada.set()
+            raise
+
+    monkeypatch.setitem(jobs.handlers, "teste.lenta", (lenta, Vazio))
+    resposta = await client.post("/jobs/", json={"tipo": "teste.lenta"})
+    assert resposta.status_code == 202
+
+    backend = LeasePerdido(test_database.session)
+    worker = JobWorker(backend, lease=0.03, session_factory=test_database.session)
+    job = await backend.claim(worker.name, worker.lease)
+
+    await asyncio.wait_for(worker.run(job), timeout=5)
+
+    assert cancelada.is_set()
+    # Outro worker detém a tarefa agora: nem conclusão nem falha daqui
+    assert backend.encerradas == []
+
+
+async def test_import_runs_once_per_job(client, db, test_database, make_user):
+    user = await make_user()
+    item = {
+        "nome": "agua",
+        "tipo": "boleto",
+        "status": "P",
+        "vencimento": "2025-06-10",
+        "valor": 30,
+        "user_id": user.id,
+    }
+    resposta = await client.post(
+        "/jobs/", json={"tipo": "despesas.importar", "payload": {"items": [item] * 3}}
+    )
+    assert resposta.status_code == 202
+
+    backend = DatabaseJobBackend(test_database.session)
+    worker = JobWorker(backend, session_factory=test_database.session)
+    job = await backend.claim(worker.name, worker.lease)
+    # A mesma tarefa executada duas vezes, como depois de um lease perdido
+    await worker.run(job)
+    await worker.run(job)
+
+    total = await db.scalar(
+        select(func.count()).select_from(Despesa).where(Despesa.user_id == user.id)
+    )
+    assert total == 3
+    job = (await client.get(f"/jobs/{job.id}")).json()
+    assert job["status"] == "concluido"
+    assert len(job["resultado"]["items"]) == 3
@@ -0,0 +1,49 @@
+import pytest
+
+from app.core.cache import NullCache, get_cache, set_cache
+from app.core.database import dispose_engines, get_engine, set_database
+from app.core.jobs import get_job_backend, set_job_backend
+from app.core.security import get_password_hasher, set_password_hasher
+from app.core.settings import Settings, get_settings, set_settings
+from main import create_app
+
+
+pytestmark = pytest.mark.integration
+
+
+def configuracao(tmp_path, nome: str, **valores) -> Settings:
+    return Settings(
+        _env_file=None,
+        ENV="teste",
+        DATABASE_URL=f"sqlite+aiosqlite:///{tmp_path / nome}",
+        **valores,
+    )
+
+
+@pytest.fixture
+def componentes():
+    # create_app(settings) troca os componentes do processo: restaura os do teste
+    anteriores = get_settings()
+    yield
+    set_settings(anteriores)
+    set_database(None)
+    set_cache(None)
+    set_password_hasher(None)
+    set_job_backend(None)
+
+
+async def test_create_app_with_settings_rebuilds_components(tmp_path, componentes):
+    set_settings(configuracao(tmp_path, "a.db", PASSWORD_HASH_N=2**4))
+    set_database(None)
+    antigos = (get_engine(), get_cache(), get_password_hasher(), get_job_backend())
+    assert get_engine().url.database.endswith("a.db")
+
+    create_app(configuracao(tmp_path, "b.db", CACHE_ENABLED=False, PASSWORD_HASH_N=2**5))
+
+    assert get_engine().url.database.endswith("b.db")
+    assert isinstance(get_cache(), NullCache)
+    assert get_password_hasher().n == 2**5
+    novos = (get_engine(), get_cache(), get_password_hasher(), get_job_backend())
+    assert all(novo is not antigo for novo, antigo in zip(novos, antigos))
+    await antigos[0].dispose()
+    await dispose_engines()
@@ -0,0 +1,101 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import inspect, text
+
+from app.core.database import (
+    Base,
+    create_schema,
+    dispose_engines,
+    get_engine,
+    set_database,
+)
+from app.core.settings import Settings, get_settings, set_settings
+
+
+pytestmark = pytest.mark.integration
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def engine(tmp_path):
+    # create_schema usa o engine global: aponta-o para um arquivo só do teste
+    anteriores = get_settings()
+    set_settings(
+        Settings(
+            _env_file=None,
+            ENV="teste",
+            DATABASE_URL=f"sqlite+aiosqlite:///{tmp_path / 'migrate.db'}",
+        )
+    )
+    set_database(None)
+    yield get_engine()
+    await dispose_engines()
+    set_settings(anteriores)
+    set_database(None)
+
+
+async def _indices(engine, tabela: str) -> set[str]:
+    async with engine.connect() as conn:
+        return await conn.run_sync(
+            lambda sync: {i["name"] for i in inspect(sync).get_indexes(tabela)}
+        )
+
+
+async def test_migrate_creates_indexes_on_existing_tables(engine):
+    await create_schema()
+    criados = await _indices(engine, "tb_despesas")
+    async with engine.begin() as conn:
+        for nome in criados:
+            await conn.execute(text(f"DROP INDEX {nome}"))
+
+    await create_schema()
+    await create_schema()
+
+    esperados = {
+        indice.name
+        for indice in Base.metadata.tables["tb_despesas"].indexes
+        if not indice.name.endswith("_trgm")
+    }
+    assert criados == esperados
+    assert await _indices(engine, "tb_despesas") == esperados
+
+
+async def test_migrate_adds_missing_columns_with_defaults(engine):
+    await create_schema()
+    async with engine.begin() as conn:
+        await conn.execute(text("ALTER TABLE tb_users DROP COLUMN versao"))
+        await conn.execute(text("ALTER TABLE tb_users DROP COLUMN versao_despesas"))
+        await conn.execute(
+            text("INSERT INTO tb_users (nome, email, senha) VALUES ('antigo', 'a@a.com', 'x')")
+        )
+
+    await create_schema()
+    await create_schema()
+
+    async with engine.connect() as conn:
+        linha = (
+            await conn.execute(text("SELECT versao, versao_despesas FROM tb_users"))
+        ).one()
+    assert tuple(linha) == (1, 1)
+
+
+async def test_migrate_adds_recorrencia_column_and_unique_constraint(engine):
+    await create_schema()
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP TABLE tb_despesas"))
+        await conn.execute(
+            text(
+                "CREATE TABLE tb_despesas (id INTEGER PRIMARY KEY, nome VARCHAR(100) NOT NULL,"
+                " tipo VARCHAR(100) NOT NULL, valor NUMERIC NOT NULL, status VARCHAR(1) NOT NULL,"
+                " vencimento DATE NOT NULL, user_id INTEGER NOT NULL)"
+            )
+        )
+
+    await create_schema()
+    await create_schema()
+
+    assert "uq_despesas_recorrencia_vencimento" in await _indices(engine, "tb_despesas")
+    async with engine.connect() as conn:
+        colunas = await conn.run_sync(
+            lambda sync: {c["name"] for c in inspect(sync).get_columns("tb_despesas")}
+        )
+    assert "recorrencia_id" in colunas
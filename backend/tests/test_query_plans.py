@@ -0,0 +1,145 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import event, select
+
+from app.model.despesa import Despesa
+from app.repository.despesa import DespesaRepository
+
+
+pytestmark = pytest.mark.integration
+
+# Consultas de leitura de tb_despesas que precisam ser atendidas por índice.
+# No SQLite, toda linha "SCAN tb_despesas" percorre a tabela inteira (mesmo
+# com USING INDEX, que só evita a ordenação); no Postgres, com enable_seqscan
+# desligado, sobra Seq Scan quando nenhum índice serve a consulta, e um
+# "Filter: (user_id = ...)" indica que o usuário foi filtrado linha a linha
+
+
+async def _pagina(repository, user_id):
+    _, cursor = await repository.get_page_by_user_id(user_id, limit=5)
+    await repository.get_page_by_user_id(user_id, cursor=cursor, limit=5)
+
+
+async def _pagina_geral(repository, user_id):
+    _, cursor = await repository.get_page(limit=5)
+    await repository.get_page(cursor=cursor, limit=5)
+
+
+async def _stream(repository, user_id):
+    async for _ in repository.stream_by_user_id(user_id, ["id", "valor"]):
+        pass
+
+
+CONSULTAS = {
+    "get_by_user_id": lambda r, u: r.get_by_user_id(u),
+    "get_by_user_id -vencimento": lambda r, u: r.get_by_user_id(u, "-vencimento"),
+    "get_by_user_id valor": lambda r, u: r.get_by_user_id(u, "valor"),
+    "get_by_user_id status": lambda r, u: r.get_by_user_id(u, status="P"),
+    "get_by_user_id periodo": lambda r, u: r.get_by_user_id(
+        u, inicio=date(2025, 3, 1), fim=date(2025, 6, 30)
+    ),
+    "get_rows_by_user_id": lambda r, u: r.get_rows_by_user_id(u, ["id", "valor"]),
+    "get_page_by_user_id": _pagina,
+    "get_page": _pagina_geral,
+    "stream_by_user_id": _stream,
+    "summary": lambda r, u: r.summary(u, ["month", "status"]),
+    "search": lambda r, u: r.search(u, "luz"),
+    "get_by_id": lambda r, u: r.get_by_id(1),
+}
+
+# A página geral (sem filtro) percorre o índice na ordem do cursor até o LIMIT
+VARREDURAS_PERMITIDAS = {"get_page": "ix_despesas_vencimento_id"}
+
+
+async def capturar(test_database, operacao) -> list[tuple[str, tuple]]:
+    capturadas = []
+
+    def _capturar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "tb_despesas" in statement:
+            capturadas.append((statement, parameters))
+
+    engine = test_database.engine.sync_engine
+    event.listen(engine, "before_cursor_execute", _capturar)
+    try:
+        await operacao()
+    finally:
+        event.remove(engine, "before_cursor_execute", _capturar)
+    return capturadas
+
+
+async def plano(db, statement: str, parameters) -> list[str]:
+    conexao = await db.connection()
+    if conexao.dialect.name == "postgresql":
+        await conexao.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        linhas = await conexao.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+        return [linha[0] for linha in linhas]
+
+    linhas = await conexao.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    return [linha[-1] for linha in linhas]
+
+
+def varredura_completa(linha: str, permitida: str = None) -> bool:
+    if "Seq Scan on tb_despesas" in linha or "Filter: (user_id = " in linha:
+        return True
+    if not linha.startswith("SCAN tb_despesas"):
+        return False
+    return permitida is None or not linha.endswith(f"INDEX {permitida}")
+
+
+@pytest.mark.parametrize("nome", CONSULTAS)
+async def test_despesa_reads_use_an_index(db, test_database, make_user, make_despesas, nome):
+    user = await make_user()
+    outro = await make_user()
+    await make_despesas(user.id, quantidade=20)
+    await make_despesas(outro.id, quantidade=20)
+    repository = DespesaRepository(db)
+
+    capturadas = await capturar(
+        test_database, lambda: CONSULTAS[nome](repository, user.id)
+    )
+    assert capturadas, "nenhuma consulta a tb_despesas foi executada"
+
+    for statement, parameters in capturadas:
+        linhas = await plano(db, statement, parameters)
+        permitida = VARREDURAS_PERMITIDAS.get(nome)
+        assert not any(varredura_completa(linha, permitida) for linha in linhas), (
+            statement + "\n" + "\n".join(linhas)
+        )
+
+
+
+@pytest.mark.parametrize("coluna", ["nome", "tipo"])
+async def test_search_predicates_use_the_trigram_indexes(
+    db, test_database, make_user, make_despesas, coluna
+):
+    # Os índices GIN de trigramas só existem no Postgres (ddl_if)
+    if test_database.engine.dialect.name != "postgresql":
+        pytest.skip("índices de trigramas só existem no Postgres")
+
+    user = await make_user()
+    await make_despesas(user.id, quantidade=20)
+    campo = getattr(Despesa, coluna)
+
+    for filtro in (campo.op("%")("luz"), campo.ilike("%lu%", escape="!")):
+        capturadas = await capturar(
+            test_database, lambda: db.execute(select(Despesa.id).where(filtro))
+        )
+        for statement, parameters in capturadas:
+            linhas = await plano(db, statement, parameters)
+            assert any(f"ix_despesas_{coluna}_trgm" in linha for linha in linhas), (
+                statement + "\n" + "\n".join(linhas)
+            )
+
+
+def test_plan_check_flags_full_scans():
+    assert varredura_completa("SCAN tb_despesas")
+    assert varredura_completa("  ->  Seq Scan on tb_despesas  (cost=0.00..1.20 rows=1)")
+    assert varredura_completa("SCAN tb_despesas USING INDEX ix_despesas_vencimento_id")
+    assert varredura_completa("        Filter: (user_id = 1)")
+    assert not varredura_completa(
+        "SEARCH tb_despesas USING INDEX ix_despesas_user_id (user_id=?)"
+    )
+    assert not varredura_completa(
+        "SCAN tb_despesas USING INDEX ix_despesas_vencimento_id", "ix_despesas_vencimento_id"
+    )
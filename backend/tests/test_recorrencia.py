@@ -0,0 +1,34 @@
+from datetime import date
+
+import pytest
+
+from app.schema.recorrencia import RecorrenciaSchema
+from app.service.recorrencia import RecorrenciaService
+
+
+pytestmark = pytest.mark.service
+
+
+async def test_finished_rules_are_not_selected_again(db, make_user):
+    user = await make_user()
+    service = RecorrenciaService(db)
+    await service.create(
+        RecorrenciaSchema(
+            nome="academia",
+            tipo="boleto",
+            valor=90,
+            user_id=user.id,
+            frequencia="mensal",
+            inicio=date(2025, 1, 10),
+            fim=date(2025, 3, 10),
+        )
+    )
+
+    # A criação já gera as ocorrências até o horizonte padrão, que passa do fim
+    [regra] = await service.get_by_user_id(user.id)
+    assert regra.gerado_ate == date(2025, 3, 10)
+
+    # O horizonte avança a cada execução; a regra já encerrada fica de fora
+    for horizonte in (date(2030, 1, 31), date(2030, 2, 28)):
+        resultado = await service.materialize(horizonte=horizonte)
+        assert (resultado.created, resultado.rules) == (0, 0)
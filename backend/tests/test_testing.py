@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import func, select
+
+from app.model.despesa import Despesa
+from app.model.user import User
+
+
+pytestmark = pytest.mark.integration
+
+
+async def contar(db, model) -> int:
+    return await db.scalar(select(func.count()).select_from(model))
+
+
+@pytest.mark.parametrize("rodada", [1, 2])
+async def test_db_rollback_isolation(db, make_user, rodada):
+    # As duas rodadas gravam o mesmo email único: a segunda só passa se a
+    # transação da primeira tiver sido desfeita
+    assert await contar(db, User) == 0
+    await make_user(email="isolado@teste.com")
+    assert await contar(db, User) == 1
+
+
+async def test_client_shares_test_transaction(client, db, make_user):
+    user = await make_user()
+
+    resposta = await client.get(f"/users/{user.id}")
+    assert resposta.status_code == 200
+    assert resposta.json()["email"] == user.email
+
+    resposta = await client.post(
+        "/users/", json={"nome": "ana", "email": "ana@teste.com", "senha": "segredo1"}
+    )
+    assert resposta.status_code == 201
+    assert await contar(db, User) == 2
+
+
+async def test_client_export_uses_test_session(client, make_user, make_despesas):
+    user = await make_user()
+    await make_despesas(user.id, 3)
+
+    resposta = await client.get(f"/despesas/user/{user.id}/export?format=ndjson")
+    assert resposta.status_code == 200
+    assert len(resposta.text.splitlines()) == 3
+
+
+async def test_run_jobs(client, db, test_database, make_user):
+    user = await make_user()
+    item = {
+        "nome": "agua",
+        "tipo": "boleto",
+        "status": "P",
+        "vencimento": "2025-06-10",
+        "valor": 30,
+        "user_id": user.id,
+    }
+
+    resposta = await client.post(
+        "/jobs/",
+        json={"tipo": "despesas.importar", "payload": {"items": [item] * 4}},
+    )
+    assert resposta.status_code == 202
+    assert resposta.json()["status"] == "pendente"
+
+    assert await test_database.run_jobs() == 1
+    assert await test_database.run_jobs() == 0
+
+    job = (await client.get(f"/jobs/{resposta.json()['id']}")).json()
+    assert job["status"] == "concluido"
+    assert len(job["resultado"]["items"]) == 4
+    assert await contar(db, Despesa) == 4
@@ -0,0 +1,45 @@
+import threading
+
+import pytest
+
+from app.core import security
+
+
+pytestmark = pytest.mark.routers
+
+
+async def test_login_by_email_with_repeated_names(client, make_user):
+    primeiro = await make_user(nome="maria", email="maria1@teste.com")
+    segundo = await make_user(nome="maria", email="maria2@teste.com")
+
+    for user in (primeiro, segundo):
+        resposta = await client.post(
+            "/users/login", json={"email": user.email, "senha": "segredo1"}
+        )
+        assert resposta.status_code == 200
+        assert resposta.json()["id"] == user.id
+
+    resposta = await client.post(
+        "/users/login", json={"email": segundo.email, "senha": "errada"}
+    )
+    assert resposta.status_code == 401
+
+
+async def test_login_never_hashes_on_the_event_loop(client, monkeypatch):
+    # Um hasher novo: o hash usado para emails desconhecidos ainda não existe
+    security.set_password_hasher(None)
+    threads = []
+    derivar = security._derivar
+
+    def registrar(*args):
+        threads.append(threading.current_thread().name)
+        return derivar(*args)
+
+    monkeypatch.setattr(security, "_derivar", registrar)
+    resposta = await client.post(
+        "/users/login", json={"email": "ninguem@teste.com", "senha": "segredo1"}
+    )
+
+    assert resposta.status_code == 401
+    assert threads and all(nome.startswith("password-hash") for nome in threads)
+    await security.close_password_hasher()